@@ -23,9 +23,44 @@ class Settings(BaseSettings):
     CACHE_DIR: str = "./cache"
     CACHE_ENABLED: bool = True
     CACHE_TTL: int = 3600  # 1 hour
+    # Responses about a session are cached by where the session is: for good
+    # once final, and these many seconds before that — while it runs, after it
+    # ends, and for a provisional classification. RECENT outlives
+    # WARMER_INTERVAL, so a warming pass mostly finds what the last one built.
+    CACHE_TTL_LIVE: int = 60
+    CACHE_TTL_RECENT: int = 1800
+    CACHE_TTL_PROVISIONAL: int = 180
+    # Most recently used responses are also kept decoded in memory, up to this
+    # much (measured as JSON); 0 serves every hit from disk.
+    CACHE_MEMORY_MB: int = 256
+    # Encoded responses are also stored gzip-compressed (and brotli/zstd when
+    # those packages are installed), sent by Accept-Encoding.
+    CACHE_COMPRESSION: bool = True
+    # Finished sessions are also kept as columnar files under CACHE_DIR.
+    SESSION_STORE_ENABLED: bool = True
+    # Hours after a session ends before its data is considered final.
+    SESSION_FINAL_HOURS: int = 72
 
     # FastF1
     FASTF1_CACHE_DIR: str = "./cache/fastf1"
+    # Memory budget for loaded sessions kept between requests; 0 disables it.
+    SESSION_POOL_MB: int = 1536
+
+    # Blocking session work runs in its own thread pool: this many at once,
+    # and this many more waiting before requests are turned away with a 503.
+    WORKER_THREADS: int = 4
+    WORKER_QUEUE: int = 32
+
+    # Worker processes for telemetry parsing, each with its own session pool
+    # (so up to SESSION_POOL_MB each). 0 keeps everything in this process.
+    SESSION_PROCESSES: int = 0
+
+    # Background warming of sessions that have just ended: how often the
+    # schedule is checked (seconds), and for how long after its end a session
+    # is still worth warming (hours).
+    WARMER_ENABLED: bool = True
+    WARMER_INTERVAL: int = 600
+    WARMER_WINDOW_HOURS: int = 24
 
     class Config:
         env_file = ".env"
@@ -1,10 +1,19 @@
 """
 FastAPI application for F1 telemetry data service
 """
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routes import telemetry, laps, weather, sessions
+from app.routes import bundle, telemetry, laps, weather, sessions
+from app.services import warmer
+from app.utils.cache_manager import cache_manager
+from app.utils.compression import compression_stats
+from app.utils.session_pool import session_pool
+from app.utils.session_workers import session_processes
+from app.utils.workers import workers
 import fastf1
 
 # Configure FastF1 cache
@@ -15,6 +24,17 @@ fastf1.Cache.enable_cache(settings.FASTF1_CACHE_DIR)
 # only mounted outside production.
 _is_production = settings.ENVIRONMENT == "production"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warming = asyncio.create_task(warmer.run_forever()) if settings.WARMER_ENABLED else None
+    yield
+    if warming is not None:
+        warming.cancel()
+    # Worker processes would otherwise outlive a reload in development.
+    session_processes.shutdown()
+
+
 app = FastAPI(
     title="ApexData F1 Telemetry Service",
     description="Microservice for F1 telemetry data using FastF1",
@@ -22,6 +42,7 @@ app = FastAPI(
     docs_url=None if _is_production else "/docs",
     redoc_url=None if _is_production else "/redoc",
     openapi_url=None if _is_production else "/openapi.json",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -40,6 +61,7 @@ app.include_router(telemetry.router, prefix="/api/telemetry", tags=["Telemetry"]
 app.include_router(laps.router, prefix="/api/laps", tags=["Laps"])
 app.include_router(weather.router, prefix="/api/weather", tags=["Weather"])
 app.include_router(sessions.router, prefix="/api/sessions", tags=["Sessions"])
+app.include_router(bundle.router, prefix="/api/bundle", tags=["Sessions"])
 
 
 @app.get("/")
@@ -60,4 +82,9 @@ async def health_check():
         "status": "healthy",
         "cache_enabled": settings.CACHE_ENABLED,
         "cache_dir": settings.FASTF1_CACHE_DIR,
+        "response_memory": cache_manager.memory.stats(),
+        "response_compression": compression_stats.stats(),
+        "session_pool": session_pool.stats(),
+        "workers": workers.stats(),
+        "session_processes": session_processes.stats(),
     }
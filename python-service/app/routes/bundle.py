@@ -0,0 +1,149 @@
+"""
+Everything a session page shows, in one request and one session load.
+
+The race page asks for the laps, the stints, the fastest laps, the weather and
+the session info separately. Each of those requests checks its own cache entry
+and, on a miss, loads the parts of the session it reads: the laps, then the
+weather into the same session, then the results. Five round trips, and up to
+three passes through `Session.load` for one session.
+
+`/api/bundle/{year}/{event}/{session_type}?sections=...` makes one: it looks
+up every section's own cache entry, loads the session once with every part the
+missing sections read between them, and then builds those sections through
+their own routes — the same functions, the same cache keys — so each one is
+also cached as if it had been asked for on its own. The next visit to any of
+the separate endpoints is a hit.
+
+Cached sections are sent as they are in the cache, encoded JSON spliced into
+the bundle, not decoded and encoded again. A section with nothing to show (no
+weather for an old session, no classification outside qualifying) comes as
+null with its error, and the others are still sent.
+"""
+import logging
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.routes import laps, sessions, weather
+from app.utils.cache_manager import cache_manager
+from app.utils.events import canonical_event, session_type_key
+from app.utils.loading import LAPS, WEATHER, load_session
+from app.utils.serialization import encode, json_response
+from app.utils.workers import workers
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# name -> (parts of the session it reads, its cache key, its route).
+#
+# The keys come from each route's own key builder, for a JSON response with
+# the route's defaults; route functions called directly get no defaults from
+# FastAPI, so every argument is passed.
+SECTIONS = {
+    "laps": (
+        LAPS,
+        laps.laps_key,
+        lambda year, event, session_type: laps.get_session_laps(
+            year, event, session_type, None, "records", None
+        ),
+    ),
+    "stints": (LAPS, laps.stints_key, laps.get_session_stints),
+    "fastest": (
+        LAPS,
+        laps.fastest_laps_key,
+        lambda year, event, session_type: laps.get_fastest_laps(
+            year, event, session_type, laps.FASTEST_LIMIT, None
+        ),
+    ),
+    "weather": (
+        WEATHER,
+        weather.weather_key,
+        lambda year, event, session_type: weather.get_session_weather(year, event, session_type, None),
+    ),
+    "info": (LAPS, sessions.session_info_key, sessions.get_session_info),
+    "classification": (LAPS, sessions.classification_key, sessions.get_qualifying_classification),
+}
+
+# What the race page reads; the classification only exists for qualifying.
+DEFAULT_SECTIONS = "laps,stints,fastest,weather,info"
+
+
+def parse_sections(sections: str) -> list[str]:
+    """`sections=` -> the section names asked for, in the order of `SECTIONS`."""
+    names = {name.strip().lower() for name in sections.split(",") if name.strip()}
+    unknown = sorted(names - SECTIONS.keys())
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sección desconocida: {', '.join(unknown)}. Secciones disponibles: {', '.join(SECTIONS)}",
+        )
+    if not names:
+        raise HTTPException(status_code=400, detail="No se ha pedido ninguna sección")
+
+    return [name for name in SECTIONS if name in names]
+
+
+def _bundle_body(session: dict, bodies: dict[str, bytes | None], errors: dict) -> bytes:
+    # The sections are already encoded JSON: they are spliced in as they are.
+    sections = b",".join(
+        encode(name) + b":" + (body if body is not None else b"null") for name, body in bodies.items()
+    )
+    return (
+        b'{"session":' + encode(session)
+        + b',"sections":{' + sections + b"}"
+        + b',"errors":' + encode(errors) + b"}"
+    )
+
+
+@router.get("/{year}/{event}/{session_type}")
+async def get_session_bundle(
+    year: int,
+    event: str,
+    session_type: str,
+    sections: str = Query(
+        DEFAULT_SECTIONS,
+        description=f"Comma-separated sections: {', '.join(SECTIONS)}. The race page's five if omitted",
+    ),
+):
+    """
+    Several of a session's endpoints in one response, from one session load
+
+    Each section is the body its own endpoint returns, under `sections`; one
+    that has no data comes as null, with its status and detail under `errors`.
+    Every section built here is cached under its own endpoint's key.
+    """
+    try:
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        names = parse_sections(sections)
+
+        bodies = {
+            name: cache_manager.get(SECTIONS[name][1](year, event, session_type)) for name in names
+        }
+        missing = [name for name in names if bodies[name] is None]
+
+        errors = {}
+        if missing:
+            # Every part the missing sections read, in one load; each route
+            # then finds the session in the pool.
+            parts = frozenset().union(*(SECTIONS[name][0] for name in missing))
+            await workers.run(load_session, year, event, session_type, parts)
+
+            for name in missing:
+                try:
+                    bodies[name] = (await SECTIONS[name][2](year, event, session_type)).body
+                except HTTPException as error:
+                    # A full worker pool is the bundle's problem too.
+                    if error.status_code == 503:
+                        raise
+                    errors[name] = {"status": error.status_code, "detail": error.detail}
+
+        session = {"year": year, "event": event, "type": session_type}
+        return json_response(_bundle_body(session, bodies, errors))
+
+    except HTTPException:
+        # El 404 de una sesión sin correr no es un fallo nuestro.
+        raise
+    except Exception:
+        logger.exception("Error building session bundle")
+        raise HTTPException(status_code=500, detail="Error building session bundle")
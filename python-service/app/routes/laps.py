@@ -3,20 +3,94 @@ Lap times and lap data endpoints
 """
 import logging
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
 from typing import Optional
-import fastf1
 import pandas as pd
 from app.utils.cache_manager import cache_manager
-from app.utils.serialization import records
+from app.utils.encodings import JSON, build_encoded, cache_suffix, encoded_response, negotiate
+from app.utils.serialization import build_json, json_response
+from app.utils.streaming import frame_lines, ndjson_line, ndjson_response
 from app.utils.track import group_by_driver, stints_from_laps
-from app.utils.events import event_key
-from app.utils.loading import load_session
+from app.utils.events import canonical_event, driver_key, session_type_key
+from app.utils.loading import LAPS, load_session
+from app.utils.workers import workers
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# How many fastest laps are sent when `limit` is not given.
+FASTEST_LIMIT = 10
+
+
+# Cache keys, one builder per route: the bundle looks up the same entries.
+
+def laps_key(year: int, event, session_type: str, driver: Optional[str] = None, encoding: str = JSON) -> str:
+    return f"laps_{year}_{event}_{session_type}_{driver}{cache_suffix(encoding)}"
+
+
+def stints_key(year: int, event, session_type: str) -> str:
+    return f"stints_{year}_{event}_{session_type}"
+
+
+def fastest_laps_key(
+    year: int, event, session_type: str, limit: int = FASTEST_LIMIT, encoding: str = JSON
+) -> str:
+    return f"fastest_laps_{year}_{event}_{session_type}_{limit}{cache_suffix(encoding)}"
+
+
+def _session_laps(year: int, event: str, session_type: str, driver: Optional[str]) -> dict:
+    session = load_session(year, event, session_type, LAPS)
+
+    laps = session.laps
+
+    # Filter by driver if specified (use pick_drivers instead of deprecated pick_driver)
+    if driver:
+        laps = laps.pick_drivers(driver)
+
+    if laps.empty:
+        raise HTTPException(status_code=404, detail="No laps found")
+
+    # Select relevant columns
+    #
+    # `Position` estaba fuera de esta lista aunque FastF1 la entrega en
+    # `session.laps`: sin ella no se puede dibujar ni la evolución de
+    # posiciones ni la traza de carrera, que son los dos gráficos que
+    # cuentan una carrera entera de un vistazo.
+    columns = [
+        'Time', 'Driver', 'DriverNumber', 'LapTime', 'LapNumber', 'Position',
+        'Stint', 'PitOutTime', 'PitInTime', 'Sector1Time', 'Sector2Time',
+        'Sector3Time', 'Sector1SessionTime', 'Sector2SessionTime',
+        'Sector3SessionTime', 'SpeedI1', 'SpeedI2', 'SpeedFL', 'SpeedST',
+        'IsPersonalBest', 'Compound', 'TyreLife', 'FreshTyre',
+        'Team', 'TrackStatus', 'IsAccurate'
+    ]
+
+    # Filter columns that exist
+    available_columns = [col for col in columns if col in laps.columns]
+    laps_filtered = laps[available_columns]
+
+    # Convert to dict
+    result = {
+        "session": {
+            "year": year,
+            "event": event,
+            "type": session_type,
+            "name": session.event['EventName'],
+            "date": str(session.date)
+        },
+        "total_laps": len(laps_filtered),
+        "laps": laps_filtered
+    }
+
+    return result
+
+
+def _session_laps_lines(result: dict):
+    # What the document has besides the laps goes first, on a line of its own.
+    yield ndjson_line({key: value for key, value in result.items() if key != "laps"})
+    yield from frame_lines(result["laps"])
+
 
 @router.get("/{year}/{event}/{session_type}")
 async def get_session_laps(
@@ -24,6 +98,11 @@ async def get_session_laps(
     event: str,
     session_type: str,
     driver: Optional[str] = Query(None, description="Filter by driver code"),
+    format: str = Query(
+        "records", pattern="^(records|ndjson)$",
+        description="records: one JSON document. ndjson: a session line, then one line per lap, streamed",
+    ),
+    accept: Optional[str] = Header(None),
 ):
     """
     Get all lap times for a session
@@ -33,62 +112,35 @@ async def get_session_laps(
     - event: Event name or round number
     - session_type: Session type ('FP1', 'FP2', 'FP3', 'Q', 'S', 'R')
     - driver: Optional driver filter
+    - format: "records" (default) or "ndjson" to stream one lap per line
 
     Returns lap data including times, compounds, sectors, etc.
     """
     try:
-        cache_key = f"laps_{year}_{event}_{session_type}_{driver}"
+        # Equivalent URLs ("8", "Monaco", "monaco") share one cache entry.
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        driver = driver_key(driver)
+
+        if format == "ndjson":
+            # Loaded (and any 404 raised) before the stream starts; rows are
+            # then encoded as they are sent.
+            result = await workers.run(_session_laps, year, event, session_type, driver)
+            return ndjson_response(_session_laps_lines(result))
+
+        encoding = negotiate(accept)
+
+        cache_key = laps_key(year, event, session_type, driver, encoding)
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
-
-        session = load_session(year, event, session_type)
-
-        laps = session.laps
-
-        # Filter by driver if specified (use pick_drivers instead of deprecated pick_driver)
-        if driver:
-            laps = laps.pick_drivers(driver)
-
-        if laps.empty:
-            raise HTTPException(status_code=404, detail="No laps found")
-
-        # Select relevant columns
-        #
-        # `Position` estaba fuera de esta lista aunque FastF1 la entrega en
-        # `session.laps`: sin ella no se puede dibujar ni la evolución de
-        # posiciones ni la traza de carrera, que son los dos gráficos que
-        # cuentan una carrera entera de un vistazo.
-        columns = [
-            'Time', 'Driver', 'DriverNumber', 'LapTime', 'LapNumber', 'Position',
-            'Stint', 'PitOutTime', 'PitInTime', 'Sector1Time', 'Sector2Time',
-            'Sector3Time', 'Sector1SessionTime', 'Sector2SessionTime',
-            'Sector3SessionTime', 'SpeedI1', 'SpeedI2', 'SpeedFL', 'SpeedST',
-            'IsPersonalBest', 'Compound', 'TyreLife', 'FreshTyre',
-            'Team', 'TrackStatus', 'IsAccurate'
-        ]
-
-        # Filter columns that exist
-        available_columns = [col for col in columns if col in laps.columns]
-        laps_filtered = laps[available_columns]
-
-        # Convert to dict
-        result = {
-            "session": {
-                "year": year,
-                "event": event,
-                "type": session_type,
-                "name": session.event['EventName'],
-                "date": str(session.date)
-            },
-            "total_laps": len(laps_filtered),
-            "laps": records(laps_filtered)
-        }
-
-        cache_manager.set(cache_key, result)
-
-        return result
+            return encoded_response(cached_data, encoding, cache_key)
+
+        body = await workers.run(build_encoded, encoding, "records", _session_laps, year, event, session_type, driver)
+
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
+
+        return encoded_response(body, encoding, cache_key)
 
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
@@ -98,6 +150,39 @@ async def get_session_laps(
         raise HTTPException(status_code=500, detail="Error fetching laps")
 
 
+def _session_stints(year: int, event: str, session_type: str) -> dict:
+    session = load_session(year, event, session_type, LAPS)
+
+    if session.laps.empty:
+        raise HTTPException(status_code=404, detail="No lap data available for this session")
+
+    order: list[str] = []
+    try:
+        results = session.results
+        if results is not None and not results.empty:
+            order = [str(code) for code in results["Abbreviation"].tolist()]
+    except Exception:
+        # Sin resultados —una sesión de libres— el orden alfabético vale.
+        logger.warning("Results unavailable for %s %s %s", year, event, session_type)
+
+    drivers = group_by_driver(stints_from_laps(session.laps), order)
+
+    if not drivers:
+        raise HTTPException(status_code=404, detail="No stint data available for this session")
+
+    result = {
+        "session": {
+            "year": year,
+            "event": session.event["EventName"] if session.event is not None else event,
+            "name": session_type,
+        },
+        "total_laps": int(session.laps["LapNumber"].max()),
+        "drivers": drivers,
+    }
+
+    return result
+
+
 @router.get("/{year}/{event}/{session_type}/stints")
 async def get_session_stints(
     year: int,
@@ -112,43 +197,19 @@ async def get_session_stints(
     con los de atrás, no por orden alfabético.
     """
     try:
-        cache_key = f"stints_{year}_{event}_{session_type}"
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+
+        cache_key = stints_key(year, event, session_type)
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
-
-        session = load_session(year, event, session_type)
-
-        if session.laps.empty:
-            raise HTTPException(status_code=404, detail="No lap data available for this session")
+            return json_response(cached_data, cache_key)
 
-        order: list[str] = []
-        try:
-            results = session.results
-            if results is not None and not results.empty:
-                order = [str(code) for code in results["Abbreviation"].tolist()]
-        except Exception:
-            # Sin resultados —una sesión de libres— el orden alfabético vale.
-            logger.warning("Results unavailable for %s %s %s", year, event, session_type)
+        body = await workers.run(build_json, _session_stints, year, event, session_type)
 
-        drivers = group_by_driver(stints_from_laps(session.laps), order)
-
-        if not drivers:
-            raise HTTPException(status_code=404, detail="No stint data available for this session")
-
-        result = {
-            "session": {
-                "year": year,
-                "event": session.event["EventName"] if session.event is not None else event,
-                "name": session_type,
-            },
-            "total_laps": int(session.laps["LapNumber"].max()),
-            "drivers": drivers,
-        }
-
-        cache_manager.set(cache_key, result)
-        return result
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
+        return json_response(body, cache_key)
 
     except HTTPException:
         raise
@@ -160,12 +221,41 @@ async def get_session_stints(
         raise HTTPException(status_code=500, detail="Error fetching stints")
 
 
+def _fastest_laps(year: int, event: str, session_type: str, limit: int) -> dict:
+    session = load_session(year, event, session_type, LAPS)
+
+    laps = session.laps
+
+    # Filter out invalid laps
+    laps = laps[laps['LapTime'].notna()]
+
+    # Sort by lap time and get top N
+    fastest = laps.sort_values('LapTime').head(limit)
+
+    result = {
+        "session": {
+            "year": year,
+            "event": event,
+            "type": session_type,
+            "name": session.event['EventName']
+        },
+        "fastest_laps": fastest[[
+            'Driver', 'DriverNumber', 'Team', 'LapTime', 'LapNumber',
+            'Compound', 'TyreLife', 'Sector1Time', 'Sector2Time', 'Sector3Time',
+            'SpeedI1', 'SpeedI2', 'SpeedFL', 'SpeedST'
+        ]]
+    }
+
+    return result
+
+
 @router.get("/{year}/{event}/{session_type}/fastest")
 async def get_fastest_laps(
     year: int,
     event: str,
     session_type: str,
-    limit: int = Query(10, description="Number of fastest laps to return"),
+    limit: int = Query(FASTEST_LIMIT, description="Number of fastest laps to return"),
+    accept: Optional[str] = Header(None),
 ):
     """
     Get the fastest laps from a session
@@ -173,39 +263,21 @@ async def get_fastest_laps(
     Returns the top N fastest laps with driver info and lap details
     """
     try:
-        cache_key = f"fastest_laps_{year}_{event}_{session_type}_{limit}"
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        encoding = negotiate(accept)
+
+        cache_key = fastest_laps_key(year, event, session_type, limit, encoding)
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
-
-        session = load_session(year, event, session_type)
-
-        laps = session.laps
-
-        # Filter out invalid laps
-        laps = laps[laps['LapTime'].notna()]
+            return encoded_response(cached_data, encoding, cache_key)
 
-        # Sort by lap time and get top N
-        fastest = laps.sort_values('LapTime').head(limit)
+        body = await workers.run(build_encoded, encoding, "records", _fastest_laps, year, event, session_type, limit)
 
-        result = {
-            "session": {
-                "year": year,
-                "event": event,
-                "type": session_type,
-                "name": session.event['EventName']
-            },
-            "fastest_laps": records(fastest[[
-                'Driver', 'DriverNumber', 'Team', 'LapTime', 'LapNumber',
-                'Compound', 'TyreLife', 'Sector1Time', 'Sector2Time', 'Sector3Time',
-                'SpeedI1', 'SpeedI2', 'SpeedFL', 'SpeedST'
-            ]])
-        }
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
 
-        cache_manager.set(cache_key, result)
-
-        return result
+        return encoded_response(body, encoding, cache_key)
 
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
@@ -215,6 +287,55 @@ async def get_fastest_laps(
         raise HTTPException(status_code=500, detail="Error fetching fastest laps")
 
 
+def _driver_lap_analysis(year: int, event: str, session_type: str, driver: str) -> dict:
+    session = load_session(year, event, session_type, LAPS)
+
+    driver_laps = session.laps.pick_drivers(driver)
+
+    if driver_laps.empty:
+        raise HTTPException(status_code=404, detail=f"No laps found for driver {driver}")
+
+    # Calculate statistics
+    valid_laps = driver_laps[driver_laps['LapTime'].notna()]
+
+    fastest_lap = valid_laps.loc[valid_laps['LapTime'].idxmin()]
+
+    result = {
+        "driver": driver,
+        "team": str(driver_laps.iloc[0]['Team']),
+        "total_laps": len(driver_laps),
+        "valid_laps": len(valid_laps),
+        "fastest_lap": {
+            "lap_number": int(fastest_lap['LapNumber']),
+            "time": str(fastest_lap['LapTime']),
+            "compound": str(fastest_lap['Compound']) if pd.notna(fastest_lap['Compound']) else None,
+            "tyre_life": int(fastest_lap['TyreLife']) if pd.notna(fastest_lap['TyreLife']) else None
+        },
+        "average_lap_time": str(valid_laps['LapTime'].mean()) if not valid_laps.empty else None,
+        "consistency": {
+            "std_deviation": str(valid_laps['LapTime'].std()) if len(valid_laps) > 1 else None,
+        },
+        "sectors": {
+            "sector1_best": str(valid_laps['Sector1Time'].min()) if not valid_laps['Sector1Time'].isna().all() else None,
+            "sector2_best": str(valid_laps['Sector2Time'].min()) if not valid_laps['Sector2Time'].isna().all() else None,
+            "sector3_best": str(valid_laps['Sector3Time'].min()) if not valid_laps['Sector3Time'].isna().all() else None,
+        },
+        "top_speeds": {
+            "speed_i1": float(valid_laps['SpeedI1'].max()) if not valid_laps['SpeedI1'].isna().all() else None,
+            "speed_i2": float(valid_laps['SpeedI2'].max()) if not valid_laps['SpeedI2'].isna().all() else None,
+            "speed_fl": float(valid_laps['SpeedFL'].max()) if not valid_laps['SpeedFL'].isna().all() else None,
+            "speed_st": float(valid_laps['SpeedST'].max()) if not valid_laps['SpeedST'].isna().all() else None,
+        },
+        "tyre_stints": driver_laps.groupby('Stint').agg({
+            'Compound': 'first',
+            'TyreLife': 'max',
+            'LapNumber': ['min', 'max', 'count']
+        }).to_dict()
+    }
+
+    return result
+
+
 @router.get("/{year}/{event}/{session_type}/driver/{driver}/analysis")
 async def get_driver_lap_analysis(
     year: int,
@@ -228,60 +349,21 @@ async def get_driver_lap_analysis(
     Returns statistics and insights about the driver's performance
     """
     try:
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        driver = driver_key(driver)
+
         cache_key = f"lap_analysis_{year}_{event}_{session_type}_{driver}"
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
-
-        session = load_session(year, event, session_type)
-
-        driver_laps = session.laps.pick_drivers(driver)
-
-        if driver_laps.empty:
-            raise HTTPException(status_code=404, detail=f"No laps found for driver {driver}")
-
-        # Calculate statistics
-        valid_laps = driver_laps[driver_laps['LapTime'].notna()]
-
-        fastest_lap = valid_laps.loc[valid_laps['LapTime'].idxmin()]
-
-        result = {
-            "driver": driver,
-            "team": str(driver_laps.iloc[0]['Team']),
-            "total_laps": len(driver_laps),
-            "valid_laps": len(valid_laps),
-            "fastest_lap": {
-                "lap_number": int(fastest_lap['LapNumber']),
-                "time": str(fastest_lap['LapTime']),
-                "compound": str(fastest_lap['Compound']) if pd.notna(fastest_lap['Compound']) else None,
-                "tyre_life": int(fastest_lap['TyreLife']) if pd.notna(fastest_lap['TyreLife']) else None
-            },
-            "average_lap_time": str(valid_laps['LapTime'].mean()) if not valid_laps.empty else None,
-            "consistency": {
-                "std_deviation": str(valid_laps['LapTime'].std()) if len(valid_laps) > 1 else None,
-            },
-            "sectors": {
-                "sector1_best": str(valid_laps['Sector1Time'].min()) if not valid_laps['Sector1Time'].isna().all() else None,
-                "sector2_best": str(valid_laps['Sector2Time'].min()) if not valid_laps['Sector2Time'].isna().all() else None,
-                "sector3_best": str(valid_laps['Sector3Time'].min()) if not valid_laps['Sector3Time'].isna().all() else None,
-            },
-            "top_speeds": {
-                "speed_i1": float(valid_laps['SpeedI1'].max()) if not valid_laps['SpeedI1'].isna().all() else None,
-                "speed_i2": float(valid_laps['SpeedI2'].max()) if not valid_laps['SpeedI2'].isna().all() else None,
-                "speed_fl": float(valid_laps['SpeedFL'].max()) if not valid_laps['SpeedFL'].isna().all() else None,
-                "speed_st": float(valid_laps['SpeedST'].max()) if not valid_laps['SpeedST'].isna().all() else None,
-            },
-            "tyre_stints": driver_laps.groupby('Stint').agg({
-                'Compound': 'first',
-                'TyreLife': 'max',
-                'LapNumber': ['min', 'max', 'count']
-            }).to_dict()
-        }
-
-        cache_manager.set(cache_key, result)
-
-        return result
+            return json_response(cached_data, cache_key)
+
+        body = await workers.run(build_json, _driver_lap_analysis, year, event, session_type, driver)
+
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
+
+        return json_response(body, cache_key)
 
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
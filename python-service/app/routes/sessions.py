@@ -4,18 +4,40 @@ Session and event information endpoints
 import logging
 
 from fastapi import APIRouter, HTTPException
-import fastf1
 from app.utils.cache_manager import cache_manager
 from app.utils.classification import build_classification, from_results
-from app.utils.serialization import records, scalar
-from app.utils.events import event_key
-from app.utils.loading import load_session
+from app.utils.serialization import build_json, json_response, records, scalar
+from app.utils.events import canonical_event, event_index, session_type_key
+from app.utils.loading import LAPS, load_session
+from app.utils.workers import workers
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+# Cache keys, one builder per route: the bundle looks up the same entries.
+
+def session_info_key(year: int, event, session_type: str) -> str:
+    return f"session_info_{year}_{event}_{session_type}"
+
+
+def classification_key(year: int, event, session_type: str) -> str:
+    return f"classification_{year}_{event}_{session_type}"
+
+
+def _season_schedule(year: int) -> dict:
+    schedule = event_index.schedule(year)
+
+    result = {
+        "year": year,
+        "total_events": len(schedule),
+        "events": records(schedule)
+    }
+
+    return result
+
+
 @router.get("/{year}")
 async def get_season_schedule(year: int):
     """
@@ -28,19 +50,13 @@ async def get_season_schedule(year: int):
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
-
-        schedule = fastf1.get_event_schedule(year)
+            return json_response(cached_data, cache_key)
 
-        result = {
-            "year": year,
-            "total_events": len(schedule),
-            "events": records(schedule)
-        }
+        body = await workers.run(build_json, _season_schedule, year)
 
-        cache_manager.set(cache_key, result)
+        cache_manager.set(cache_key, body)
 
-        return result
+        return json_response(body, cache_key)
 
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
@@ -50,6 +66,29 @@ async def get_season_schedule(year: int):
         raise HTTPException(status_code=500, detail="Error fetching schedule")
 
 
+def _event_info(year: int, event: str | int) -> dict:
+    # The event arrives already resolved by the index: a round number, or a
+    # name it could not place, which FastF1 still gets to try.
+    schedule = event_index.schedule(year)
+    try:
+        if isinstance(event, int):
+            event_data = schedule.get_event_by_round(event)
+        else:
+            event_data = schedule.get_event_by_name(event)
+    except ValueError:
+        event_data = None
+
+    if event_data is None:
+        raise HTTPException(status_code=404, detail=f"No hay un evento {event} en {year}")
+
+    result = {
+        "year": year,
+        "event": event_data.to_dict()
+    }
+
+    return result
+
+
 @router.get("/{year}/{event}")
 async def get_event_info(year: int, event: str):
     """
@@ -58,22 +97,20 @@ async def get_event_info(year: int, event: str):
     Returns event details including all sessions
     """
     try:
+        # Equivalent URLs ("8", "Monaco", "monaco") share one cache entry.
+        event = await canonical_event(year, event)
+
         cache_key = f"event_{year}_{event}"
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
-
-        event_data = fastf1.get_event(year, event)
+            return json_response(cached_data, cache_key)
 
-        result = {
-            "year": year,
-            "event": event_data.to_dict()
-        }
+        body = await workers.run(build_json, _event_info, year, event)
 
-        cache_manager.set(cache_key, result)
+        cache_manager.set(cache_key, body)
 
-        return result
+        return json_response(body, cache_key)
 
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
@@ -83,6 +120,28 @@ async def get_event_info(year: int, event: str):
         raise HTTPException(status_code=500, detail="Error fetching event")
 
 
+def _session_info(year: int, event: str, session_type: str) -> dict:
+    # With the laps: for a session that has only just finished, FastF1 works
+    # the results out from them until the official ones are published.
+    session = load_session(year, event, session_type, LAPS)
+
+    # Get session results
+    results = session.results if hasattr(session, 'results') else None
+
+    result = {
+        "session": {
+            "name": session.name,
+            "date": str(session.date),
+            "event": session.event['EventName'],
+            "location": session.event['Location'],
+            "country": session.event['Country'],
+        },
+        "results": records(results) if results is not None and not results.empty else []
+    }
+
+    return result
+
+
 @router.get("/{year}/{event}/{session_type}/info")
 async def get_session_info(year: int, event: str, session_type: str):
     """
@@ -91,31 +150,20 @@ async def get_session_info(year: int, event: str, session_type: str):
     Returns session metadata and results
     """
     try:
-        cache_key = f"session_info_{year}_{event}_{session_type}"
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+
+        cache_key = session_info_key(year, event, session_type)
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
+            return json_response(cached_data, cache_key)
 
-        session = load_session(year, event, session_type)
+        body = await workers.run(build_json, _session_info, year, event, session_type)
 
-        # Get session results
-        results = session.results if hasattr(session, 'results') else None
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
 
-        result = {
-            "session": {
-                "name": session.name,
-                "date": str(session.date),
-                "event": session.event['EventName'],
-                "location": session.event['Location'],
-                "country": session.event['Country'],
-            },
-            "results": records(results) if results is not None and not results.empty else []
-        }
-
-        cache_manager.set(cache_key, result)
-
-        return result
+        return json_response(body, cache_key)
 
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
@@ -125,6 +173,57 @@ async def get_session_info(year: int, event: str, session_type: str):
         raise HTTPException(status_code=500, detail="Error fetching session info")
 
 
+def _qualifying_classification(year: int, event: str, session_type: str) -> dict:
+    # The messages are not optional here: deleted laps live in them, and
+    # without them FastF1 refuses to work out the order —"missing
+    # information about deleted laps"— and a lap cancelled for track limits
+    # would still count towards the grid.
+    session = load_session(year, event, session_type, LAPS)
+
+    # Names and teams come from the results table, which FastF1 fills from
+    # the entry list even when the finishing positions are still empty.
+    details = {}
+    results = getattr(session, "results", None)
+    if results is not None and not results.empty:
+        for _, row in results.iterrows():
+            code = row.get("Abbreviation")
+            if not code:
+                continue
+            details[code] = {
+                "driverName": row.get("FullName") or code,
+                "team": row.get("TeamName") or None,
+                "number": scalar(row.get("DriverNumber")),
+            }
+
+    segments = session.laps.split_qualifying_sessions()
+
+    # FastF1's own classification first; the banding by segment is only the
+    # fallback for a session it could not work out.
+    classification = from_results(getattr(session, "results", None))
+    rebuilt = not classification
+
+    if rebuilt:
+        classification = build_classification(segments, details)
+
+    result = {
+        "year": year,
+        "event": event,
+        "session": session.name,
+        "session_type": session_type,
+        "segments": sum(
+            1 for segment in segments if segment is not None and not segment.empty
+        ),
+        # Said out loud so the page can say it too: this is rebuilt from
+        # timing, and grid penalties are applied afterwards by the FIA.
+        "provisional": True,
+        # Whether this came from FastF1's own ordering or from our fallback.
+        "rebuilt": rebuilt,
+        "classification": classification,
+    }
+
+    return result
+
+
 @router.get("/{year}/{event}/{session_type}/classification")
 async def get_qualifying_classification(year: int, event: str, session_type: str):
     """
@@ -145,63 +244,20 @@ async def get_qualifying_classification(year: int, event: str, session_type: str
     rather than silently vanishing from the grid.
     """
     try:
-        cache_key = f"classification_{year}_{event}_{session_type}"
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+
+        cache_key = classification_key(year, event, session_type)
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
-
-        session = fastf1.get_session(year, event_key(event), session_type)
-        # The messages are not optional here: deleted laps live in them, and
-        # without them FastF1 refuses to work out the order —"missing
-        # information about deleted laps"— and a lap cancelled for track limits
-        # would still count towards the grid.
-        session.load(telemetry=False, weather=False, messages=True)
-
-        # Names and teams come from the results table, which FastF1 fills from
-        # the entry list even when the finishing positions are still empty.
-        details = {}
-        results = getattr(session, "results", None)
-        if results is not None and not results.empty:
-            for _, row in results.iterrows():
-                code = row.get("Abbreviation")
-                if not code:
-                    continue
-                details[code] = {
-                    "driverName": row.get("FullName") or code,
-                    "team": row.get("TeamName") or None,
-                    "number": scalar(row.get("DriverNumber")),
-                }
-
-        segments = session.laps.split_qualifying_sessions()
-
-        # FastF1's own classification first; the banding by segment is only the
-        # fallback for a session it could not work out.
-        classification = from_results(getattr(session, "results", None))
-        rebuilt = not classification
-
-        if rebuilt:
-            classification = build_classification(segments, details)
-
-        result = {
-            "year": year,
-            "event": event,
-            "session": session.name,
-            "session_type": session_type,
-            "segments": sum(
-                1 for segment in segments if segment is not None and not segment.empty
-            ),
-            # Said out loud so the page can say it too: this is rebuilt from
-            # timing, and grid penalties are applied afterwards by the FIA.
-            "provisional": True,
-            # Whether this came from FastF1's own ordering or from our fallback.
-            "rebuilt": rebuilt,
-            "classification": classification,
-        }
-
-        cache_manager.set(cache_key, result)
-
-        return result
+            return json_response(cached_data, cache_key)
+
+        body = await workers.run(build_json, _qualifying_classification, year, event, session_type)
+
+        cache_manager.set(cache_key, body, session=(year, event, session_type), provisional=True)
+
+        return json_response(body, cache_key)
 
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
@@ -1,22 +1,98 @@
 """
 Telemetry endpoints - Speed, RPM, Throttle, Brake, etc.
 """
+import asyncio
 import logging
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query
 from typing import Optional
-import fastf1
+import numpy as np
 import pandas as pd
+from app.utils.alignment import align_laps, align_many, delta_seconds
 from app.utils.cache_manager import cache_manager
-from app.utils.serialization import records, format_lap_time
+from app.utils.dominance import dominance, point_sectors, sector_times
+from app.utils.encodings import JSON, build_encoded, cache_suffix, encoded_response, negotiate
+from app.utils.projection import (
+    CHANNELS_DESCRIPTION, METHOD_DESCRIPTION, POINTS_DESCRIPTION, PRECISION_DESCRIPTION,
+    parse_channels, project, projection_key,
+)
+from app.utils.serialization import build_json, columns, format_lap_time, json_response
+from app.utils.streaming import ndjson_line, ndjson_response
 from app.utils.track import track_points
-from app.utils.events import event_key
-from app.utils.loading import load_session
+from app.utils.events import canonical_event, driver_key, session_type_key
+from app.utils.loading import LAPS, load_session
+from app.utils.session_workers import circuit_rotation, lap_telemetry, session_drivers
+from app.utils.workers import workers
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+FORMAT_DESCRIPTION = (
+    "records: one object per sample. columnar: one array per channel "
+    "(Speed, RPM, nGear...), several times smaller"
+)
+ALIGN_DESCRIPTION = (
+    "Resample both laps on the same distances (`points` of them, if given) and add a "
+    "delta-time trace: driver1's time minus driver2's at each distance, in seconds"
+)
+
+# More laps than this is no longer a chart anyone can read.
+MAX_OVERLAY_LAPS = 10
+
+
+def _compare_drivers(
+    year: int,
+    event: str,
+    session_type: str,
+    driver1: str,
+    driver2: str,
+    lap1: Optional[int],
+    lap2: Optional[int],
+    format: str = "records",
+    channels: Optional[tuple] = None,
+    precision: Optional[int] = None,
+    points: Optional[int] = None,
+    method: str = "lttb",
+    align: bool = False,
+) -> dict:
+    lap_d1, tel_d1 = lap_telemetry(year, event, session_type, driver1, lap1 or None)
+    lap_d2, tel_d2 = lap_telemetry(year, event, session_type, driver2, lap2 or None)
+    if align:
+        # Aligned before the cut: the delta needs Time whatever channels were asked.
+        tel_d1, tel_d2, delta = align_laps(tel_d1, tel_d2, points)
+        # One Distance for the three frames, the one in `delta`.
+        tel_d1 = project(tel_d1, channels, precision).drop(columns="Distance")
+        tel_d2 = project(tel_d2, channels, precision).drop(columns="Distance")
+        # Thousandths, like the lap times, unless asked for fewer.
+        delta = project(delta, None, 3 if precision is None else precision)
+    else:
+        tel_d1 = project(tel_d1, channels, precision, points, method)
+        tel_d2 = project(tel_d2, channels, precision, points, method)
+
+    result = {
+        "driver1": {
+            "code": driver1,
+            "lap_number": int(lap_d1['LapNumber']),
+            "lap_time": format_lap_time(lap_d1['LapTime']),
+            "compound": str(lap_d1['Compound']) if pd.notna(lap_d1['Compound']) else None,
+            "telemetry": tel_d1
+        },
+        "driver2": {
+            "code": driver2,
+            "lap_number": int(lap_d2['LapNumber']),
+            "lap_time": format_lap_time(lap_d2['LapTime']),
+            "compound": str(lap_d2['Compound']) if pd.notna(lap_d2['Compound']) else None,
+            "telemetry": tel_d2
+        },
+        "delta_time": format_lap_time(lap_d1['LapTime'] - lap_d2['LapTime']),
+        "format": format,
+    }
+    if align:
+        result["delta"] = delta
+
+    return result
+
 
 # NOTE: this literal route must stay declared BEFORE /{year}/{event}/{session_type}/{driver},
 # otherwise Starlette matches "compare" as a driver code and the comparison never runs.
@@ -29,76 +105,54 @@ async def compare_drivers_telemetry(
     driver2: str = Query(..., description="Second driver code"),
     lap1: Optional[int] = Query(None, description="Lap for driver1 (fastest if omitted)"),
     lap2: Optional[int] = Query(None, description="Lap for driver2 (fastest if omitted)"),
+    format: str = Query("records", pattern="^(records|columnar)$", description=FORMAT_DESCRIPTION),
+    channels: Optional[str] = Query(None, description=CHANNELS_DESCRIPTION),
+    precision: Optional[int] = Query(None, ge=0, le=6, description=PRECISION_DESCRIPTION),
+    points: Optional[int] = Query(None, ge=10, le=10000, description=POINTS_DESCRIPTION),
+    method: str = Query("lttb", pattern="^(lttb|grid)$", description=METHOD_DESCRIPTION),
+    align: bool = Query(False, description=ALIGN_DESCRIPTION),
+    accept: Optional[str] = Header(None),
 ):
     """
     Compare telemetry data between two drivers
 
-    Returns synchronized telemetry data for both drivers to allow direct comparison
+    Returns synchronized telemetry data for both drivers to allow direct comparison.
+    With `align`, both laps come on the same distances, row for row, with the
+    delta-time trace between them in `delta`.
     """
     try:
-        cache_key = f"compare_{year}_{event}_{session_type}_{driver1}_{driver2}_{lap1}_{lap2}"
+        # Equivalent URLs ("8", "Monaco", "monaco") share one cache entry.
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        driver1, driver2 = driver_key(driver1), driver_key(driver2)
+        channels = parse_channels(channels)
+        encoding = negotiate(accept)
+        # Binary encodings are columnar whatever was asked.
+        if encoding != JSON:
+            format = "columnar"
+
+        # Aligned laps are resampled on distance, whatever the method: it is
+        # left out of the key so both spellings share one entry.
+        cache_key = (
+            f"compare_{year}_{event}_{session_type}_{driver1}_{driver2}_{lap1}_{lap2}_{format}"
+            f"_{projection_key(channels, precision, points, '' if align else method)}"
+            f"{'_aligned' if align else ''}{cache_suffix(encoding)}"
+        )
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
+            return encoded_response(cached_data, encoding, cache_key)
 
-        session = load_session(year, event, session_type)
+        body = await workers.run(
+            build_encoded, encoding, format,
+            _compare_drivers, year, event, session_type, driver1, driver2, lap1, lap2, format,
+            channels, precision, points, method, align,
+        )
 
-        laps_d1 = session.laps.pick_drivers(driver1)
-        laps_d2 = session.laps.pick_drivers(driver2)
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
 
-        if laps_d1.empty or laps_d2.empty:
-            raise HTTPException(status_code=404, detail="Laps not found for one or both drivers")
+        return encoded_response(body, encoding, cache_key)
 
-        if lap1:
-            target_d1 = laps_d1[laps_d1['LapNumber'] == lap1]
-            if target_d1.empty:
-                raise HTTPException(status_code=404, detail=f"Lap {lap1} not found for driver {driver1}")
-            lap_d1 = target_d1.iloc[0]
-        else:
-            # pick_fastest() already returns a single Lap (or None); indexing it
-            # with .iloc[0] would yield that lap's first column instead.
-            lap_d1 = laps_d1.pick_fastest()
-            if lap_d1 is None:
-                raise HTTPException(status_code=404, detail=f"No timed lap found for driver {driver1}")
-
-        if lap2:
-            target_d2 = laps_d2[laps_d2['LapNumber'] == lap2]
-            if target_d2.empty:
-                raise HTTPException(status_code=404, detail=f"Lap {lap2} not found for driver {driver2}")
-            lap_d2 = target_d2.iloc[0]
-        else:
-            lap_d2 = laps_d2.pick_fastest()
-            if lap_d2 is None:
-                raise HTTPException(status_code=404, detail=f"No timed lap found for driver {driver2}")
-
-        tel_d1 = lap_d1.get_telemetry()
-        tel_d2 = lap_d2.get_telemetry()
-
-        result = {
-            "driver1": {
-                "code": driver1,
-                "lap_number": int(lap_d1['LapNumber']),
-                "lap_time": format_lap_time(lap_d1['LapTime']),
-                "compound": str(lap_d1['Compound']) if pd.notna(lap_d1['Compound']) else None,
-                "telemetry": records(tel_d1)
-            },
-            "driver2": {
-                "code": driver2,
-                "lap_number": int(lap_d2['LapNumber']),
-                "lap_time": format_lap_time(lap_d2['LapTime']),
-                "compound": str(lap_d2['Compound']) if pd.notna(lap_d2['Compound']) else None,
-                "telemetry": records(tel_d2)
-            },
-            "delta_time": format_lap_time(lap_d1['LapTime'] - lap_d2['LapTime'])
-        }
-
-        cache_manager.set(cache_key, result)
-
-        return result
-
-    except HTTPException:
-        raise
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
         raise
@@ -107,77 +161,442 @@ async def compare_drivers_telemetry(
         raise HTTPException(status_code=500, detail="Error comparing telemetry")
 
 
-@router.get("/{year}/{event}/{session_type}/{driver}/track")
-async def get_driver_track(
+def _export_laps(
+    year: int, event: str, session_type: str, drivers: Optional[list[str]], laps: str
+) -> list[tuple[str, int]]:
+    """(driver, lap number) of every lap an export will send, in order."""
+    session = load_session(year, event, session_type, LAPS)
+
+    table = session.laps
+    if drivers:
+        table = table.pick_drivers(drivers)
+    table = table[table["LapNumber"].notna()]
+
+    if laps == "fastest":
+        fastest = [table.pick_drivers(driver).pick_fastest() for driver in table["Driver"].unique()]
+        selected = [(str(lap["Driver"]), int(lap["LapNumber"])) for lap in fastest if lap is not None]
+    else:
+        selected = [
+            (str(driver), int(lap_number))
+            for driver, lap_number in zip(table["Driver"], table["LapNumber"])
+        ]
+
+    if not selected:
+        raise HTTPException(status_code=404, detail="No laps found")
+
+    return selected
+
+
+def _export_line(
     year: int,
     event: str,
     session_type: str,
     driver: str,
-    lap: Optional[int] = Query(None, description="Specific lap number. If not provided, uses fastest lap"),
+    lap: int,
+    channels: Optional[tuple],
+    precision: Optional[int],
+) -> bytes:
+    line = {"driver": driver, "lap_number": lap}
+
+    try:
+        lap_data, telemetry = lap_telemetry(year, event, session_type, driver, lap)
+        line["lap_time"] = format_lap_time(lap_data["LapTime"])
+        line["telemetry"] = columns(project(telemetry, channels, precision))
+    except Exception:
+        # Una vuelta sin telemetría (una entrada a boxes sin datos) no corta
+        # la exportación: su línea lo dice y se sigue con la siguiente.
+        logger.warning("No telemetry for %s lap %s in %s %s %s", driver, lap, year, event, session_type)
+        line["telemetry"] = None
+
+    return ndjson_line(line)
+
+
+async def _export_lines(
+    header: dict,
+    selected: list,
+    year: int,
+    event: str,
+    session_type: str,
+    channels: Optional[tuple],
+    precision: Optional[int],
+):
+    yield ndjson_line(header)
+
+    for driver, lap in selected:
+        while True:
+            try:
+                yield await workers.run(
+                    _export_line, year, event, session_type, driver, lap, channels, precision
+                )
+                break
+            except HTTPException as error:
+                # The 200 is already sent; a busy pool is waited out instead.
+                if error.status_code != 503:
+                    raise
+                await asyncio.sleep(1)
+
+
+# NOTE: like /compare, declared BEFORE /{year}/{event}/{session_type}/{driver}.
+@router.get("/{year}/{event}/{session_type}/export")
+async def export_session_telemetry(
+    year: int,
+    event: str,
+    session_type: str,
+    drivers: Optional[str] = Query(None, description="Comma-separated driver codes. All if omitted"),
+    laps: str = Query("all", pattern="^(all|fastest)$", description="Every lap, or each driver's fastest"),
+    channels: Optional[str] = Query(None, description=CHANNELS_DESCRIPTION),
+    precision: Optional[int] = Query(None, ge=0, le=6, description=PRECISION_DESCRIPTION),
 ):
     """
-    Trazado del circuito recorrido por un piloto, con la velocidad en cada punto.
+    Telemetry of every driver's laps, streamed as NDJSON
 
-    Es el mapa de velocidad que faltaba del Sprint 4. Devuelve las coordenadas
-    tal y como las graba FastF1, sin girar ni escalar: la rotación del circuito
-    viaja aparte para que la dibuje quien conoce el tamaño del lienzo.
+    The first line describes the export; then one line per lap, in columnar
+    form, sent as each lap's telemetry is ready. Memory holds one lap at a
+    time however long the session is. Not cached.
     """
     try:
-        cache_key = f"track_{year}_{event}_{session_type}_{driver}_{lap}"
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        channels = parse_channels(channels)
+        if drivers:
+            drivers = sorted({driver_key(code) for code in drivers.split(",") if code.strip()})
+
+        selected = await workers.run(_export_laps, year, event, session_type, drivers or None, laps)
+
+        header = {
+            "session": {"year": year, "event": event, "type": session_type},
+            "drivers": sorted({driver for driver, _ in selected}),
+            "laps": len(selected),
+            "format": "columnar",
+            "channels": list(channels) if channels else None,
+        }
+        return ndjson_response(
+            _export_lines(header, selected, year, event, session_type, channels, precision)
+        )
+
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error exporting telemetry")
+        raise HTTPException(status_code=500, detail="Error exporting telemetry")
+
+
+def _parse_selections(laps: str) -> list[tuple[str, Optional[int]]]:
+    """`VER,LEC:12` -> [("VER", None), ("LEC", 12)]: a driver's fastest lap, or the one given."""
+    selections = []
+    for item in laps.split(","):
+        if not item.strip():
+            continue
+        driver, _, lap = item.partition(":")
+        try:
+            selection = (driver_key(driver), int(lap) if lap.strip() else None)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Vuelta no válida: {item.strip()}")
+        if not selection[0]:
+            raise HTTPException(status_code=400, detail=f"Vuelta no válida: {item.strip()}")
+        if selection not in selections:
+            selections.append(selection)
+
+    if not selections:
+        raise HTTPException(status_code=400, detail="No se ha pedido ninguna vuelta")
+    if len(selections) > MAX_OVERLAY_LAPS:
+        raise HTTPException(
+            status_code=400, detail=f"Como mucho {MAX_OVERLAY_LAPS} vueltas a la vez"
+        )
+
+    return selections
+
+
+def _overlay(
+    year: int,
+    event: str,
+    session_type: str,
+    selections: list[tuple[str, Optional[int]]],
+    reference: int,
+    format: str = "records",
+    channels: Optional[tuple] = None,
+    precision: Optional[int] = None,
+    points: Optional[int] = None,
+) -> dict:
+    # Each lap's telemetry once, from the one session the pool keeps warm.
+    laps = [lap_telemetry(year, event, session_type, driver, lap) for driver, lap in selections]
+    grid, aligned = align_many([telemetry for _, telemetry in laps], points)
+
+    # "VER" and "VER:14" can be the same lap; it is sent once.
+    labels = [
+        f"{driver}_{int(lap_data['LapNumber'])}" for (driver, _), (lap_data, _) in zip(selections, laps)
+    ]
+    result = {"reference": labels[reference], "laps": {}}
+    for label, (driver, _), (lap_data, _), telemetry in zip(labels, selections, laps, aligned):
+        if label in result["laps"]:
+            continue
+        delta = delta_seconds(telemetry, aligned[reference])
+        telemetry = project(telemetry, channels, precision).drop(columns="Distance")
+        # Thousandths, like the lap times, unless asked for fewer.
+        telemetry["Delta"] = np.round(delta, 3 if precision is None else precision)
+
+        result["laps"][label] = {
+            "code": driver,
+            "lap_number": int(lap_data['LapNumber']),
+            "lap_time": format_lap_time(lap_data['LapTime']),
+            "compound": str(lap_data['Compound']) if pd.notna(lap_data['Compound']) else None,
+            "telemetry": telemetry,
+        }
+
+    result["distance"] = project(pd.DataFrame({"Distance": grid}), None, precision)
+    result["format"] = format
+    return result
+
+
+# NOTE: like /compare, declared BEFORE /{year}/{event}/{session_type}/{driver}.
+@router.get("/{year}/{event}/{session_type}/overlay")
+async def overlay_telemetry(
+    year: int,
+    event: str,
+    session_type: str,
+    laps: str = Query(
+        ..., description="Comma-separated laps: a driver code for its fastest lap, or DRIVER:LAP "
+        "(e.g. VER,LEC,NOR:14)",
+    ),
+    reference: Optional[str] = Query(
+        None, description="The lap the deltas are measured against, as given in `laps`. The first if omitted",
+    ),
+    format: str = Query("records", pattern="^(records|columnar)$", description=FORMAT_DESCRIPTION),
+    channels: Optional[str] = Query(None, description=CHANNELS_DESCRIPTION),
+    precision: Optional[int] = Query(None, ge=0, le=6, description=PRECISION_DESCRIPTION),
+    points: Optional[int] = Query(None, ge=10, le=10000, description=POINTS_DESCRIPTION),
+    accept: Optional[str] = Header(None),
+):
+    """
+    Telemetry of several laps on the same distances, with deltas to one of them
+
+    What the pairwise /compare does for two laps, for up to ten: each lap's
+    telemetry is computed once, all of them are resampled on one distance
+    grid, and each carries a `Delta` channel against the reference lap.
+    """
+    try:
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        selections = _parse_selections(laps)
+        if reference is None:
+            reference_index = 0
+        else:
+            wanted = _parse_selections(reference)[0]
+            if wanted not in selections:
+                raise HTTPException(
+                    status_code=400, detail="La referencia tiene que ser una de las vueltas pedidas"
+                )
+            reference_index = selections.index(wanted)
+        channels = parse_channels(channels)
+        encoding = negotiate(accept)
+        if encoding != JSON:
+            format = "columnar"
+
+        selected = "-".join(f"{driver}:{lap}" if lap else driver for driver, lap in selections)
+        cache_key = (
+            f"overlay_{year}_{event}_{session_type}_{selected}_{reference_index}_{format}"
+            f"_{projection_key(channels, precision, points, 'grid')}{cache_suffix(encoding)}"
+        )
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
+            return encoded_response(cached_data, encoding, cache_key)
 
-        session = load_session(year, event, session_type)
+        body = await workers.run(
+            build_encoded, encoding, format,
+            _overlay, year, event, session_type, selections, reference_index, format,
+            channels, precision, points,
+        )
 
-        driver_laps = session.laps.pick_drivers(driver)
-        if driver_laps.empty:
-            raise HTTPException(status_code=404, detail=f"No laps found for driver {driver}")
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
 
-        if lap is not None:
-            target_lap = driver_laps[driver_laps["LapNumber"] == lap]
-            if target_lap.empty:
-                raise HTTPException(status_code=404, detail=f"Lap {lap} not found for driver {driver}")
-            lap_data = target_lap.iloc[0]
-        else:
-            lap_data = driver_laps.pick_fastest()
-            if lap_data is None:
-                raise HTTPException(status_code=404, detail=f"No timed lap found for driver {driver}")
+        return encoded_response(body, encoding, cache_key)
 
-        telemetry = lap_data.get_telemetry()
-        points = track_points(telemetry)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error overlaying telemetry")
+        raise HTTPException(status_code=500, detail="Error overlaying telemetry")
 
-        if not points:
-            # Las sesiones anteriores a 2018 no traen posición: es un "no hay",
-            # no un fallo del servicio.
-            raise HTTPException(status_code=404, detail="No position data available for this lap")
 
-        speeds = [p["speed"] for p in points]
+def _dominance(
+    year: int, event: str, session_type: str, drivers: Optional[list[str]], sectors: int
+) -> dict:
+    codes = drivers or session_drivers(year, event, session_type)
 
-        # La rotación es opcional: si FastF1 no la trae, el mapa se dibuja sin
-        # girar en vez de no dibujarse.
+    laps = []
+    for code in codes:
         try:
-            rotation = float(session.get_circuit_info().rotation)
+            lap_data, telemetry = lap_telemetry(year, event, session_type, code, None)
         except Exception:
-            logger.warning("Circuit rotation unavailable for %s %s", year, event)
-            rotation = 0.0
-
-        result = {
-            "driver": driver,
-            "lap_number": int(lap_data["LapNumber"]),
-            "lap_time": format_lap_time(lap_data["LapTime"]),
-            "rotation": rotation,
-            "min_speed": min(speeds),
-            "max_speed": max(speeds),
-            "points": points,
-        }
+            # Quien no marcó vuelta, o no tiene datos de coche o de posición,
+            # no gana ningún minisector, pero el mapa del resto se dibuja igual.
+            logger.warning("No dominance lap for %s in %s %s %s", code, year, event, session_type)
+            continue
+        if pd.notna(lap_data["LapTime"]):
+            laps.append((code, lap_data, telemetry))
+
+    if not laps:
+        raise HTTPException(status_code=404, detail="No timed laps found")
+
+    laps.sort(key=lambda item: item[1]["LapTime"])
+    times = np.vstack([sector_times(telemetry, sectors) for _, _, telemetry in laps])
+    winner, best, margin = dominance(times)
+    won = np.bincount(winner[winner >= 0], minlength=len(laps))
+
+    # Drawn on the fastest lap, with the points of the track map.
+    points = track_points(laps[0][2])
+    if points and points[0]["distance"] is not None:
+        for point, sector in zip(points, point_sectors([p["distance"] for p in points], sectors)):
+            point["sector"] = int(sector)
+
+    result = {
+        "session": {"year": year, "event": event, "type": session_type},
+        "sectors": sectors,
+        "reference": laps[0][0],
+        "rotation": circuit_rotation(year, event, session_type),
+        "drivers": [
+            {
+                "code": code,
+                "lap_number": int(lap_data["LapNumber"]),
+                "lap_time": format_lap_time(lap_data["LapTime"]),
+                "sectors_won": int(count),
+            }
+            for (code, lap_data, _), count in zip(laps, won)
+        ],
+        "mini_sectors": [
+            {
+                "sector": sector,
+                "driver": laps[row][0] if row >= 0 else None,
+                "time": round(float(time), 3) if np.isfinite(time) else None,
+                "margin": round(float(gap), 3) if np.isfinite(gap) else None,
+            }
+            for sector, (row, time, gap) in enumerate(zip(winner.tolist(), best, margin))
+        ],
+        "points": points,
+    }
+
+    return result
+
+
+# NOTE: like /compare, declared BEFORE /{year}/{event}/{session_type}/{driver}.
+@router.get("/{year}/{event}/{session_type}/dominance")
+async def get_track_dominance(
+    year: int,
+    event: str,
+    session_type: str,
+    sectors: int = Query(25, ge=3, le=200, description="Mini-sectors to split the lap into"),
+    drivers: Optional[str] = Query(None, description="Comma-separated driver codes. All if omitted"),
+):
+    """
+    Quién fue más rápido en cada tramo del circuito.
 
-        cache_manager.set(cache_key, result)
-        return result
+    La vuelta más rápida de cada piloto, cortada en `sectors` minisectores de
+    igual longitud: de cada uno se da quién lo hizo en menos tiempo y por
+    cuánto, y el trazado de la vuelta más rápida con el minisector de cada
+    punto, para colorearlo. Lo que antes eran veinte peticiones de telemetría.
+    """
+    try:
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        if drivers:
+            drivers = sorted({driver_key(code) for code in drivers.split(",") if code.strip()})
+
+        cache_key = (
+            f"dominance_{year}_{event}_{session_type}_{sectors}_{'-'.join(drivers) if drivers else 'all'}"
+        )
+
+        cached_data = cache_manager.get(cache_key)
+        if cached_data is not None:
+            return json_response(cached_data, cache_key)
+
+        body = await workers.run(build_json, _dominance, year, event, session_type, drivers or None, sectors)
+
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
+
+        return json_response(body, cache_key)
 
     except HTTPException:
         raise
+    except Exception:
+        logger.exception("Error computing track dominance")
+        raise HTTPException(status_code=500, detail="Error computing track dominance")
+
+
+def _driver_track(
+    year: int,
+    event: str,
+    session_type: str,
+    driver: str,
+    lap: Optional[int],
+    tolerance: Optional[float] = None,
+) -> dict:
+    lap_data, telemetry = lap_telemetry(year, event, session_type, driver, lap)
+    points = track_points(telemetry, tolerance=tolerance)
+
+    if not points:
+        # Las sesiones anteriores a 2018 no traen posición: es un "no hay",
+        # no un fallo del servicio.
+        raise HTTPException(status_code=404, detail="No position data available for this lap")
+
+    speeds = [p["speed"] for p in points]
+
+    rotation = circuit_rotation(year, event, session_type)
+
+    result = {
+        "driver": driver,
+        "lap_number": int(lap_data["LapNumber"]),
+        "lap_time": format_lap_time(lap_data["LapTime"]),
+        "rotation": rotation,
+        "min_speed": min(speeds),
+        "max_speed": max(speeds),
+        "points": points,
+    }
+
+    return result
+
+
+@router.get("/{year}/{event}/{session_type}/{driver}/track")
+async def get_driver_track(
+    year: int,
+    event: str,
+    session_type: str,
+    driver: str,
+    lap: Optional[int] = Query(None, description="Specific lap number. If not provided, uses fastest lap"),
+    tolerance: Optional[float] = Query(
+        None, gt=0, le=100,
+        description="Simplify by shape: keep the points that stray more than this many metres "
+        "from the line (e.g. 2). Evenly spaced points if omitted",
+    ),
+):
+    """
+    Trazado del circuito recorrido por un piloto, con la velocidad en cada punto.
+
+    Es el mapa de velocidad que faltaba del Sprint 4. Devuelve las coordenadas
+    tal y como las graba FastF1, sin girar ni escalar: la rotación del circuito
+    viaja aparte para que la dibuje quien conoce el tamaño del lienzo.
+
+    Con `tolerance` los puntos se reparten por la forma del trazado —pocos en
+    las rectas, muchos en las curvas— en vez de a paso fijo.
+    """
+    try:
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        driver = driver_key(driver)
+
+        cache_key = f"track_{year}_{event}_{session_type}_{driver}_{lap}"
+        if tolerance is not None:
+            cache_key += f"_rdp{tolerance:g}"
+
+        cached_data = cache_manager.get(cache_key)
+        if cached_data is not None:
+            return json_response(cached_data, cache_key)
+
+        body = await workers.run(build_json, _driver_track, year, event, session_type, driver, lap, tolerance)
+
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
+        return json_response(body, cache_key)
+
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
         raise
@@ -186,6 +605,41 @@ async def get_driver_track(
         raise HTTPException(status_code=500, detail="Error fetching track map")
 
 
+def _driver_telemetry(
+    year: int,
+    event: str,
+    session_type: str,
+    driver: str,
+    lap: Optional[int],
+    format: str = "records",
+    channels: Optional[tuple] = None,
+    precision: Optional[int] = None,
+    points: Optional[int] = None,
+    method: str = "lttb",
+) -> dict:
+    # Get specific lap or fastest lap, with its telemetry
+    lap_data, telemetry = lap_telemetry(year, event, session_type, driver, lap)
+
+    if telemetry.empty:
+        raise HTTPException(status_code=404, detail="No telemetry data available for this lap")
+
+    telemetry = project(telemetry, channels, precision, points, method)
+
+    # Convert to dict
+    result = {
+        "driver": driver,
+        "lap_number": int(lap_data['LapNumber']),
+        "lap_time": format_lap_time(lap_data['LapTime']),
+        "is_personal_best": bool(lap_data['IsPersonalBest']),
+        "compound": str(lap_data['Compound']) if pd.notna(lap_data['Compound']) else None,
+        "tyre_life": int(lap_data['TyreLife']) if pd.notna(lap_data['TyreLife']) else None,
+        "format": format,
+        "telemetry": telemetry
+    }
+
+    return result
+
+
 @router.get("/{year}/{event}/{session_type}/{driver}")
 async def get_driver_telemetry(
     year: int,
@@ -193,6 +647,12 @@ async def get_driver_telemetry(
     session_type: str,
     driver: str,
     lap: Optional[int] = Query(None, description="Specific lap number. If not provided, returns fastest lap"),
+    format: str = Query("records", pattern="^(records|columnar)$", description=FORMAT_DESCRIPTION),
+    channels: Optional[str] = Query(None, description=CHANNELS_DESCRIPTION),
+    precision: Optional[int] = Query(None, ge=0, le=6, description=PRECISION_DESCRIPTION),
+    points: Optional[int] = Query(None, ge=10, le=10000, description=POINTS_DESCRIPTION),
+    method: str = Query("lttb", pattern="^(lttb|grid)$", description=METHOD_DESCRIPTION),
+    accept: Optional[str] = Header(None),
 ):
     """
     Get telemetry data for a specific driver in a session
@@ -203,65 +663,45 @@ async def get_driver_telemetry(
     - session_type: Type of session ('FP1', 'FP2', 'FP3', 'Q', 'S', 'R')
     - driver: Driver code (e.g., 'VER', 'HAM')
     - lap: Optional lap number. If omitted, returns fastest lap
+    - format: "records" (one object per sample) or "columnar" (one array per channel)
+    - channels: Optional comma-separated channels (Distance is always included)
+    - precision: Optional decimals for float channels
+    - points / method: Optional reduction to that many samples, "lttb" or "grid"
 
     Returns telemetry data including:
     - Time, Speed, RPM, nGear, Throttle, Brake, DRS
     - Distance, X, Y, Z coordinates
     """
     try:
-        cache_key = f"telemetry_{year}_{event}_{session_type}_{driver}_{lap}"
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        driver = driver_key(driver)
+        channels = parse_channels(channels)
+        encoding = negotiate(accept)
+        if encoding != JSON:
+            format = "columnar"
+
+        cache_key = (
+            f"telemetry_{year}_{event}_{session_type}_{driver}_{lap}_{format}"
+            f"_{projection_key(channels, precision, points, method)}{cache_suffix(encoding)}"
+        )
 
         # Check cache
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
-
-        # Load session
-        session = load_session(year, event, session_type)
-
-        # Get driver laps (use pick_drivers instead of deprecated pick_driver)
-        driver_laps = session.laps.pick_drivers(driver)
-
-        if driver_laps.empty:
-            raise HTTPException(status_code=404, detail=f"No laps found for driver {driver}")
-
-        # Get specific lap or fastest lap
-        if lap is not None:
-            target_lap = driver_laps[driver_laps['LapNumber'] == lap]
-            if target_lap.empty:
-                raise HTTPException(status_code=404, detail=f"Lap {lap} not found for driver {driver}")
-            lap_data = target_lap.iloc[0]
-        else:
-            # pick_fastest() already returns a single Lap (or None); indexing it
-            # with .iloc[0] would yield that lap's first column instead.
-            lap_data = driver_laps.pick_fastest()
-            if lap_data is None:
-                raise HTTPException(status_code=404, detail=f"No timed lap found for driver {driver}")
-
-        # Get telemetry
-        telemetry = lap_data.get_telemetry()
+            return encoded_response(cached_data, encoding, cache_key)
 
-        if telemetry.empty:
-            raise HTTPException(status_code=404, detail="No telemetry data available for this lap")
-
-        # Convert to dict
-        result = {
-            "driver": driver,
-            "lap_number": int(lap_data['LapNumber']),
-            "lap_time": format_lap_time(lap_data['LapTime']),
-            "is_personal_best": bool(lap_data['IsPersonalBest']),
-            "compound": str(lap_data['Compound']) if pd.notna(lap_data['Compound']) else None,
-            "tyre_life": int(lap_data['TyreLife']) if pd.notna(lap_data['TyreLife']) else None,
-            "telemetry": records(telemetry)
-        }
+        body = await workers.run(
+            build_encoded, encoding, format,
+            _driver_telemetry, year, event, session_type, driver, lap, format,
+            channels, precision, points, method,
+        )
 
         # Cache result
-        cache_manager.set(cache_key, result)
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
 
-        return result
+        return encoded_response(body, encoding, cache_key)
 
-    except HTTPException:
-        raise
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
         raise
@@ -3,23 +3,51 @@ Weather data endpoints
 """
 import logging
 
-from fastapi import APIRouter, HTTPException
-import fastf1
+from fastapi import APIRouter, Header, HTTPException
+from typing import Optional
 from app.utils.cache_manager import cache_manager
-from app.utils.serialization import records
-from app.utils.events import event_key
-from app.utils.loading import load_session
+from app.utils.encodings import JSON, build_encoded, cache_suffix, encoded_response, negotiate
+from app.utils.events import canonical_event, session_type_key
+from app.utils.loading import WEATHER, load_session
+from app.utils.workers import workers
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def weather_key(year: int, event, session_type: str, encoding: str = JSON) -> str:
+    """The route's cache key; the bundle looks up the same entry."""
+    return f"weather_{year}_{event}_{session_type}{cache_suffix(encoding)}"
+
+
+def _session_weather(year: int, event: str, session_type: str) -> dict:
+    session = load_session(year, event, session_type, WEATHER)
+
+    weather = session.weather_data
+
+    if weather.empty:
+        raise HTTPException(status_code=404, detail="No weather data available")
+
+    result = {
+        "session": {
+            "year": year,
+            "event": event,
+            "type": session_type,
+            "name": session.event['EventName']
+        },
+        "weather_data": weather
+    }
+
+    return result
+
+
 @router.get("/{year}/{event}/{session_type}")
 async def get_session_weather(
     year: int,
     event: str,
     session_type: str,
+    accept: Optional[str] = Header(None),
 ):
     """
     Get weather data for a session
@@ -32,32 +60,22 @@ async def get_session_weather(
     Returns weather information including temperature, humidity, pressure, etc.
     """
     try:
-        cache_key = f"weather_{year}_{event}_{session_type}"
+        # Equivalent URLs ("8", "Monaco", "monaco") share one cache entry.
+        event = await canonical_event(year, event)
+        session_type = session_type_key(session_type)
+        encoding = negotiate(accept)
+
+        cache_key = weather_key(year, event, session_type, encoding)
 
         cached_data = cache_manager.get(cache_key)
         if cached_data is not None:
-            return cached_data
-
-        session = load_session(year, event, session_type)
-
-        weather = session.weather_data
-
-        if weather.empty:
-            raise HTTPException(status_code=404, detail="No weather data available")
+            return encoded_response(cached_data, encoding, cache_key)
 
-        result = {
-            "session": {
-                "year": year,
-                "event": event,
-                "type": session_type,
-                "name": session.event['EventName']
-            },
-            "weather_data": records(weather)
-        }
+        body = await workers.run(build_encoded, encoding, "records", _session_weather, year, event, session_type)
 
-        cache_manager.set(cache_key, result)
+        cache_manager.set(cache_key, body, session=(year, event, session_type))
 
-        return result
+        return encoded_response(body, encoding, cache_key)
 
     except HTTPException:
         # El 404 de una sesión sin correr no es un fallo nuestro.
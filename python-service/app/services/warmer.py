@@ -0,0 +1,194 @@
+"""
+Warming the cache for sessions that have just finished.
+
+The busiest minutes for this service are the ones right after a session ends:
+everyone opens the laps, the strategy and the telemetry of the race they just
+watched. The first of those requests used to pay for the whole cold load —
+FastF1 downloading and processing the session — while the rest waited on it.
+
+The warmer does that load before anyone asks. Every few minutes it reads the
+season's schedule, the same `fastf1.get_event_schedule` the calendar endpoint
+serves, picks the sessions that have ended since, and requests what the site
+shows for them: laps, stints, fastest laps, session info, the classification
+of a qualifying, and each driver's fastest-lap telemetry and track map. The
+requests go through the route functions themselves, so the cache keys, the
+worker pool and the session pool are exactly the ones a visitor would hit.
+
+A session counts as ended at its scheduled end — an hour after the start of
+a qualifying, two after the start of a race — so the warmer starts asking as
+the chequered flag falls, not hours later. If FastF1 has nothing yet, the next
+pass asks again. Until the session is final its responses are cached for
+a while only — a minute while it runs, `CACHE_TTL_RECENT` once it has
+ended — so it is warmed again on every pass of the window: what is still
+cached is a hit and costs nothing, what expired is rebuilt from the session
+already in the pool instead of by the first visitor.
+
+The first pass runs as the app starts, not one interval later.
+
+The same code warms a whole season offline, from `warm.py`.
+"""
+
+import asyncio
+import logging
+
+import orjson
+import pandas as pd
+from fastapi import HTTPException
+
+from app.config import settings
+from app.routes import laps, sessions, telemetry, weather
+from app.utils.events import event_index
+from app.utils.finality import scheduled_end, utc_now
+from app.utils.workers import workers
+
+logger = logging.getLogger(__name__)
+
+
+# Schedule names to the session types the site puts in its URLs.
+SESSION_TYPES = {
+    "Practice 1": "FP1",
+    "Practice 2": "FP2",
+    "Practice 3": "FP3",
+    "Qualifying": "Q",
+    "Sprint Qualifying": "SQ",
+    "Sprint Shootout": "SS",
+    "Sprint": "S",
+    "Race": "R",
+}
+
+# The fastest-lap limits the pages ask for: the client's default, the
+# analysis table and the session times page.
+FASTEST_LIMITS = (10, 15, 2000)
+
+def schedule_sessions(schedule: pd.DataFrame) -> list[tuple[int, str, pd.Timestamp]]:
+    """Every session in an event schedule as (round, session type, UTC start)."""
+    found = []
+
+    for _, row in schedule.iterrows():
+        round_number = int(row["RoundNumber"])
+        # Pre-season testing is round 0 and has no URLs on the site.
+        if round_number == 0:
+            continue
+
+        for n in range(1, 6):
+            session_type = SESSION_TYPES.get(row.get(f"Session{n}"))
+            start = row.get(f"Session{n}DateUtc")
+            if session_type is None or start is None or pd.isna(start):
+                continue
+            found.append((round_number, session_type, pd.Timestamp(start)))
+
+    return found
+
+
+def ended(found: list, now: pd.Timestamp, within: pd.Timedelta | None = None) -> list:
+    """The sessions due to have ended by `now`, and at most `within` ago if given."""
+    picked = []
+
+    for round_number, session_type, start in found:
+        end = scheduled_end(start, session_type)
+        if end is None or end > now:
+            continue
+        if within is not None and now - end > within:
+            continue
+        picked.append((round_number, session_type, start))
+
+    return picked
+
+
+async def warm_session(year: int, round_number: int, session_type: str) -> dict:
+    """Request everything the site shows for one session, filling the cache.
+
+    Returns how many responses were warmed and how many had nothing to give
+    (a driver without a timed lap, a session without weather).
+    """
+    event = str(round_number)
+    counts = {"warmed": 0, "missing": 0}
+
+    async def request(route, *args):
+        try:
+            result = await route(*args)
+        except HTTPException as error:
+            # Full worker pool: leave the rest for the next round.
+            if error.status_code == 503:
+                raise
+            counts["missing"] += 1
+            return None
+        counts["warmed"] += 1
+        return result
+
+    # Route functions called directly get no defaults from FastAPI: every
+    # parameter is passed, JSON (no Accept header) being what the site reads.
+
+    # The lap table first: it loads the session, and it says who drove.
+    session_laps = await request(laps.get_session_laps, year, event, session_type, None, "records", None)
+    if session_laps is None:
+        return counts
+
+    await request(laps.get_session_stints, year, event, session_type)
+    for limit in FASTEST_LIMITS:
+        await request(laps.get_fastest_laps, year, event, session_type, limit, None)
+    await request(sessions.get_session_info, year, event, session_type)
+    await request(weather.get_session_weather, year, event, session_type, None)
+    if session_type in ("Q", "SQ", "SS"):
+        await request(sessions.get_qualifying_classification, year, event, session_type)
+
+    rows = orjson.loads(session_laps.body)["laps"]
+    drivers = sorted({str(lap["Driver"]) for lap in rows if lap.get("Driver")})
+    for driver in drivers:
+        await request(
+            telemetry.get_driver_telemetry,
+            year, event, session_type, driver, None, "records", None, None, None, "lttb", None,
+        )
+        await request(telemetry.get_driver_track, year, event, session_type, driver, None, None)
+
+    return counts
+
+
+async def warm_season(
+    year: int,
+    now: pd.Timestamp | None = None,
+    within: pd.Timedelta | None = None,
+    only_round: int | None = None,
+    only_session: str | None = None,
+) -> list[tuple]:
+    """Warm every session of `year` that has ended (within `within`, if given)."""
+    now = utc_now() if now is None else now
+    schedule = await workers.run(event_index.schedule, year)
+
+    done = []
+    for round_number, session_type, _ in ended(schedule_sessions(schedule), now, within):
+        if only_round is not None and round_number != only_round:
+            continue
+        if only_session is not None and session_type != only_session.upper():
+            continue
+
+        counts = await warm_session(year, round_number, session_type)
+        logger.info(
+            "Warmed %s round %s %s: %s responses, %s without data",
+            year, round_number, session_type, counts["warmed"], counts["missing"],
+        )
+        # Nothing at all means FastF1 has no data for it yet; the next round
+        # tries again.
+        if counts["warmed"]:
+            done.append((year, round_number, session_type))
+
+    return done
+
+
+async def run_forever():
+    """Background loop started with the app: warm what has just finished."""
+    within = pd.Timedelta(hours=settings.WARMER_WINDOW_HOURS)
+
+    while True:
+        now = utc_now()
+        try:
+            # A session that ends just after New Year belongs to last season.
+            for year in sorted({now.year, (now - within).year}):
+                await warm_season(year, now=now, within=within)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # No schedule (offline), a full pool: try again on the next round.
+            logger.warning("Cache warming failed, retrying later", exc_info=True)
+
+        await asyncio.sleep(settings.WARMER_INTERVAL)
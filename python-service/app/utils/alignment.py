@@ -0,0 +1,89 @@
+"""
+Two laps on the same distances, and the time one loses to the other along them.
+
+Two laps never have the same samples: car data arrives at its own rate,
+position data at another, and a faster car covers more metres between two of
+them. Drawing one trace over the other, or a delta-time chart, needs both laps
+at the same distances first; left to the client, that is thousands of points
+re-interpolated in every browser for every comparison.
+
+`align_laps` resamples both laps on one grid of evenly spaced distances —
+the stretch both laps cover — with `downsampling.resample_at`, and reads the
+delta off the aligned `Time` of each: at every distance, how long after lap
+start the first car got there minus how long the second took. Positive, the
+first car is behind; the last value is, give or take the last metres, the
+difference in lap time.
+
+`align_many` does the same for any number of laps, for overlays of a whole
+top five against one reference lap.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.utils.downsampling import AXIS, resample_at
+
+
+def align_laps(
+    first: pd.DataFrame, second: pd.DataFrame, points: Optional[int] = None
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Both laps at the same `points` distances, and the delta trace along them.
+
+    The delta frame holds `Distance` and `Delta`, in seconds; `Delta` is NaN
+    where either lap has no `Time`.
+    """
+    grid, (first, second) = align_many([first, second], points)
+
+    return first, second, pd.DataFrame({AXIS: grid, "Delta": delta_seconds(first, second)})
+
+
+def align_many(
+    laps: list[pd.DataFrame], points: Optional[int] = None
+) -> tuple[np.ndarray, list[pd.DataFrame]]:
+    """The distance grid, and every lap at its `points` distances.
+
+    The grid covers the stretch all the laps cover.
+    """
+    laps, distances = zip(*(_along_distance(lap) for lap in laps))
+
+    start = max(x.min() for x in distances)
+    end = min(x.max() for x in distances)
+    if not end > start:
+        raise ValueError("The laps share no stretch of distance")
+
+    # Without `points`, as many as the lap with more samples had.
+    grid = np.linspace(start, end, points or max(len(lap) for lap in laps))
+
+    return grid, [resample_at(lap, x, grid) for lap, x in zip(laps, distances)]
+
+
+def delta_seconds(first: pd.DataFrame, second: pd.DataFrame) -> np.ndarray:
+    """`first` minus `second` time, in seconds, row by row of two aligned laps."""
+    if "Time" not in first.columns or "Time" not in second.columns:
+        return np.full(len(first), np.nan)
+
+    return seconds(first["Time"]) - seconds(second["Time"])
+
+
+def seconds(series: pd.Series) -> np.ndarray:
+    """A Time column as float seconds, NaN where missing."""
+    if pd.api.types.is_timedelta64_dtype(series):
+        nanoseconds = series.to_numpy().view("i8").astype(float)
+        nanoseconds[series.isna().to_numpy()] = np.nan
+        return nanoseconds / 1e9
+    return series.to_numpy(dtype=float)
+
+
+def _along_distance(frame: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray]:
+    """The samples with a distance, and that distance."""
+    if AXIS not in frame.columns:
+        raise ValueError(f"Telemetry without {AXIS} cannot be aligned")
+
+    x = frame[AXIS].to_numpy(dtype=float)
+    known = np.isfinite(x)
+    if known.sum() < 2:
+        raise ValueError(f"Telemetry without {AXIS} cannot be aligned")
+
+    return frame[known], x[known]
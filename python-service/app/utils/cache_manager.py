@@ -1,25 +1,144 @@
 """
 Cache manager for API responses
 Uses diskcache for persistent caching
+
+In front of diskcache sits a small in-memory tier. A hit on disk is a SQLite
+read and, for anything stored as Python objects, an unpickle. The responses
+everyone is asking for at once (the race that just finished) are served from
+memory instead; the disk keeps everything else.
+
+Encoded responses are also stored compressed (see `compression`), one variant
+per codec next to the body, so a request never waits on compression. The
+variants are made off the event loop after the body is stored; until they are
+ready the body is sent as is.
+
+Next to each encoded body also goes its meta: the ETag (a hash of the body)
+and when the body expires, which is all a conditional request needs to be
+answered with a 304.
 """
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import diskcache as dc
 from app.config import settings
+from app.utils import finality
+from app.utils.compression import CODECS, MIN_SIZE, compress_variants, compression_stats
+from app.utils.events import event_index
 import hashlib
 import json
 
 
+# Part of every stored key. Bump it when what is stored under the keys
+# changes shape, so entries in the old shape are never read back.
+# 2: responses are stored as encoded JSON bytes, not as Python objects.
+KEY_VERSION = 2
+
+
+class MemoryTier:
+    """LRU of decoded responses, bounded by their encoded size in bytes.
+
+    The size is that of the response as JSON. Responses are stored encoded,
+    so for them it is exact; anything else cached as a Python object takes
+    several times more than its JSON, and the budget only bounds it loosely.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """The value stored under `key`, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.time():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, value, size: int, expire_at: float | None):
+        """Keep `value` until `expire_at` (epoch seconds, None for ever)."""
+        if self.max_bytes <= 0:
+            return
+
+        with self._lock:
+            self._remove(key)
+
+            # Larger than the whole tier: disk only.
+            if size > self.max_bytes:
+                return
+
+            while self._entries and self._bytes + size > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+            self._entries[key] = (value, size, expire_at)
+            self._bytes += size
+
+    def discard(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
 class CacheManager:
-    """Simple cache manager using diskcache"""
+    """Simple cache manager using diskcache, with a memory tier in front"""
 
-    def __init__(self):
+    def __init__(self, directory: str = None, memory_bytes: int = None, background: bool = True):
         if settings.CACHE_ENABLED:
-            self.cache = dc.Cache(settings.CACHE_DIR)
+            self.cache = dc.Cache(directory or settings.CACHE_DIR)
         else:
             self.cache = None
+        if memory_bytes is None:
+            memory_bytes = settings.CACHE_MEMORY_MB * 1024 * 1024
+        self.memory = MemoryTier(memory_bytes)
+
+        # One thread: variants are not urgent, and compressing several
+        # bodies at once would only compete with the session workers.
+        self._compressor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="compress") if background else None
+        )
+        # cache key -> the write its variants are being made for. A body
+        # replaced or deleted meanwhile must not get the old one's variants.
+        self._pending: dict[str, int] = {}
+        self._pending_lock = threading.Lock()
+        self._writes = 0
 
     def _generate_key(self, key: str) -> str:
         """Generate cache key hash"""
-        return hashlib.md5(key.encode()).hexdigest()
+        return hashlib.md5(f"v{KEY_VERSION}:{key}".encode()).hexdigest()
 
     def get(self, key: str):
         """Get value from cache"""
@@ -27,11 +146,33 @@ class CacheManager:
             return None
 
         cache_key = self._generate_key(key)
-        return self.cache.get(cache_key)
 
-    def set(self, key: str, value: any, ttl: int = None):
+        value = self.memory.get(cache_key)
+        if value is not None:
+            return value
+
+        value, expire_at, tag = self.cache.get(cache_key, expire_time=True, tag=True)
+        if value is None:
+            return None
+
+        # The tag names the session of an entry cached before it was final.
+        # Once it is, the entry is kept for good instead of expiring.
+        if tag and self._promote(cache_key, value, tag):
+            expire_at = None
+
+        self.memory.put(cache_key, value, _encoded_size(value), expire_at)
+
+        return value
+
+    def set(self, key: str, value: any, ttl: int = None, session: tuple = None,
+            provisional: bool = False):
         """Set value in cache with TTL.
 
+        With `session` — (year, event, session_type) — and no explicit `ttl`,
+        how long it is kept depends on where that session is: for good once
+        final, minutes while it runs or has just ended, less still for a
+        `provisional` classification.
+
         The payload is proven JSON-serialisable first. A response containing
         NaN fails when FastAPI encodes it, and caching it beforehand would
         make every later request fail from cache with no way to recover short
@@ -41,7 +182,11 @@ class CacheManager:
             return
 
         try:
-            json.dumps(value, allow_nan=False)
+            # Encoded responses were made valid JSON by their encoder.
+            if isinstance(value, bytes):
+                size = len(value)
+            else:
+                size = len(json.dumps(value, allow_nan=False))
         except ValueError as error:
             # NaN or Infinity: FastAPI will fail to encode this response, and a
             # cached copy would keep failing until the cache file is deleted.
@@ -50,12 +195,140 @@ class CacheManager:
         except TypeError:
             # Not JSON-native (numpy scalars, tuple keys) but picklable, which
             # is all diskcache needs. Cached as before.
-            pass
+            size = len(pickle.dumps(value))
 
         cache_key = self._generate_key(key)
         expire_time = ttl if ttl is not None else settings.CACHE_TTL
+        tag = None
+
+        if ttl is None and session is not None:
+            state = _session_state(session)
+            expire_time = finality.cache_ttl(state, provisional)
+            if state != finality.FINAL:
+                tag = "|".join(str(part) for part in session)
+
+        expire_at = time.time() + expire_time if expire_time is not None else None
+        self._drop_variants(cache_key)
+        self.cache.set(cache_key, value, expire=expire_time, tag=tag)
+        self.memory.put(cache_key, value, size, expire_at)
+
+        if isinstance(value, bytes):
+            meta = (_etag(value), expire_at)
+            self.cache.set(_meta_key(cache_key), meta, expire=expire_time)
+            self.memory.put(_meta_key(cache_key), meta, _META_SIZE, expire_at)
+
+        if isinstance(value, bytes) and len(value) >= MIN_SIZE and settings.CACHE_COMPRESSION:
+            with self._pending_lock:
+                self._writes += 1
+                self._pending[cache_key] = write = self._writes
+            if self._compressor is None:
+                self._store_variants(cache_key, value, expire_at, write)
+            else:
+                self._compressor.submit(self._store_variants, cache_key, value, expire_at, write)
+
+    def meta(self, key: str) -> tuple[str, float | None] | None:
+        """(ETag, expiry in epoch seconds or None) of the body under `key`."""
+        if not settings.CACHE_ENABLED or self.cache is None:
+            return None
+
+        meta_key = _meta_key(self._generate_key(key))
+
+        meta = self.memory.get(meta_key)
+        if meta is not None:
+            return meta
+
+        meta = self.cache.get(meta_key)
+        if meta is not None:
+            self.memory.put(meta_key, meta, _META_SIZE, meta[1])
+        return meta
+
+    def variant(self, key: str, codec: str) -> bytes | None:
+        """The cached body under `key` compressed with `codec`, if made yet."""
+        if not settings.CACHE_ENABLED or self.cache is None:
+            return None
+
+        variant_key = _variant_key(self._generate_key(key), codec)
+
+        body = self.memory.get(variant_key)
+        if body is not None:
+            return body
 
-        self.cache.set(cache_key, value, expire=expire_time)
+        body, expire_at = self.cache.get(variant_key, expire_time=True)
+        if body is not None:
+            self.memory.put(variant_key, body, len(body), expire_at)
+        return body
+
+    def _store_variants(self, cache_key: str, body: bytes, expire_at: float | None, write: int):
+        try:
+            variants = compress_variants(body)
+        except Exception as error:
+            # The body is cached and servable; it just goes uncompressed.
+            print(f"[cache] Not compressing {cache_key}: {error}")
+            return
+
+        # The lock only guards `_pending`: the writes to disk happen outside
+        # it, so `_drop_variants` on the event loop never waits on them. A drop
+        # or a newer body during the write is caught by the second check, and
+        # what was just written is taken back out.
+        with self._pending_lock:
+            if self._pending.get(cache_key) != write:
+                return
+
+        expire = None
+        if expire_at is not None:
+            expire = expire_at - time.time()
+            if expire <= 0:
+                with self._pending_lock:
+                    if self._pending.get(cache_key) == write:
+                        del self._pending[cache_key]
+                return
+
+        for codec, compressed in variants.items():
+            self.cache.set(_variant_key(cache_key, codec), compressed, expire=expire)
+
+        with self._pending_lock:
+            current = self._pending.get(cache_key) == write
+            if current:
+                del self._pending[cache_key]
+                for codec, compressed in variants.items():
+                    self.memory.put(_variant_key(cache_key, codec), compressed, len(compressed), expire_at)
+
+        if not current:
+            self._delete_variants(cache_key)
+            return
+
+        compression_stats.stored(len(body), variants)
+
+    def _drop_variants(self, cache_key: str):
+        with self._pending_lock:
+            self._pending.pop(cache_key, None)
+        self._delete_variants(cache_key)
+
+    def _delete_variants(self, cache_key: str):
+        for codec in CODECS:
+            variant_key = _variant_key(cache_key, codec)
+            self.memory.discard(variant_key)
+            self.cache.delete(variant_key)
+
+    def _promote(self, cache_key: str, value, tag: str) -> bool:
+        year, rest = tag.split("|", 1)
+        event, session_type = rest.rsplit("|", 1)
+
+        if _session_state((year, event, session_type)) != finality.FINAL:
+            return False
+
+        self.cache.set(cache_key, value, expire=None)
+        # The meta and the variants go with their body.
+        meta = self.cache.get(_meta_key(cache_key))
+        if meta is not None:
+            self.cache.set(_meta_key(cache_key), (meta[0], None), expire=None)
+            self.memory.discard(_meta_key(cache_key))
+        for codec in CODECS:
+            variant_key = _variant_key(cache_key, codec)
+            compressed = self.cache.get(variant_key)
+            if compressed is not None:
+                self.cache.set(variant_key, compressed, expire=None)
+        return True
 
     def delete(self, key: str):
         """Delete value from cache"""
@@ -63,10 +336,16 @@ class CacheManager:
             return
 
         cache_key = self._generate_key(key)
-        self.cache.delete(cache_key)
+        self._drop_variants(cache_key)
+        for entry in (cache_key, _meta_key(cache_key)):
+            self.memory.discard(entry)
+            self.cache.delete(entry)
 
     def clear(self):
         """Clear all cache"""
+        with self._pending_lock:
+            self._pending.clear()
+        self.memory.clear()
         if settings.CACHE_ENABLED and self.cache is not None:
             self.cache.clear()
 
@@ -79,8 +358,42 @@ class CacheManager:
             "enabled": True,
             "size": len(self.cache),
             "volume": self.cache.volume(),
+            "memory": self.memory.stats(),
+            "compression": compression_stats.stats(),
         }
 
 
+def _encoded_size(value) -> int:
+    """What `set` measures, for an entry that arrived from disk."""
+    if isinstance(value, bytes):
+        return len(value)
+    try:
+        return len(json.dumps(value))
+    except (TypeError, ValueError):
+        return len(pickle.dumps(value))
+
+
+def _variant_key(cache_key: str, codec: str) -> str:
+    return f"{cache_key}.{codec}"
+
+
+def _meta_key(cache_key: str) -> str:
+    return f"{cache_key}.meta"
+
+
+# What a meta entry is charged in the memory tier: a short tuple.
+_META_SIZE = 64
+
+
+def _etag(body: bytes) -> str:
+    # Weak: the same content is also sent compressed, as different bytes.
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _session_state(session: tuple) -> str:
+    year, event, session_type = session
+    return finality.status(event_index.session_start(int(year), event, session_type), session_type=session_type)
+
+
 # Global cache manager instance
 cache_manager = CacheManager()
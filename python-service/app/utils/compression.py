@@ -0,0 +1,137 @@
+"""
+Compressed variants of cached responses, made once when they are cached.
+
+A full-race laps response or a telemetry comparison is hundreds of KB to
+several MB of very repetitive JSON: it compresses to a tenth of that or less.
+Compressing it on every request spends CPU on the same bytes over and over;
+not compressing it sends ten times the bytes. The cache already keeps the
+encoded body, so it keeps its compressed variants next to it, made once when
+the body is stored, and a request only picks the one its Accept-Encoding
+allows.
+
+gzip is always there. Brotli (`brotli`) and zstd (`zstandard`) are made as
+well when their packages are installed; every browser sends `br`, and
+variants are made at write time, so the slow high levels are affordable.
+"""
+
+import gzip
+import threading
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is enough for every client
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+
+# Smaller than this, a variant saves less than its headers cost.
+MIN_SIZE = 1024
+
+
+def _gzip(body: bytes) -> bytes:
+    # mtime=0: the same body always compresses to the same bytes.
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def _brotli(body: bytes) -> bytes:
+    # Quality 11 takes seconds on a few MB; 9 keeps nearly all of its gain.
+    return brotli.compress(body, quality=9)
+
+
+def _zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=19).compress(body)
+
+
+# In order of preference, when a client accepts several equally.
+CODECS = {}
+if brotli is not None:
+    CODECS["br"] = _brotli
+if zstandard is not None:
+    CODECS["zstd"] = _zstd
+CODECS["gzip"] = _gzip
+
+
+def compress_variants(body: bytes) -> dict[str, bytes]:
+    """codec -> compressed body, for each codec that makes it smaller."""
+    if len(body) < MIN_SIZE:
+        return {}
+
+    variants = {}
+    for codec, compress in CODECS.items():
+        compressed = compress(body)
+        if len(compressed) < len(body):
+            variants[codec] = compressed
+    return variants
+
+
+def choose(accept_encoding: str | None, available) -> str | None:
+    """The available codec to answer an Accept-Encoding with; None for none."""
+    if not accept_encoding or not available:
+        return None
+
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+
+    best, best_quality = None, 0.0
+    for codec in CODECS:
+        if codec not in available:
+            continue
+        quality = qualities.get(codec, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = codec, quality
+
+    return best
+
+
+class CompressionStats:
+    """How much the variants save, and how often each is sent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stored = {codec: [0, 0, 0] for codec in CODECS}  # entries, raw, compressed
+        self._served = {codec: 0 for codec in (*CODECS, "identity")}
+
+    def stored(self, raw_size: int, variants: dict[str, bytes]):
+        with self._lock:
+            for codec, body in variants.items():
+                totals = self._stored[codec]
+                totals[0] += 1
+                totals[1] += raw_size
+                totals[2] += len(body)
+
+    def served(self, codec: str | None):
+        with self._lock:
+            self._served[codec or "identity"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "codecs": list(CODECS),
+                "stored": {
+                    codec: {
+                        "entries": entries,
+                        "raw_bytes": raw,
+                        "compressed_bytes": compressed,
+                        "ratio": round(compressed / raw, 4) if raw else None,
+                    }
+                    for codec, (entries, raw, compressed) in self._stored.items()
+                },
+                "served": dict(self._served),
+            }
+
+
+compression_stats = CompressionStats()
@@ -0,0 +1,70 @@
+"""
+Who was fastest where: the lap split into mini-sectors, each won by someone.
+
+The map is drawn from every driver's fastest lap. Each lap is cut into the
+same number of mini-sectors of equal length, and the time spent in each is read
+off its telemetry: the time at each cut, interpolated on distance, and the
+difference between one cut and the next. With every driver's times in one
+matrix — a row per driver, a column per mini-sector — the winner of each
+mini-sector and the margin to the second are one `argmin` and one sort over the
+whole matrix.
+
+The cuts are at the same fraction of each lap, not at the same metre: two cars
+on different lines cover a few metres more or less per lap, and cutting at
+fixed metres would put the last mini-sector of the longer line past the end of
+the shorter one. The track it is drawn on is the fastest lap's, the same points
+`track.track_points` gives the track map, each with the mini-sector it lies in.
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.utils.alignment import seconds
+from app.utils.downsampling import AXIS
+
+
+def sector_times(telemetry: pd.DataFrame, sectors: int) -> np.ndarray:
+    """Seconds spent in each of `sectors` equal mini-sectors of a lap; NaN if
+    the lap has no usable Distance or Time."""
+    if AXIS not in telemetry.columns or "Time" not in telemetry.columns:
+        return np.full(sectors, np.nan)
+
+    distance = telemetry[AXIS].to_numpy(dtype=float)
+    time = seconds(telemetry["Time"])
+
+    known = np.isfinite(distance) & np.isfinite(time)
+    distance, time = distance[known], time[known]
+    if len(distance) < 2 or not distance.max() > distance.min():
+        return np.full(sectors, np.nan)
+
+    order = np.argsort(distance, kind="stable")
+    fraction = (distance[order] - distance.min()) / (distance.max() - distance.min())
+    cuts = np.interp(np.linspace(0.0, 1.0, sectors + 1), fraction, time[order])
+    return np.diff(cuts)
+
+
+def dominance(times: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """For a drivers x mini-sectors matrix of times: the row of each
+    mini-sector's winner, its time, and its margin to the second (NaN with a
+    single driver). A mini-sector nobody has a time for is won by row -1."""
+    times = np.where(np.isfinite(times), times, np.inf)
+
+    winner = np.argmin(times, axis=0)
+    ordered = np.sort(times, axis=0)
+    best = ordered[0]
+    second = ordered[1] if len(ordered) > 1 else np.full(times.shape[1], np.inf)
+
+    nobody = ~np.isfinite(best)
+    winner = np.where(nobody, -1, winner)
+    best = np.where(nobody, np.nan, best)
+    margin = np.where(np.isfinite(second) & ~nobody, second - best, np.nan)
+    return winner, best, margin
+
+
+def point_sectors(distance: np.ndarray, sectors: int) -> np.ndarray:
+    """The mini-sector each point of a lap lies in, by its distance."""
+    distance = np.asarray(distance, dtype=float)
+    low, high = np.nanmin(distance), np.nanmax(distance)
+    if not high > low:
+        return np.zeros(len(distance), dtype=int)
+    return np.clip(((distance - low) / (high - low) * sectors).astype(int), 0, sectors - 1)
@@ -0,0 +1,156 @@
+"""
+Fewer telemetry samples, without losing what a chart is looked at for.
+
+A lap is thousands of samples and a chart is a few hundred pixels wide. Taking
+every n-th sample (`track.downsample`) is fine for the shape of a circuit but
+not for a trace: a brake application or a gear change that falls between two
+kept samples disappears, and the minimum speed of a corner comes out higher
+than it was.
+
+Two ways to keep them, both against Distance:
+
+- `lttb`, Largest-Triangle-Three-Buckets: the samples are split into buckets
+  and from each one the sample that makes the largest triangle with its
+  neighbours is kept — the one farthest from a straight line, which is where
+  the peaks are. Every channel votes: the triangle areas of each channel,
+  scaled to its own range, are added up, so a spike in Brake counts as much as
+  one in Speed. The rows kept are real samples, shared by all channels.
+- `grid`: the lap resampled on evenly spaced distances. Continuous channels
+  are interpolated, the rest (gear, DRS, brake, text) take the value of the
+  last sample before each point. Peaks between grid points can be shaved, but
+  every lap of a circuit lines up point for point.
+"""
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("lttb", "grid")
+
+# What the traces are drawn against.
+AXIS = "Distance"
+
+
+def downsample_frame(frame: pd.DataFrame, points: int, method: str = "lttb") -> pd.DataFrame:
+    """`frame` reduced to `points` rows by `method`; as it was if already that small."""
+    if points is None or len(frame) <= points:
+        return frame
+
+    x = _axis(frame)
+
+    if method == "grid":
+        return resample_grid(frame, x, points)
+
+    return frame.iloc[lttb_indices(x, _channels(frame), points)].reset_index(drop=True)
+
+
+def lttb_indices(x: np.ndarray, values: np.ndarray, points: int) -> np.ndarray:
+    """Positions of the `points` samples LTTB keeps, first and last included.
+
+    `values` holds one column per channel, already scaled to comparable ranges.
+    """
+    total = len(x)
+    if points >= total or points < 3:
+        return np.arange(total)
+
+    values = values.reshape(total, -1)
+
+    # n - 2 buckets between the first and the last sample, all non-empty.
+    edges = np.linspace(1, total - 1, points - 1).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Each bucket's average point, for the bucket before it. The last bucket
+    # looks at the last sample.
+    counts = (ends - starts)[:, None]
+    mean_x = np.add.reduceat(x[:total - 1], starts) / counts[:, 0]
+    mean_values = np.add.reduceat(values[:total - 1], starts, axis=0) / counts
+    next_x = np.append(mean_x[1:], x[-1])
+    next_values = np.vstack([mean_values[1:], values[-1:]])
+
+    selected = np.empty(points, dtype=np.intp)
+    selected[0], selected[-1] = 0, total - 1
+
+    # Each pick depends on the one before it, so the buckets go in order;
+    # within a bucket the areas are computed at once.
+    previous = 0
+    for bucket, (start, end) in enumerate(zip(starts, ends)):
+        dx_next = x[previous] - next_x[bucket]
+        dx = x[previous] - x[start:end]
+        area = np.abs(
+            dx_next * (values[start:end] - values[previous])
+            - dx[:, None] * (next_values[bucket] - values[previous])
+        ).sum(axis=1)
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def resample_grid(frame: pd.DataFrame, x: np.ndarray, points: int) -> pd.DataFrame:
+    """`frame` at `points` evenly spaced positions of `x`."""
+    finite = np.isfinite(x)
+    return resample_at(frame, x, np.linspace(x[finite].min(), x[finite].max(), points))
+
+
+def resample_at(frame: pd.DataFrame, x: np.ndarray, grid: np.ndarray) -> pd.DataFrame:
+    """`frame` at each position of `grid` (ascending) along `x`."""
+    order = np.argsort(x, kind="stable")
+    x = x[order]
+    frame = frame.iloc[order]
+
+    # Last sample at or before each grid point, for what cannot be interpolated.
+    before = np.clip(np.searchsorted(x, grid, side="right") - 1, 0, len(x) - 1)
+
+    data = {}
+    for column in frame.columns:
+        series = frame[column]
+        if column == AXIS:
+            data[column] = grid
+        elif pd.api.types.is_float_dtype(series):
+            data[column] = _interpolated(x, series.to_numpy(dtype=float), grid)
+        elif (
+            pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_timedelta64_dtype(series)
+        ) and not series.isna().any():
+            stamps = _interpolated(x, series.to_numpy().view("i8").astype(float), grid)
+            data[column] = stamps.astype("i8").view(series.to_numpy().dtype)
+        else:
+            data[column] = series.to_numpy()[before]
+
+    return pd.DataFrame(data, columns=frame.columns)
+
+
+def _interpolated(x: np.ndarray, values: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    known = np.isfinite(x) & np.isfinite(values)
+    if not known.any():
+        return np.full(len(grid), np.nan)
+    return np.interp(grid, x[known], values[known])
+
+
+def _axis(frame: pd.DataFrame) -> np.ndarray:
+    if AXIS in frame.columns:
+        distance = frame[AXIS].to_numpy(dtype=float)
+        if np.isfinite(distance).all():
+            return distance
+    # Without a usable distance, samples are taken as evenly spaced.
+    return np.arange(len(frame), dtype=float)
+
+
+def _channels(frame: pd.DataFrame) -> np.ndarray:
+    """The numeric and boolean channels, each scaled to 0-1 (NaN as 0)."""
+    columns = [
+        frame[column].to_numpy(dtype=float)
+        for column in frame.columns
+        if column != AXIS
+        and (pd.api.types.is_numeric_dtype(frame[column]) or pd.api.types.is_bool_dtype(frame[column]))
+    ]
+    if not columns:
+        return np.zeros((len(frame), 1))
+
+    values = np.column_stack(columns)
+    finite = np.isfinite(values)
+    low = np.where(finite, values, np.inf).min(axis=0)
+    high = np.where(finite, values, -np.inf).max(axis=0)
+    # A flat or empty channel has nothing to keep; it is left at 0.
+    flat = ~(high > low)
+    low = np.where(flat, 0.0, low)
+    span = np.where(flat, 1.0, high - low)
+    return np.where(finite & ~flat, (values - low) / span, 0.0)
@@ -0,0 +1,198 @@
+"""
+Binary encodings of the frame-shaped responses, chosen by the Accept header.
+
+The Next.js routes under `src/app/api/telemetry` proxy this service and parse
+its JSON again: a telemetry lap is thousands of numbers written out as text
+only to be read back into numbers. A client that asks for it gets the frames
+in a binary encoding instead, built from the pandas frames directly:
+
+- Apache Arrow IPC (`application/vnd.apache.arrow.stream`): one record batch
+  stream with the frame's own column types — floats, integers, booleans,
+  timestamps, durations. Whatever else the response carries (driver, lap
+  time...) travels as JSON in the schema metadata, under `apexdata`.
+- MessagePack (`application/msgpack`): the response as usual, with each frame
+  as one array per column. Numbers stay numbers, durations are seconds, dates
+  are ISO strings.
+
+JSON stays the default, for a missing Accept header or `*/*`. Each encoding
+is cached as its own variant.
+"""
+
+import math
+
+import msgpack
+import pandas as pd
+import pyarrow as pa
+from fastapi.responses import Response
+
+from app.utils.responses import CachedResponse
+from app.utils.serialization import FRAME_FORMATS, encode
+
+JSON = "json"
+MSGPACK = "msgpack"
+ARROW = "arrow"
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    MSGPACK: "application/msgpack",
+    ARROW: "application/vnd.apache.arrow.stream",
+}
+
+# Every spelling a client may send for each encoding.
+_ACCEPTED = {
+    "application/json": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+    "application/vnd.apache.arrow.stream": ARROW,
+}
+
+
+def negotiate(accept: str | None) -> str:
+    """The encoding to answer an Accept header with; JSON unless asked otherwise."""
+    if not accept:
+        return JSON
+
+    offers = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            offers.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(offers):
+        if media_type in _ACCEPTED:
+            return _ACCEPTED[media_type]
+        if media_type in ("*/*", "application/*"):
+            return JSON
+
+    return JSON
+
+
+def cache_suffix(encoding: str) -> str:
+    """What to append to a cache key for this encoding's variant."""
+    return "" if encoding == JSON else f"_{encoding}"
+
+
+def build_encoded(encoding: str, layout: str, build, *args, **kwargs) -> bytes:
+    """Run a route's builder and encode its payload, frames included."""
+    payload = build(*args, **kwargs)
+
+    if encoding == ARROW:
+        return _arrow(payload)
+    if encoding == MSGPACK:
+        return msgpack.packb(_with_frames(payload, _typed_columns), default=_msgpack_default)
+    return encode(_with_frames(payload, FRAME_FORMATS[layout]))
+
+
+def encoded_response(body: bytes, encoding: str, cache_key: str = None) -> Response:
+    """An encoded body, with the media type it was encoded as."""
+    # The same URL answers differently by Accept: shared caches must know.
+    return CachedResponse(
+        content=body, media_type=MEDIA_TYPES[encoding], cache_key=cache_key, headers={"Vary": "Accept"}
+    )
+
+
+def _with_frames(payload, convert):
+    """The payload with each DataFrame in it (in nested dicts) converted."""
+    if isinstance(payload, pd.DataFrame):
+        return convert(payload)
+    if isinstance(payload, dict):
+        return {key: _with_frames(value, convert) for key, value in payload.items()}
+    return payload
+
+
+def _frames(payload, path=()):
+    """(path, frame) for every DataFrame in the payload's nested dicts."""
+    if isinstance(payload, pd.DataFrame):
+        yield ".".join(path), payload
+    elif isinstance(payload, dict):
+        for key, value in payload.items():
+            yield from _frames(value, path + (str(key),))
+
+
+def _typed_columns(frame: pd.DataFrame) -> dict[str, list]:
+    result = {}
+
+    for column in frame.columns:
+        series = frame[column]
+        if pd.api.types.is_timedelta64_dtype(series):
+            values = series.dt.total_seconds().tolist()
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            values = [None if pd.isna(value) else value.isoformat() for value in series]
+        elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            values = series.tolist()
+        else:
+            values = [None if _missing(value) else value for value in series.tolist()]
+        result[str(column)] = values
+
+    return result
+
+
+def _missing(value) -> bool:
+    return value is None or value is pd.NA or value is pd.NaT or (
+        isinstance(value, float) and math.isnan(value)
+    )
+
+
+def _msgpack_default(value):
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, pd.Timedelta):
+        return value.total_seconds()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def _arrow(payload) -> bytes:
+    frames = list(_frames(payload))
+
+    if not frames:
+        table = pa.table({})
+    elif len(frames) == 1:
+        table = _arrow_table(frames[0][1])
+    else:
+        # A comparison holds one frame per driver; one stream carries one
+        # schema, so they go stacked, each row saying which frame it came from.
+        table = pa.concat_tables(
+            [
+                _arrow_table(frame.assign(part=path))
+                for path, frame in frames
+            ],
+            promote_options="default",
+        )
+
+    rest = _with_frames(payload, lambda frame: None)
+    metadata = {b"apexdata": encode(rest)}
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_table(frame: pd.DataFrame) -> pa.Table:
+    # Plain frame: FastF1's subclasses carry the session in their metadata.
+    frame = pd.DataFrame(frame).reset_index(drop=True)
+    frame.columns = [str(column) for column in frame.columns]
+
+    try:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # A column of mixed Python objects: those columns go as text.
+        for column in frame.columns:
+            if frame[column].dtype == object:
+                frame[column] = frame[column].map(lambda value: None if _missing(value) else str(value))
+        return pa.Table.from_pandas(frame, preserve_index=False)
@@ -12,6 +12,16 @@ telemetría "sin vueltas" para un piloto que sí corrió, comparaciones
 imposibles, y tiempos que no eran los de la sesión elegida.
 """
 
+import threading
+import time
+from collections import OrderedDict
+
+import fastf1
+import pandas as pd
+
+from app.utils.single_flight import SingleFlight
+from app.utils.workers import workers
+
 
 def event_key(event: str | int) -> str | int:
     """Ronda como entero, nombre como texto — que es lo que FastF1 distingue."""
@@ -21,3 +31,194 @@ def event_key(event: str | int) -> str | int:
     limpio = str(event).strip()
 
     return int(limpio) if limpio.isdigit() else limpio
+
+
+# --- Un evento, una forma de escribirlo ------------------------------------
+#
+# Las claves de cache llevan el evento tal como llega por la URL, así que
+# `/2024/8/R`, `/2024/Monaco/R` y `/2024/monaco grand prix/R` eran tres cargas
+# en frío y tres copias de la misma respuesta. Lo mismo con `ver` y `VER`.
+#
+# El índice de cada temporada se construye una vez desde el calendario y
+# traduce cualquier nombre a su número de ronda antes de mirar la cache o
+# cargar la sesión. El parecido aproximado de FastF1 —que antes se hacía en
+# cada petición de `get_event`— queda como último recurso, y su respuesta
+# también se recuerda.
+
+# El calendario cambia pocas veces en una temporada (una carrera cancelada,
+# una fecha que se mueve); medio día es de sobra.
+_SCHEDULE_TTL = 12 * 3600
+
+# Sin red el calendario no llega; no se vuelve a intentar en cada petición.
+_RETRY_AFTER = 300
+
+# Columnas del calendario que nombran al evento.
+_NAME_COLUMNS = ("EventName", "OfficialEventName", "Country", "Location")
+
+# Respuestas del parecido de FastF1 que se recuerdan. El texto lo escribe
+# cualquiera en la URL: sin tope, cada cadena inventada sería memoria para siempre.
+_GUESSES = 512
+
+
+class EventIndex:
+    """Calendario de cada temporada y los nombres de sus eventos."""
+
+    def __init__(self, ttl: float = _SCHEDULE_TTL):
+        self.ttl = ttl
+        self._seasons: dict[int, tuple[float, object, dict]] = {}
+        self._failed: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._loads = SingleFlight()
+        # (año, nombre) -> ronda (0 si no hubo parecido), los más recientes al final.
+        self._guesses: OrderedDict[tuple[int, str], int] = OrderedDict()
+
+    def ready(self, year: int) -> bool:
+        """Si la temporada ya está indexada y vigente."""
+        season = self._seasons.get(int(year))
+        return season is not None and time.monotonic() - season[0] < self.ttl
+
+    def schedule(self, year: int):
+        """El calendario de `year`, el mismo que da `fastf1.get_event_schedule`."""
+        year = int(year)
+        if not self.ready(year):
+            self._loads.do(year, lambda: self._index(year))
+        return self._seasons[year][1]
+
+    def _index(self, year: int):
+        failed = self._failed.get(year)
+        if failed is not None and time.monotonic() - failed < _RETRY_AFTER:
+            raise LookupError(f"Calendario de {year} no disponible")
+
+        try:
+            schedule = fastf1.get_event_schedule(year)
+        except Exception:
+            self._failed[year] = time.monotonic()
+            raise
+
+        rounds: dict[str, set] = {}
+        for _, row in schedule.iterrows():
+            round_number = int(row["RoundNumber"])
+            # Los test de pretemporada son todos la ronda 0: no hay número
+            # que los distinga, así que siguen yendo por nombre.
+            if round_number == 0:
+                continue
+            values = [row.get(column) for column in _NAME_COLUMNS]
+            name = str(row.get("EventName") or "")
+            if name.endswith(" Grand Prix"):
+                values.append(name[: -len(" Grand Prix")])
+            for value in values:
+                if isinstance(value, str) and value.strip():
+                    rounds.setdefault(value.strip().casefold(), set()).add(round_number)
+
+        # Un país con dos carreras ("Italy", "United States") no nombra a
+        # ninguna: esos nombres se quedan fuera y van por parecido, como antes.
+        names = {name: found.pop() for name, found in rounds.items() if len(found) == 1}
+
+        with self._lock:
+            self._seasons[year] = (time.monotonic(), schedule, names)
+            self._failed.pop(year, None)
+
+    def resolve(self, year: int, event: str | int) -> str | int:
+        """Número de ronda de `event`, o el evento tal cual si no se sabe.
+
+        Solo mira una temporada ya indexada, aunque haya caducado: no carga
+        nada, porque se llama desde el bucle de eventos y el calendario es una
+        petición de red. Sin calendario (sin red, una temporada que FastF1 no
+        conoce, el pool de trabajo lleno) se devuelve lo que haría
+        `event_key`, y FastF1 decide como antes.
+        """
+        event = event_key(event)
+        if isinstance(event, int):
+            return event
+
+        season = self._seasons.get(int(year))
+        if season is None:
+            return event
+        _, schedule, names = season
+        wanted = event.casefold()
+
+        round_number = names.get(wanted)
+        if round_number is None:
+            round_number = self._guess(int(year), schedule, event, wanted)
+
+        return round_number if round_number else event
+
+    def _guess(self, year: int, schedule, event: str, wanted: str) -> int:
+        """Ronda por el parecido de FastF1, 0 si no hay; recordada con tope."""
+        key = (year, wanted)
+        with self._lock:
+            if key in self._guesses:
+                self._guesses.move_to_end(key)
+                return self._guesses[key]
+
+        try:
+            found = schedule.get_event_by_name(event)
+        except Exception:
+            found = None
+        round_number = int(found["RoundNumber"]) if found is not None else 0
+
+        with self._lock:
+            self._guesses[key] = round_number
+            while len(self._guesses) > _GUESSES:
+                self._guesses.popitem(last=False)
+
+        return round_number
+
+    def session_start(self, year: int, event: str | int, session_type: str) -> pd.Timestamp | None:
+        """Hora de inicio (UTC) de una sesión, si la temporada ya está indexada.
+
+        No carga nada: None cuando no se sabe, sin esperar al calendario.
+        """
+        season = self._seasons.get(int(year))
+        if season is None:
+            return None
+        _, schedule, names = season
+
+        event = event_key(event)
+        round_number = event if isinstance(event, int) else names.get(event.casefold())
+        if not round_number:
+            return None
+
+        try:
+            start = schedule.get_event_by_round(round_number).get_session_date(session_type, utc=True)
+        except Exception:
+            return None
+
+        return None if pd.isna(start) else pd.Timestamp(start)
+
+    def clear(self):
+        with self._lock:
+            self._seasons.clear()
+            self._failed.clear()
+            self._guesses.clear()
+
+
+event_index = EventIndex()
+
+
+async def canonical_event(year: int, event: str | int) -> str | int:
+    """`EventIndex.resolve` desde una ruta: el calendario se carga fuera del
+    bucle, en el pool de trabajo, y nunca desde `resolve`.
+
+    También con una ronda, que no lo necesita para resolverse: así la
+    temporada queda indexada y la cache sabe cuándo empezó la sesión.
+    """
+    if not event_index.ready(year):
+        try:
+            await workers.run(event_index.schedule, year)
+        except Exception:
+            # Sin calendario se sigue igual; `resolve` devuelve el evento tal cual.
+            pass
+    return event_index.resolve(year, event)
+
+
+def driver_key(driver: str | None) -> str | None:
+    """El código de piloto como lo escribe FastF1: `VER`, no `ver`."""
+    if driver is None:
+        return None
+    return str(driver).strip().upper()
+
+
+def session_type_key(session_type: str) -> str:
+    """`r` y `R` son la misma sesión."""
+    return str(session_type).strip().upper()
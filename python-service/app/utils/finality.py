@@ -0,0 +1,113 @@
+"""
+When a session's data stops changing.
+
+FastF1 publishes timing while a session runs and keeps correcting it for a
+while after: the archive fills in, the results are amended, the stewards hand
+out penalties. After that nothing about a session changes again, and whatever
+was built from it can be kept for good.
+
+The schedule only says when a session starts, so its end is that start plus a
+generous length — red flags included — and "final" means ended long enough ago
+for those corrections to have landed. Whether it is still running goes by its
+scheduled length instead: once the chequered flag is due, its data changes
+by the correction, not by the minute.
+
+That is also what decides how long a response may be cached. A 2019 race
+never changes again and is kept for good; the session on track right now
+changes by the minute; the one that ended this afternoon sits in between, and
+a provisional classification is the thing most likely to move.
+"""
+
+import pandas as pd
+
+from app.config import settings
+
+
+# Longer than any session has run, red flags and suspensions included.
+SESSION_LENGTH = pd.Timedelta(hours=4)
+
+# How long each session is scheduled to run, chequered flag to chequered flag
+# without interruptions: the earliest its data can be complete.
+SCHEDULED_LENGTH = {
+    "FP1": pd.Timedelta(hours=1),
+    "FP2": pd.Timedelta(hours=1),
+    "FP3": pd.Timedelta(hours=1),
+    "Q": pd.Timedelta(hours=1),
+    "SQ": pd.Timedelta(minutes=45),
+    "SS": pd.Timedelta(minutes=45),
+    "S": pd.Timedelta(hours=1),
+    "R": pd.Timedelta(hours=2),
+}
+
+
+def utc_now() -> pd.Timestamp:
+    """Now, as the naive UTC timestamp FastF1 uses for session dates."""
+    return pd.Timestamp.now(tz="UTC").tz_localize(None)
+
+
+def session_end(start) -> pd.Timestamp | None:
+    """The latest a session starting at `start` (naive UTC) can have ended."""
+    if start is None or pd.isna(start):
+        return None
+    return pd.Timestamp(start) + SESSION_LENGTH
+
+
+def scheduled_end(start, session_type: str) -> pd.Timestamp | None:
+    """When a session starting at `start` (naive UTC) is due to end, if run
+    without interruptions; `session_end` for a session type not listed."""
+    if start is None or pd.isna(start):
+        return None
+    length = SCHEDULED_LENGTH.get(str(session_type).upper())
+    if length is None:
+        return session_end(start)
+    return pd.Timestamp(start) + length
+
+
+def is_final(start, now: pd.Timestamp | None = None) -> bool:
+    """Whether a session starting at `start` is past all corrections."""
+    end = session_end(start)
+    if end is None:
+        return False
+
+    now = utc_now() if now is None else now
+    return now - end >= pd.Timedelta(hours=settings.SESSION_FINAL_HOURS)
+
+
+# What a session is, as far as caching what was built from it goes.
+UPCOMING = "upcoming"
+LIVE = "live"
+RECENT = "recent"
+FINAL = "final"
+UNKNOWN = "unknown"
+
+
+def status(start, now: pd.Timestamp | None = None, session_type: str | None = None) -> str:
+    """Where a session starting at `start` (naive UTC) is in its life.
+
+    Live until its scheduled end when `session_type` is given, until
+    `session_end` otherwise.
+    """
+    end = session_end(start) if session_type is None else scheduled_end(start, session_type)
+    if end is None:
+        return UNKNOWN
+
+    now = utc_now() if now is None else now
+    if now < pd.Timestamp(start):
+        return UPCOMING
+    if now < end:
+        return LIVE
+    return FINAL if is_final(start, now) else RECENT
+
+
+def cache_ttl(state: str, provisional: bool = False) -> int | None:
+    """Seconds a response about a session in `state` may be cached; None is forever."""
+    if state == FINAL:
+        return None
+    if state in (LIVE, UPCOMING):
+        return settings.CACHE_TTL_LIVE
+    if state == RECENT:
+        if provisional:
+            return min(settings.CACHE_TTL_RECENT, settings.CACHE_TTL_PROVISIONAL)
+        return settings.CACHE_TTL_RECENT
+    # No schedule to go by: the flat TTL, as before.
+    return settings.CACHE_TTL
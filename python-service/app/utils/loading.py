@@ -11,6 +11,23 @@ is no such thing yet"— and it is what lets the page say the honest sentence
 instead of an error. It matters more now that the weekend in progress shows up
 in the telemetry picker: choosing Saturday's race on Friday is an ordinary
 thing to do, not a mistake.
+
+Loaded sessions are kept in the session pool, keyed by what identifies them
+once normalised, so the next request for the same session — another driver's
+telemetry, the stints, the weather — does not pay for the load again. Requests
+that arrive while that load is still running wait for it instead of starting
+their own.
+
+Each endpoint says which parts of the session it reads, and only those are
+loaded. Car and position telemetry are by far the largest and slowest part, and
+the lap table, the stints or the weather never look at them. When a telemetry
+request later finds a session loaded without it, a new session is loaded with
+everything the old one had and the rest, and takes its place in the pool. The
+pooled one is never loaded again in place: other requests may be reading it,
+and `Session.load` replaces its laps and results as it goes.
+
+Below the pool sits the columnar session store: a finished session loaded once
+through FastF1 is written there, and later cold loads read it back instead.
 """
 
 import logging
@@ -19,26 +36,109 @@ import fastf1
 from fastapi import HTTPException
 
 from app.utils.events import event_key
+from app.utils.session_pool import estimate_bytes, session_pool
+from app.utils.session_store import session_store
+from app.utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+_loads = SingleFlight()
+
+
+# The parts FastF1 can load separately, named as its `Session.load` flags.
+# Results and the session info are always loaded, whatever is asked for.
+PARTS = ("laps", "telemetry", "weather", "messages")
+
+# The laps always come with the race-control messages: FastF1 reads the laps
+# deleted for track limits from them, and without them a deleted lap keeps
+# IsPersonalBest and is what `pick_fastest()` returns. The feed is tiny.
+LAPS = frozenset({"laps", "messages"})
+TELEMETRY = frozenset({"laps", "messages", "telemetry"})
+WEATHER = frozenset({"weather"})
+MESSAGES = frozenset({"messages"})
+EVERYTHING = frozenset(PARTS)
+
+
+class _Loaded:
+    """A pooled session and the parts it was loaded with."""
+
+    __slots__ = ("session", "parts")
+
+    def __init__(self, session, parts: frozenset):
+        self.session = session
+        self.parts = parts
+
+
+def session_key(year: int, event: str, session_type: str) -> tuple:
+    """What identifies a loaded session, whatever way the URL spelt it.
+
+    FastF1 matches event names without regard to case, so "monaco" and
+    "Monaco" are the same session and share one key.
+    """
+    event = event_key(event)
+    if isinstance(event, str):
+        event = event.casefold()
 
-def load_session(year: int, event: str, session_type: str, **options):
-    """Load a session, or raise a 404 if it has no data yet."""
+    return (int(year), event, session_type.strip().upper())
+
+
+def load_session(year: int, event: str, session_type: str, parts=EVERYTHING):
+    """Load a session with at least `parts`, or raise a 404 if it has no data yet."""
+    key = session_key(year, event, session_type)
+    parts = frozenset(parts)
+
+    while True:
+        loaded = session_pool.get(key)
+        if loaded is not None and parts <= loaded.parts:
+            return loaded.session
+
+        loaded = _loads.do(key, lambda: _load(key, year, event, session_type, parts))
+
+        # Someone else's load may have been for fewer parts than this request
+        # needs; then it is this request's turn to add the rest.
+        if parts <= loaded.parts:
+            return loaded.session
+
+
+def _load(key: tuple, year: int, event: str, session_type: str, parts: frozenset) -> _Loaded:
+    # A load that finished between the pool lookup and getting here has
+    # already left its session in the pool.
+    loaded = session_pool.get(key)
+
+    have = frozenset()
+    if loaded is not None:
+        if parts <= loaded.parts:
+            return loaded
+        have = loaded.parts
+
+    # A fresh session even to add parts: what FastF1 already has on disk for
+    # the old one loads again from its own cache.
     session = fastf1.get_session(year, event_key(event), session_type)
+    parts = have | parts
 
-    try:
-        session.load(**options)
-    except Exception:
-        logger.warning("La sesión %s %s %s no se pudo cargar", year, event, session_type)
-        raise _sin_datos(year, event, session_type)
+    # A finished session that was loaded before comes back from the columnar
+    # store instead of going through FastF1 again.
+    restored = session_store.restore(year, session, parts)
+
+    if not restored:
+        try:
+            session.load(**{part: part in parts for part in PARTS})
+        except Exception:
+            logger.warning("La sesión %s %s %s no se pudo cargar", year, event, session_type)
+            raise _sin_datos(year, event, session_type)
 
     # "Finished loading data for 0 drivers" is what an unraced session looks
     # like: everything failed quietly and the frames are empty.
     if len(session.drivers) == 0:
         raise _sin_datos(year, event, session_type)
 
-    return session
+    if not restored:
+        session_store.save(year, session, parts)
+
+    loaded = _Loaded(session, parts)
+    session_pool.put(key, loaded, size=estimate_bytes(session))
+
+    return loaded
 
 
 def _sin_datos(year: int, event: str, session_type: str) -> HTTPException:
@@ -0,0 +1,114 @@
+"""
+Only the telemetry channels a chart asks for, only as precise as it draws them.
+
+`Lap.get_telemetry()` returns every channel FastF1 has: Date, SessionTime,
+Source, Status, DriverAhead... and floats with all their decimals. A speed
+trace needs Distance and Speed; a pedal trace, Throttle and Brake. The rest is
+most of the response and none of the chart.
+
+`channels=Speed,Throttle` keeps those channels (and Distance, the axis every
+trace is drawn against) before the frame is serialized. `precision=1` rounds
+the floats to that many decimals, and channels whose values are all whole
+numbers (RPM, nGear, DRS once rounded) go as the smallest integer type that
+holds them: shorter in JSON, narrower in Arrow.
+
+`points=300` also keeps only as many samples as the chart has room for,
+chosen so its peaks survive (see `downsampling`).
+
+Each projection is a response of its own, cached under its own key, so the
+narrow requests the charts make are served from cache as cheaply as any other.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from app.utils.downsampling import AXIS, downsample_frame
+
+# What `Lap.get_telemetry()` returns, in its order.
+CHANNELS = (
+    "Date", "SessionTime", "DriverAhead", "DistanceToDriverAhead", "Time", "RPM", "Speed",
+    "nGear", "Throttle", "Brake", "DRS", "Source", "Distance", "RelativeDistance",
+    "Status", "X", "Y", "Z",
+)
+
+_BY_NAME = {channel.lower(): channel for channel in CHANNELS}
+
+CHANNELS_DESCRIPTION = (
+    "Comma-separated channels to return (e.g. Speed,Throttle,Brake); Distance is always "
+    "included. All channels if omitted"
+)
+PRECISION_DESCRIPTION = "Decimals to round float channels to; whole-number channels become integers"
+POINTS_DESCRIPTION = "Samples to reduce the lap to (e.g. 300), keeping its peaks. All samples if omitted"
+METHOD_DESCRIPTION = (
+    "How to reduce to `points`: lttb keeps the most telling real samples; grid resamples "
+    "on evenly spaced distances, so laps line up point for point"
+)
+
+
+def parse_channels(channels: Optional[str]) -> Optional[tuple[str, ...]]:
+    """`channels=` -> the channels asked for, spelled and ordered as FastF1 does.
+
+    Order and case do not matter, so equivalent requests share a cache entry.
+    """
+    if channels is None or not channels.strip():
+        return None
+
+    names = {name.strip().lower() for name in channels.split(",") if name.strip()}
+    unknown = sorted(name for name in names if name not in _BY_NAME)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Canal desconocido: {', '.join(unknown)}. Canales disponibles: {', '.join(CHANNELS)}",
+        )
+
+    names.add(AXIS.lower())
+    return tuple(channel for channel in CHANNELS if channel.lower() in names)
+
+
+def projection_key(
+    channels: Optional[tuple[str, ...]],
+    precision: Optional[int],
+    points: Optional[int] = None,
+    method: str = "lttb",
+) -> str:
+    """The part of a cache key that tells one projection from another."""
+    key = f"{'-'.join(channels) if channels else 'all'}_{precision}"
+    if points is not None:
+        key += f"_{method}{points}"
+    return key
+
+
+def project(
+    frame: pd.DataFrame,
+    channels: Optional[tuple[str, ...]] = None,
+    precision: Optional[int] = None,
+    points: Optional[int] = None,
+    method: str = "lttb",
+) -> pd.DataFrame:
+    """`frame` cut to `channels` (as `parse_channels` left them), reduced to
+    `points` samples by `method`, rounded to `precision`."""
+    if channels is not None:
+        frame = frame[[channel for channel in channels if channel in frame.columns]]
+
+    # After the cut: the samples kept are the telling ones for these channels.
+    frame = downsample_frame(frame, points, method)
+
+    if precision is None:
+        return frame
+
+    # A new frame, column by column: the one passed in is left as it was.
+    return pd.DataFrame({column: _rounded(frame[column], precision) for column in frame.columns})
+
+
+def _rounded(series: pd.Series, precision: int) -> pd.Series:
+    if not pd.api.types.is_float_dtype(series):
+        return series
+
+    series = series.round(precision)
+    values = series.to_numpy()
+    if np.isfinite(values).all() and np.array_equal(values, np.floor(values)):
+        return pd.to_numeric(series, downcast="integer")
+    return series
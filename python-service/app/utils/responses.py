@@ -0,0 +1,96 @@
+"""
+The response for an encoded body that is, or is about to be, in the cache.
+
+The body is sent as the compressed variant the client's Accept-Encoding
+allows, when the cache has made it, so serving a hit costs no compression;
+otherwise it goes as is. Whether a variant exists is looked up when the
+response is sent, since that is when the request's headers are at hand.
+
+It also carries the body's ETag and a Cache-Control as long as the cache
+itself keeps the body: a year for a final session, a minute for one still on
+track. The Next.js layer and browsers then revalidate with If-None-Match, and
+an unchanged body is answered with a bodiless 304: the ETag was computed when
+the body was cached, so nothing is hashed, compressed or sent for it.
+"""
+
+import time
+
+from fastapi.responses import Response
+from starlette.datastructures import Headers
+
+from app.utils.cache_manager import cache_manager
+from app.utils.compression import CODECS, MIN_SIZE, choose, compression_stats
+
+# What a final session's responses may be kept for downstream: they never change.
+FINAL_MAX_AGE = 365 * 24 * 3600
+
+
+def cache_control(expire_at: float | None) -> str:
+    """Cache-Control for a body the cache keeps until `expire_at`."""
+    if expire_at is None:
+        return f"public, max-age={FINAL_MAX_AGE}, immutable"
+    return f"public, max-age={max(0, int(expire_at - time.time()))}"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match names `etag` (weak comparison, as RFC 9110 asks)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(",")
+    )
+
+
+class CachedResponse(Response):
+    """Encoded bytes cached under `cache_key`, sent compressed if possible."""
+
+    def __init__(self, content: bytes, media_type: str, cache_key: str = None, headers: dict = None):
+        super().__init__(content=content, media_type=media_type, headers=headers)
+        self.cache_key = cache_key
+        if self._compressible:
+            self.headers.add_vary_header("Accept-Encoding")
+
+    @property
+    def _compressible(self) -> bool:
+        return self.cache_key is not None and len(self.body) >= MIN_SIZE
+
+    async def __call__(self, scope, receive, send):
+        request_headers = Headers(scope=scope)
+
+        meta = cache_manager.meta(self.cache_key) if self.cache_key is not None else None
+        if meta is not None:
+            etag, expire_at = meta
+            self.headers["ETag"] = etag
+            self.headers["Cache-Control"] = cache_control(expire_at)
+
+            if etag_matches(request_headers.get("if-none-match"), etag):
+                await self._not_modified()(scope, receive, send)
+                return
+
+        if self._compressible:
+            self._use_variant(request_headers.get("accept-encoding"))
+        await super().__call__(scope, receive, send)
+
+    def _not_modified(self) -> Response:
+        # A 304 repeats the validators and caching headers, and nothing else.
+        headers = {
+            name: self.headers[name]
+            for name in ("ETag", "Cache-Control", "Vary")
+            if name in self.headers
+        }
+        return Response(status_code=304, headers=headers)
+
+    def _use_variant(self, accept_encoding: str | None):
+        codec = choose(accept_encoding, CODECS)
+        compressed = cache_manager.variant(self.cache_key, codec) if codec else None
+        compression_stats.served(codec if compressed is not None else None)
+
+        if compressed is None:
+            return
+
+        self.body = compressed
+        self.headers["Content-Encoding"] = codec
+        self.headers["Content-Length"] = str(len(compressed))
@@ -0,0 +1,34 @@
+"""
+Picking the lap a telemetry request is about.
+
+Every telemetry endpoint does the same thing first: a driver's laps, then the
+one asked for or, if none was, their fastest. The 404s say which of those
+failed, because "no laps for this driver" and "no timed lap" send the page to
+different messages.
+"""
+
+from typing import Optional
+
+from fastapi import HTTPException
+
+
+def pick_lap(laps, driver: str, lap: Optional[int] = None):
+    """The `lap` of `driver` in a session's laps, or their fastest one."""
+    driver_laps = laps.pick_drivers(driver)
+
+    if driver_laps.empty:
+        raise HTTPException(status_code=404, detail=f"No laps found for driver {driver}")
+
+    if lap is not None:
+        target_lap = driver_laps[driver_laps['LapNumber'] == lap]
+        if target_lap.empty:
+            raise HTTPException(status_code=404, detail=f"Lap {lap} not found for driver {driver}")
+        return target_lap.iloc[0]
+
+    # pick_fastest() already returns a single Lap (or None); indexing it
+    # with .iloc[0] would yield that lap's first column instead.
+    lap_data = driver_laps.pick_fastest()
+    if lap_data is None:
+        raise HTTPException(status_code=404, detail=f"No timed lap found for driver {driver}")
+
+    return lap_data
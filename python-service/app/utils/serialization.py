@@ -6,13 +6,23 @@ a driver leads, and channels are NaN before their first sample. Python's json
 encoder emits a bare `nan` for those, which is not valid JSON, so FastAPI
 raises and the whole response turns into a 500.
 
-pandas' own writer maps NaN to null and timestamps to ISO strings, so records
-are round-tripped through it rather than hand-cleaned.
+Frames are turned into plain Python values a column at a time, the way
+pandas' own writer would render them — NaN as null, timestamps as ISO strings —
+and handed to orjson as they are. Going through `DataFrame.to_json` and
+`json.loads` first encoded every response twice.
+
+A response is encoded to JSON bytes once, with orjson, and those bytes are
+what the cache keeps and what every later hit sends as is. Before, each hit
+unpickled thousands of dicts only for FastAPI to walk them with
+`jsonable_encoder` and `json.dumps` all over again.
 """
 
-import json
-
+import numpy as np
+import orjson
 import pandas as pd
+from fastapi.responses import Response
+
+from app.utils.responses import CachedResponse
 
 
 def format_lap_time(value) -> str | None:
@@ -29,23 +39,149 @@ def format_lap_time(value) -> str | None:
     return f"{seconds:.3f}"
 
 
+_US_PER_MS = 1_000
+_US_PER_MINUTE = 60_000_000
+_SECONDS = np.array([str(second) for second in range(61)])
+_PADDED_SECONDS = np.array([f"{second:02d}" for second in range(61)])
+_MILLISECONDS = np.array([f"{millisecond:03d}" for millisecond in range(1000)])
+
+
+def format_lap_times(values) -> np.ndarray:
+    """`format_lap_time` over a whole timedelta column, with NumPy.
+
+    A race's laps are ~1,200 rows with nine timedelta columns, and mapping
+    `format_lap_time` over them is one Python call per cell. Here minutes,
+    seconds and milliseconds come from the int64 nanoseconds in a few array
+    operations, and the strings are assembled column-wide.
+
+    The result is the string `format_lap_time` gives, cell for cell, quirks
+    included. Like `Timedelta.total_seconds()` it works in whole microseconds
+    (floored); a negative time keeps divmod's floor ("-1:59.500" for -0.5 s);
+    59.9996 s rounds to "60.000". Where integer and float rounding can
+    disagree — a time exactly halfway between two milliseconds, or a whole
+    minute, which the float may land just under — the cell is formatted by
+    `format_lap_time` itself. FastF1's own times are whole milliseconds, so
+    that is a handful of cells at most. Missing values are None.
+    """
+    nanoseconds = np.asarray(values, dtype="timedelta64[ns]")
+    missing = np.isnat(nanoseconds)
+    microseconds = np.where(missing, 0, np.floor_divide(nanoseconds.view("i8"), 1_000))
+
+    minutes = np.floor_divide(microseconds, _US_PER_MINUTE)
+    remainder = microseconds - minutes * _US_PER_MINUTE
+    milliseconds = (remainder + _US_PER_MS // 2) // _US_PER_MS
+    uncertain = ((remainder % _US_PER_MS == _US_PER_MS // 2) | (remainder == 0)) & ~missing
+
+    # Digits come from lookup tables rather than int -> str conversions,
+    # which are most of the cost: seconds are 0-60, milliseconds 0-999, and
+    # a column holds only a few distinct minutes.
+    seconds, fraction = np.divmod(milliseconds, 1000)
+    distinct, position = np.unique(minutes, return_inverse=True)
+    minute_text = np.array([f"{minute}:" for minute in distinct.tolist()], dtype=str)[position.reshape(-1)]
+
+    formatted = np.where(
+        minutes != 0,
+        np.char.add(minute_text, _PADDED_SECONDS[seconds]),
+        _SECONDS[seconds],
+    )
+    formatted = np.char.add(np.char.add(formatted, "."), _MILLISECONDS[fraction]).astype(object)
+
+    formatted[missing] = None
+    for index in np.flatnonzero(uncertain):
+        formatted[index] = format_lap_time(pd.Timedelta(nanoseconds[index]))
+
+    return formatted
+
+
 def records(frame: pd.DataFrame) -> list[dict]:
     """DataFrame -> list of JSON-safe dicts (NaN becomes null).
 
     Timedelta columns are formatted first: pandas would otherwise render them
     as ISO-8601 durations, which is not what anyone wants to read on a timing
-    screen.
+    screen. The frame is not copied for it (see `readable`).
     """
     if frame is None or frame.empty:
         return []
 
-    frame = frame.copy()
+    names = list(frame.columns)
+    values = [_json_values(frame.iloc[:, index]) for index in range(frame.shape[1])]
+    return [dict(zip(names, row)) for row in zip(*values)]
 
-    for column in frame.columns:
-        if pd.api.types.is_timedelta64_dtype(frame[column]):
-            frame[column] = frame[column].map(format_lap_time)
 
-    return json.loads(frame.to_json(orient="records", date_format="iso"))
+def readable(frame: pd.DataFrame) -> pd.DataFrame:
+    """`frame` with its timedelta columns formatted as lap times, uncopied.
+
+    The formatted columns go into a new frame next to the untouched ones,
+    which are shared with `frame`, not copied.
+    """
+    timedeltas = [
+        index for index, dtype in enumerate(frame.dtypes) if pd.api.types.is_timedelta64_dtype(dtype)
+    ]
+    if not timedeltas:
+        return frame
+
+    data = {
+        index: (format_lap_times(frame.iloc[:, index]) if index in timedeltas else frame.iloc[:, index])
+        for index in range(frame.shape[1])
+    }
+    formatted = pd.DataFrame(data, index=frame.index, copy=False)
+    formatted.columns = frame.columns
+    return formatted
+
+
+def columns(frame: pd.DataFrame) -> dict[str, list]:
+    """DataFrame -> one JSON-safe list per column, the `format=columnar` shape.
+
+    Same values as `records`, without repeating every column name once per
+    sample: a telemetry lap is some 700 rows of ~18 channels, and as records
+    most of its bytes were the keys.
+    """
+    if frame is None or frame.empty:
+        return {}
+
+    return {column: _json_values(frame.iloc[:, index]) for index, column in enumerate(frame.columns)}
+
+
+def _json_values(series: pd.Series) -> list:
+    """One column -> a list of JSON-safe Python values.
+
+    What `to_json(date_format="iso")` would write for it: lap times formatted,
+    timestamps as ISO strings to the millisecond ("Z" when tz-aware, in UTC),
+    NaN, infinities and missing values as None.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_timedelta64_dtype(dtype):
+        return format_lap_times(series).tolist()
+
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        aware = getattr(dtype, "tz", None) is not None
+        if aware:
+            series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+        stamps = series.to_numpy(dtype="datetime64[ns]").astype("datetime64[ms]")
+        text = np.datetime_as_string(stamps, unit="ms")
+        if aware:
+            text = np.char.add(text, "Z")
+        text = text.astype(object)
+        text[np.isnat(stamps)] = None
+        return text.tolist()
+
+    if isinstance(dtype, np.dtype) and dtype.kind == "f":
+        numbers = series.to_numpy()
+        values = numbers.astype(object)
+        values[~np.isfinite(numbers)] = None
+        return values.tolist()
+
+    if isinstance(dtype, np.dtype) and dtype.kind in "iub":
+        return series.tolist()
+
+    # Objects, strings, categories and pandas' nullable types.
+    values = series.to_numpy(dtype=object)
+    values[pd.isna(values)] = None
+    return values.tolist()
+
+
+# How a route may lay out a frame: one dict per row, or one list per column.
+FRAME_FORMATS = {"records": records, "columnar": columns}
 
 
 def scalar(value):
@@ -57,3 +193,54 @@ def scalar(value):
         return value.item()
 
     return value
+
+
+# numpy scalars (a `.max()` left unconverted) encode as their value; NaN and
+# infinities become null, as pandas' writer does.
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def encode(payload) -> bytes:
+    """Response payload -> JSON bytes, ready to send and to cache."""
+    try:
+        return orjson.dumps(payload, default=_fallback, option=_ORJSON_OPTIONS)
+    except TypeError:
+        # Keys JSON has no spelling for: the ("LapNumber", "min") columns of a
+        # pandas aggregation. They are joined into one string.
+        return orjson.dumps(_string_keys(payload), default=_fallback, option=_ORJSON_OPTIONS)
+
+
+def build_json(build, *args, **kwargs) -> bytes:
+    """Run a route's builder and encode what it returns, in the same worker."""
+    return encode(build(*args, **kwargs))
+
+
+def json_response(body: bytes, cache_key: str = None) -> Response:
+    """Already-encoded JSON, sent without going through FastAPI's encoder.
+
+    With the `cache_key` it is cached under, it goes out compressed when the
+    cache holds a variant the client accepts.
+    """
+    return CachedResponse(content=body, media_type="application/json", cache_key=cache_key)
+
+
+def _fallback(value):
+    # What FastAPI's encoder did with these, so payloads read the same.
+    if value is pd.NA or value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, pd.Timedelta):
+        return value.total_seconds()
+    raise TypeError
+
+
+def _string_keys(value):
+    if isinstance(value, dict):
+        return {
+            ("_".join(map(str, key)) if isinstance(key, tuple) else key): _string_keys(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_string_keys(item) for item in value]
+    return value
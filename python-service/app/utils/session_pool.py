@@ -0,0 +1,140 @@
+"""
+Loaded sessions kept in memory between requests.
+
+Every endpoint needs a FastF1 `Session`, and rebuilding one from FastF1's disk
+cache is the expensive part of a request: seconds of unpickling and pandas work
+and a few hundred MB each time. The response cache hides that for a repeated
+request, but not for the burst that follows a race, when every driver's
+telemetry, the stints and the weather are asked for once each — all of them
+from the same session.
+
+The pool keeps the sessions themselves. It is bounded by an estimate of the
+memory they hold rather than by how many there are, because a practice session
+without telemetry and a race with it differ by two orders of magnitude, and it
+evicts the least recently used one first.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Frames held directly by a loaded session, and dicts of per-driver frames.
+_FRAMES = ("laps", "results", "weather_data", "race_control_messages",
+           "track_status", "session_status")
+_PER_DRIVER = ("car_data", "pos_data")
+
+
+def estimate_bytes(session) -> int:
+    """Rough size of what a loaded session keeps in memory.
+
+    Only the frames are counted, shallowly: the telemetry is numeric and
+    dominates, and measuring every string deeply would cost more than the
+    eviction it informs is worth. Parts that were never loaded count as zero.
+    """
+    total = 0
+
+    for name in _FRAMES:
+        total += _frame_bytes(_loaded(session, name))
+
+    for name in _PER_DRIVER:
+        per_driver = _loaded(session, name)
+        if isinstance(per_driver, dict):
+            total += sum(_frame_bytes(frame) for frame in per_driver.values())
+
+    return total
+
+
+def _loaded(session, name):
+    # FastF1 raises DataNotLoadedError for a part that was not requested.
+    try:
+        return getattr(session, name)
+    except Exception:
+        return None
+
+
+def _frame_bytes(frame) -> int:
+    if frame is None or not hasattr(frame, "memory_usage"):
+        return 0
+    return int(frame.memory_usage(index=True, deep=False).sum())
+
+
+class SessionPool:
+    """LRU of loaded sessions, bounded by their estimated size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """The session stored under `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key, session, size: int | None = None):
+        """Keep `session`, evicting the least recently used ones to fit it.
+
+        A session larger than the whole pool is not kept: holding it would
+        mean evicting everything else for something that still does not fit.
+        """
+        if self.max_bytes <= 0:
+            return
+
+        size = estimate_bytes(session) if size is None else size
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            if size > self.max_bytes:
+                logger.info("Session %s (%d MB) does not fit in the pool", key, size >> 20)
+                return
+
+            while self._entries and self._bytes + size > self.max_bytes:
+                evicted, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                logger.info("Evicted session %s (%d MB) from the pool", evicted, evicted_size >> 20)
+
+            self._entries[key] = (session, size)
+            self._bytes += size
+
+    def discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# Global session pool instance
+session_pool = SessionPool(settings.SESSION_POOL_MB * 1024 * 1024)
@@ -0,0 +1,256 @@
+"""
+Finished sessions stored as columnar files, read back without FastF1.
+
+Loading a historical race through FastF1 means unpickling its API cache and
+running all of its processing again — seconds per session, every time a worker
+starts cold. Once a session is final none of that output changes, so the first
+load writes what it produced to disk as Feather files: the laps, each driver's
+car and position telemetry, the weather, the results. The next cold load reads
+those back instead.
+
+The files are uncompressed Arrow and are read memory-mapped, so numeric columns
+come back as views on the mapped file rather than copies: a few tens of
+milliseconds per session, and the pages are shared through the OS page cache by
+every uvicorn worker that reads the same race.
+
+Restoring means filling a FastF1 `Session` with what `Session.load` would have
+left in it. Those are FastF1's private attributes, so the store's directory is
+versioned with FastF1's own version and ours: after an upgrade of either the
+old files are simply not found, and the session is loaded the slow way once and
+written again. Anything that fails while restoring does the same.
+"""
+
+import logging
+import os
+import pickle
+import shutil
+import uuid
+from pathlib import Path
+
+import fastf1
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from fastf1.core import Laps, SessionResults, Telemetry
+
+from app.config import settings
+from app.utils.finality import is_final
+
+logger = logging.getLogger(__name__)
+
+
+# Bump when the layout below changes.
+STORE_VERSION = 1
+
+# Frame files per loadable part, and the private Session attribute each fills.
+_FRAMES = {
+    "laps": {"laps": "_laps", "session_status": "_session_status", "track_status": "_track_status"},
+    "weather": {"weather": "_weather_data"},
+    "messages": {"messages": "_race_control_messages"},
+}
+# Everything else a part leaves in the session, kept in the manifest.
+_SCALARS = {
+    "laps": ("_total_laps", "_session_start_time", "_session_split_times"),
+    "telemetry": ("_t0_date",),
+}
+_PER_DRIVER = {"car_data": "_car_data", "pos_data": "_pos_data"}
+
+
+class SessionStore:
+    """Versioned directory of final sessions, one folder per session."""
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = Path(root) / "sessions" / f"v{STORE_VERSION}-fastf1-{fastf1.__version__}"
+        self.enabled = enabled
+
+    def _path(self, year: int, session) -> Path:
+        return self.root / str(int(year)) / f"{int(session.event['RoundNumber']):02d}" / session.name
+
+    def restore(self, year: int, session, parts: frozenset) -> bool:
+        """Fill an unloaded `session` from the store, if it holds `parts`.
+
+        Results and session info always come along, as with `Session.load`.
+        False, with the session untouched, when it cannot.
+        """
+        if not self.enabled or not is_final(session.date):
+            return False
+
+        path = self._path(year, session)
+        manifest = self._manifest(path)
+        if manifest is None or not parts <= manifest["parts"]:
+            return False
+
+        try:
+            values = {
+                "_session_info": manifest["session_info"],
+                "_results": SessionResults(_read(path / "results.feather")),
+            }
+
+            for part in parts:
+                for name, attribute in _FRAMES.get(part, {}).items():
+                    # Absent when FastF1 could not load it either.
+                    if not (path / f"{name}.feather").exists():
+                        continue
+                    frame = _read(path / f"{name}.feather")
+                    values[attribute] = Laps(frame, session=session) if name == "laps" else frame
+                for attribute in _SCALARS.get(part, ()):
+                    values[attribute] = manifest["scalars"][attribute]
+
+            if "telemetry" in parts:
+                for name, attribute in _PER_DRIVER.items():
+                    if not (path / name).is_dir():
+                        continue
+                    values[attribute] = {
+                        file.stem: Telemetry(_read(file), session=session, driver=file.stem)
+                        for file in sorted((path / name).glob("*.feather"))
+                    }
+        except Exception:
+            logger.warning("Stored session at %s could not be read", path, exc_info=True)
+            return False
+
+        for attribute, value in values.items():
+            setattr(session, attribute, value)
+
+        return True
+
+    def save(self, year: int, session, parts: frozenset):
+        """Write a loaded, final `session` with its `parts`.
+
+        The first save writes the folder aside and swaps it in whole, so a
+        reader — in this worker or another — never sees half a session. Later
+        saves only add the parts the folder does not hold yet, next to the
+        others, and list them in the manifest once they are written: what is
+        stored is written once and never dropped.
+        """
+        if not self.enabled or not is_final(session.date):
+            return
+
+        path = self._path(year, session)
+        manifest = self._manifest(path)
+
+        if manifest is None:
+            self._save_new(path, session, frozenset(parts))
+            return
+
+        new = frozenset(parts) - manifest["parts"]
+        if not new:
+            return
+
+        try:
+            scalars = _write_parts(session, new, path)
+            # Re-read: another worker may have added parts of its own meanwhile.
+            manifest = self._manifest(path) or manifest
+            _write_manifest(
+                {
+                    **manifest,
+                    "parts": manifest["parts"] | new,
+                    "scalars": {**manifest["scalars"], **scalars},
+                },
+                path,
+            )
+        except Exception:
+            logger.warning("Could not add %s to stored session %s", sorted(new), path, exc_info=True)
+
+    def _save_new(self, path: Path, session, parts: frozenset):
+        staging = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+
+        try:
+            staging.mkdir(parents=True)
+
+            _write(session.results, staging / "results.feather")
+            scalars = _write_parts(session, parts, staging)
+
+            _write_manifest(
+                {
+                    "parts": parts,
+                    "session_info": getattr(session, "_session_info", None),
+                    "scalars": scalars,
+                },
+                staging,
+            )
+
+            _swap(staging, path)
+        except Exception:
+            # The store is an optimisation: a session that cannot be written is
+            # still served, just loaded through FastF1 next time too.
+            logger.warning("Could not store session %s", path, exc_info=True)
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def _manifest(self, path: Path) -> dict | None:
+        try:
+            with open(path / "manifest.pickle", "rb") as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.warning("Unreadable manifest in %s", path, exc_info=True)
+            return None
+
+
+def _write_parts(session, parts: frozenset, folder: Path) -> dict:
+    """Write the files of `parts` into `folder`; their scalars, for the manifest."""
+    scalars = {}
+    # FastF1 leaves a part unset when it failed to load it; the store leaves
+    # it out too rather than inventing an empty one.
+    for part in parts:
+        for name, attribute in _FRAMES.get(part, {}).items():
+            frame = getattr(session, attribute, None)
+            if frame is not None:
+                _write(frame, folder / f"{name}.feather")
+        for attribute in _SCALARS.get(part, ()):
+            scalars[attribute] = getattr(session, attribute, None)
+
+    if "telemetry" in parts:
+        for name, attribute in _PER_DRIVER.items():
+            per_driver = getattr(session, attribute, None)
+            if per_driver is None:
+                continue
+            # Written aside and renamed into place, replacing whatever a failed
+            # earlier attempt may have left.
+            staging = folder / f".{name}.{uuid.uuid4().hex}"
+            staging.mkdir()
+            for driver, frame in per_driver.items():
+                _write(frame, staging / f"{driver}.feather")
+            shutil.rmtree(folder / name, ignore_errors=True)
+            os.replace(staging, folder / name)
+
+    return scalars
+
+
+def _write_manifest(manifest: dict, folder: Path):
+    # Replaced in one rename: a reader gets the old manifest or the new one.
+    staging = folder / f".manifest.{uuid.uuid4().hex}"
+    with open(staging, "wb") as file:
+        pickle.dump(manifest, file)
+    os.replace(staging, folder / "manifest.pickle")
+
+
+def _write(frame: pd.DataFrame, path: Path):
+    # Plain DataFrame: the FastF1 subclasses carry the session in their
+    # metadata. The index is kept (results are indexed by driver number), and
+    # the file is uncompressed so that reading can memory-map it.
+    table = pa.Table.from_pandas(pd.DataFrame(frame), preserve_index=True)
+    feather.write_feather(table, path, compression="uncompressed")
+
+
+def _read(path: Path) -> pd.DataFrame:
+    table = feather.read_table(path, memory_map=True)
+    # split_blocks keeps each numeric column as a view on the mapped file
+    # instead of consolidating (and copying) them into one block.
+    return table.to_pandas(split_blocks=True)
+
+
+def _swap(staging: Path, path: Path):
+    old = None
+    if path.exists():
+        old = path.with_name(f".{path.name}.old.{uuid.uuid4().hex}")
+        os.replace(path, old)
+
+    os.replace(staging, path)
+
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+# Global session store instance
+session_store = SessionStore(settings.CACHE_DIR, settings.SESSION_STORE_ENABLED)
@@ -0,0 +1,255 @@
+"""
+Lap telemetry, computed here or in a pool of worker processes.
+
+Parsing a session and merging a lap's car and position data in
+`Lap.get_telemetry()` is CPU-bound pandas work under the GIL, so however many
+threads wait on it, one uvicorn process uses one core. With
+`SESSION_PROCESSES` above zero that work moves to that many worker processes
+instead, and throughput grows with the cores the box has.
+
+Each process keeps its own warm sessions — its own session pool — so a job is
+always sent to the same process for the same session: the routing is by
+session, and a process only ever loads the sessions it is sent.
+
+What comes back is not a pickled DataFrame. A FastF1 `Telemetry` frame carries
+its `Session` in its metadata, and pickling it would ship the whole session
+across the pipe with every lap. The frame travels as plain column buffers —
+the raw bytes of each numeric column plus its dtype — and is rebuilt on
+arrival.
+
+With `SESSION_PROCESSES` at zero, the default, nothing changes: the same
+functions run in the calling thread against the local pool.
+"""
+
+import logging
+import multiprocessing
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from app.config import settings
+from app.utils.loading import LAPS, TELEMETRY, load_session, session_key
+from app.utils.selection import pick_lap
+
+logger = logging.getLogger(__name__)
+
+
+# What a worker process can be asked to compute.
+COMPUTATIONS = ("telemetry", "rotation", "drivers")
+
+# How many times a job is sent before a dead process is a 503.
+ATTEMPTS = 2
+
+# What a telemetry endpoint reads from the lap itself.
+LAP_FIELDS = ("Driver", "LapNumber", "LapTime", "IsPersonalBest", "Compound", "TyreLife")
+
+
+def pack_frame(frame: pd.DataFrame) -> dict:
+    """DataFrame -> column buffers that pickle as raw bytes.
+
+    Numeric, boolean, datetime and timedelta columns travel as the bytes of
+    their values; anything else (the `Source` and `Status` strings) as a list.
+    The index is not kept: telemetry is positional.
+    """
+    columns = []
+    for name in frame.columns:
+        values = frame[name].to_numpy()
+        if values.dtype.kind in "biufcmM":
+            values = np.ascontiguousarray(values)
+            columns.append((name, values.dtype.str, values.tobytes()))
+        else:
+            columns.append((name, None, values.tolist()))
+
+    return {"rows": len(frame), "columns": columns}
+
+
+def unpack_frame(packed: dict) -> pd.DataFrame:
+    """Column buffers -> DataFrame, as `pack_frame` left them."""
+    data = {}
+    for name, dtype, values in packed["columns"]:
+        if dtype is None:
+            data[name] = pd.Series(values, dtype=object)
+        else:
+            data[name] = np.frombuffer(values, dtype=np.dtype(dtype))
+
+    return pd.DataFrame(data, index=pd.RangeIndex(packed["rows"]))
+
+
+def _lap_summary(lap_data) -> dict:
+    return {field: lap_data[field] for field in LAP_FIELDS if field in lap_data.index}
+
+
+# --- What runs in the worker process -----------------------------------------
+
+def _start_worker():
+    import fastf1
+
+    fastf1.Cache.enable_cache(settings.FASTF1_CACHE_DIR)
+
+
+def _run(job: tuple):
+    computation, year, event, session_type, driver, lap = job
+    if computation not in COMPUTATIONS:
+        raise ValueError(f"Unknown computation {computation!r}")
+
+    try:
+        session = load_session(year, event, session_type, TELEMETRY)
+
+        if computation == "telemetry":
+            lap_data = pick_lap(session.laps, driver, lap)
+            return {
+                "lap": _lap_summary(lap_data),
+                "telemetry": pack_frame(lap_data.get_telemetry()),
+            }
+
+        if computation == "rotation":
+            return {"rotation": _rotation(session)}
+
+        return {"drivers": _drivers(session)}
+
+    except HTTPException as error:
+        # Sent back as plain values: the 404s must reach the route as 404s.
+        return {"error": (error.status_code, error.detail)}
+
+
+def _rotation(session) -> float:
+    # La rotación es opcional: si FastF1 no la trae, el mapa se dibuja sin
+    # girar en vez de no dibujarse.
+    try:
+        return float(session.get_circuit_info().rotation)
+    except Exception:
+        logger.warning("Circuit rotation unavailable for %s", session)
+        return 0.0
+
+
+def _drivers(session) -> list[str]:
+    return sorted(str(code) for code in session.laps["Driver"].dropna().unique())
+
+
+# --- What runs in the app -----------------------------------------------------
+
+class SessionProcesses:
+    """N single-process executors, one chosen per session."""
+
+    def __init__(self, processes: int):
+        self.processes = max(0, processes)
+        self._executors: list = [None] * self.processes
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def submit(self, job: tuple):
+        """Run `job` in the process that owns its session and wait for it."""
+        index = self._index(job)
+
+        for attempt in range(1, ATTEMPTS + 1):
+            executor = self._executor_at(index)
+            try:
+                result = executor.submit(_run, job).result()
+                break
+            except BrokenProcessPool:
+                # The process died — killed for its memory, most likely — and
+                # its executor refuses every job from then on. A new one takes
+                # its place for the next call.
+                logger.warning("Session process %d died (attempt %d of %d)", index, attempt, ATTEMPTS)
+                self._discard(index, executor)
+        else:
+            raise HTTPException(
+                status_code=503,
+                detail="El proceso de la sesión se ha caído. Vuelve a intentarlo en unos segundos.",
+                headers={"Retry-After": "5"},
+            )
+
+        if "error" in result:
+            status_code, detail = result["error"]
+            raise HTTPException(status_code=status_code, detail=detail)
+
+        return result
+
+    def _executor_for(self, job: tuple) -> ProcessPoolExecutor:
+        return self._executor_at(self._index(job))
+
+    def _index(self, job: tuple) -> int:
+        _, year, event, session_type, _, _ = job
+        # crc32 rather than hash(): string hashes change between runs, and the
+        # same session must keep going to the same process.
+        return zlib.crc32(repr(session_key(year, event, session_type)).encode()) % self.processes
+
+    def _executor_at(self, index: int) -> ProcessPoolExecutor:
+        with self._lock:
+            executor = self._executors[index]
+            if executor is None:
+                # spawn, not fork: the app process has threads running, and a
+                # forked child would inherit their locks in whatever state.
+                executor = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_start_worker,
+                )
+                self._executors[index] = executor
+
+        return executor
+
+    def _discard(self, index: int, executor: ProcessPoolExecutor):
+        with self._lock:
+            # Another caller may have replaced it already.
+            if self._executors[index] is executor:
+                self._executors[index] = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            for executor in self._executors:
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+            self._executors = [None] * self.processes
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "started": sum(executor is not None for executor in self._executors),
+            }
+
+
+# Global process tier instance
+session_processes = SessionProcesses(settings.SESSION_PROCESSES)
+
+
+def lap_telemetry(year: int, event: str, session_type: str, driver: str, lap: Optional[int] = None):
+    """(lap, telemetry) for a driver's lap — `lap` indexes like a FastF1 Lap."""
+    if session_processes.enabled:
+        result = session_processes.submit(("telemetry", year, event, session_type, driver, lap))
+        return pd.Series(result["lap"], dtype=object), unpack_frame(result["telemetry"])
+
+    session = load_session(year, event, session_type, TELEMETRY)
+    lap_data = pick_lap(session.laps, driver, lap)
+    return lap_data, lap_data.get_telemetry()
+
+
+def circuit_rotation(year: int, event: str, session_type: str) -> float:
+    """Rotation of the circuit's track map, 0 when FastF1 has none."""
+    if session_processes.enabled:
+        return session_processes.submit(("rotation", year, event, session_type, None, None))["rotation"]
+
+    return _rotation(load_session(year, event, session_type, TELEMETRY))
+
+
+def session_drivers(year: int, event: str, session_type: str) -> list[str]:
+    """Codes of the drivers with laps in the session, sorted.
+
+    Asked of the process that owns the session when there is one: it loads
+    it anyway for their telemetry, and the app need not load it too.
+    """
+    if session_processes.enabled:
+        return session_processes.submit(("drivers", year, event, session_type, None, None))["drivers"]
+
+    return _drivers(load_session(year, event, session_type, LAPS))
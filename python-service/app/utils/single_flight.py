@@ -0,0 +1,54 @@
+"""
+One load per session, however many requests ask for it at once.
+
+When a race finishes, dozens of people open its telemetry in the same minute.
+Each of those requests misses the response cache and, without this, starts its
+own `session.load()` of the very same session: the CPU, the memory and the
+upstream downloads all multiplied by the number of visitors, for one result.
+
+Here the first caller for a key does the work and everyone who arrives while it
+is running waits for that same call. They all get its result — or its
+exception, so a session with no data yet is one 404 shared by every waiter
+rather than one attempt each.
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one."""
+
+    def __init__(self):
+        self._calls: dict = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Run `fn()` for `key`, or wait for the run already in progress."""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # Once settled the key is free again: a later request after an
+            # error gets a fresh attempt instead of the old failure.
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
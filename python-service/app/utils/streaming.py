@@ -0,0 +1,47 @@
+"""
+Newline-delimited JSON, streamed as it is produced.
+
+The analysis jobs pull whole sessions: every lap of a race, every driver's
+telemetry. As one JSON document that is the whole payload built in memory —
+every row turned into a dict by `records()`, then encoded — before the first
+byte leaves, and a memory peak that grows with the session.
+
+As NDJSON each line is one JSON value: a first line describing what follows,
+then one line per row or per lap. Lines are encoded a chunk at a time and
+sent as they are made, so the client starts reading at once and memory holds
+a chunk, not the session.
+
+Streams are not cached: the session pool already keeps a repeated export
+from loading the session again, and caching would mean holding the whole
+body after all.
+"""
+
+from fastapi.responses import StreamingResponse
+
+from app.utils.serialization import encode, records
+
+MEDIA_TYPE = "application/x-ndjson"
+
+# Rows encoded per chunk: big enough that `records` works column-wide, small
+# enough that a chunk is a few dozen KB.
+CHUNK_ROWS = 250
+
+
+def ndjson_line(value) -> bytes:
+    """One JSON value, as one line."""
+    return encode(value) + b"\n"
+
+
+def frame_lines(frame, chunk_rows: int = CHUNK_ROWS):
+    """A frame's rows as NDJSON, `chunk_rows` lines per chunk of bytes.
+
+    Each line is the row `records` gives, encoded like any other response, so
+    `format=ndjson` and `format=records` carry the same values.
+    """
+    for start in range(0, len(frame), chunk_rows):
+        yield b"".join(ndjson_line(row) for row in records(frame.iloc[start:start + chunk_rows]))
+
+
+def ndjson_response(lines) -> StreamingResponse:
+    """A (sync or async) iterator of NDJSON bytes, streamed."""
+    return StreamingResponse(lines, media_type=MEDIA_TYPE)
@@ -10,6 +10,9 @@ probar sin bajar una sesión entera de internet.
 
 from typing import Iterable
 
+import numpy as np
+import pandas as pd
+
 
 def downsample(points: list[dict], limit: int) -> list[dict]:
     """Reduce una traza a `limit` puntos conservando el primero y el último.
@@ -32,12 +35,17 @@ def downsample(points: list[dict], limit: int) -> list[dict]:
     return muestra
 
 
-def track_points(telemetry, limit: int = 600) -> list[dict]:
+def track_points(telemetry, limit: int = 600, tolerance: float | None = None) -> list[dict]:
     """Coordenadas de la vuelta con su velocidad, listas para pintar.
 
     FastF1 da X e Y en decímetros y con el circuito en la orientación en que se
     grabó. Aquí solo se recortan y redondean: girar el trazado y escalarlo es
     cosa de quien lo dibuja, que es el único que sabe el tamaño del lienzo.
+
+    Sin `tolerance` se toman `limit` muestras a paso fijo, como siempre. Con
+    ella (en metros) el trazado se simplifica por su forma —ver `simplify`—:
+    quedan los vértices que se apartan más de `tolerance` de la línea, hasta
+    `limit`, y cada uno conserva su velocidad y su distancia.
     """
     columnas = {"X", "Y", "Speed"}
     if telemetry is None or telemetry.empty or not columnas.issubset(telemetry.columns):
@@ -49,18 +57,109 @@ def track_points(telemetry, limit: int = 600) -> list[dict]:
     con_distancia = "Distance" in telemetry.columns
     requeridas = ["X", "Y", "Speed"] + (["Distance"] if con_distancia else [])
     limpio = telemetry.dropna(subset=requeridas)
+    if limpio.empty:
+        return []
+
+    x = limpio["X"].to_numpy(dtype=float)
+    y = limpio["Y"].to_numpy(dtype=float)
+
+    if tolerance is None:
+        indices = _a_paso_fijo(len(x), limit)
+    else:
+        # Metros a las décimas de metro de X e Y.
+        indices = simplify(x, y, tolerance * 10, limit)
 
-    puntos = [
+    # Los diccionarios se arman solo para los puntos que se envían, no para
+    # cada muestra de la vuelta.
+    velocidades = limpio["Speed"].to_numpy(dtype=float)[indices].tolist()
+    distancias = (
+        limpio["Distance"].to_numpy(dtype=float)[indices].tolist() if con_distancia else [None] * len(indices)
+    )
+
+    return [
         {
-            "x": float(fila.X),
-            "y": float(fila.Y),
-            "speed": round(float(fila.Speed), 1),
-            "distance": round(float(fila.Distance), 1) if con_distancia else None,
+            "x": px,
+            "y": py,
+            "speed": round(velocidad, 1),
+            "distance": round(distancia, 1) if con_distancia else None,
         }
-        for fila in limpio.itertuples()
+        for px, py, velocidad, distancia in zip(
+            x[indices].tolist(), y[indices].tolist(), velocidades, distancias
+        )
     ]
 
-    return downsample(puntos, limit)
+
+def simplify(x: np.ndarray, y: np.ndarray, tolerance: float, limit: int | None = None) -> np.ndarray:
+    """Índices de los vértices que Ramer–Douglas–Peucker conserva con `tolerance`.
+
+    Un paso fijo reparte los puntos por igual entre rectas y curvas: sobran en
+    la recta de meta y faltan en la horquilla de Mónaco, y para que esta se vea
+    bien hay que subir el límite para todo el circuito. RDP se queda con lo
+    que da forma: parte el trazado por el punto más alejado de la cuerda entre
+    sus extremos mientras ese punto se aparte más de `tolerance`. Una recta
+    queda en sus dos extremos; una curva cerrada, en tantos puntos como pida.
+
+    Cada punto guarda cuánto se apartaba al elegirse (nunca más que su padre),
+    así que si pasan de `limit` se quedan los `limit` más significativos, que
+    es lo que RDP habría dado con una tolerancia algo mayor. El primero y el
+    último siempre están.
+    """
+    total = len(x)
+    if total <= 2:
+        return np.arange(total)
+
+    significancia = np.zeros(total)
+    significancia[0] = significancia[-1] = np.inf
+
+    pendientes = [(0, total - 1, np.inf)]
+    while pendientes:
+        inicio, fin, techo = pendientes.pop()
+        if fin - inicio < 2:
+            continue
+
+        distancias = _a_la_cuerda(x, y, inicio, fin)
+        mayor = int(np.argmax(distancias))
+        desvio = float(distancias[mayor])
+        if desvio <= tolerance:
+            continue
+
+        vertice = inicio + 1 + mayor
+        significancia[vertice] = min(desvio, techo)
+        pendientes.append((inicio, vertice, significancia[vertice]))
+        pendientes.append((vertice, fin, significancia[vertice]))
+
+    conservados = np.flatnonzero(significancia > tolerance)
+    if limit is not None and len(conservados) > limit:
+        mas_significativos = np.argsort(-significancia[conservados], kind="stable")[:limit]
+        conservados = np.sort(conservados[mas_significativos])
+
+    return conservados
+
+
+def _a_la_cuerda(x: np.ndarray, y: np.ndarray, inicio: int, fin: int) -> np.ndarray:
+    """Distancia de cada punto entre `inicio` y `fin` a la recta que los une."""
+    px, py = x[inicio + 1:fin], y[inicio + 1:fin]
+    dx, dy = x[fin] - x[inicio], y[fin] - y[inicio]
+    largo = np.hypot(dx, dy)
+
+    # Una vuelta empieza y acaba en la meta: sin cuerda, cuenta la distancia
+    # al punto de partida.
+    if largo == 0:
+        return np.hypot(px - x[inicio], py - y[inicio])
+
+    return np.abs(dy * (px - x[inicio]) - dx * (py - y[inicio])) / largo
+
+
+def _a_paso_fijo(total: int, limit: int) -> np.ndarray:
+    """Los índices que toma `downsample`, sin pasar por las filas."""
+    if limit < 2 or total <= limit:
+        return np.arange(total)
+
+    paso = (total - 1) / (limit - 1)
+    # `round` de Python redondea las mitades al par, igual que `np.rint`.
+    indices = np.rint(np.arange(limit) * paso).astype(int)
+    indices[-1] = total - 1
+    return indices
 
 
 def stints_from_laps(laps) -> list[dict]:
@@ -70,42 +169,61 @@ def stints_from_laps(laps) -> list[dict]:
     con qué compuesto, desde qué vuelta hasta cuál, y cuántas vueltas duró.
     Las vueltas sin número de stint —datos incompletos de sesiones antiguas— se
     descartan en vez de inventarles uno.
+
+    Se agrupa con NumPy y no fila a fila: una temporada entera son decenas de
+    miles de vueltas, y recorrerlas con `itertuples` era lo que más tardaba en
+    las vistas de estrategia (`python -m benchmarks.stints`).
     """
     columnas = {"Driver", "Stint", "Compound", "LapNumber"}
     if laps is None or laps.empty or not columnas.issubset(laps.columns):
         return []
 
     utiles = laps.dropna(subset=["Driver", "Stint", "LapNumber"])
+    if utiles.empty:
+        return []
 
-    tramos: dict[tuple[str, int], dict] = {}
-    for fila in utiles.itertuples():
-        clave = (str(fila.Driver), int(fila.Stint))
-        vuelta = int(fila.LapNumber)
-        compuesto = str(fila.Compound) if _tiene_valor(fila.Compound) else "UNKNOWN"
-
-        tramo = tramos.get(clave)
-        if tramo is None:
-            tramos[clave] = {
-                "driver": str(fila.Driver),
-                "stint": int(fila.Stint),
-                "compound": compuesto,
-                "start_lap": vuelta,
-                "end_lap": vuelta,
-                "laps": 1,
-            }
-            continue
-
-        tramo["start_lap"] = min(tramo["start_lap"], vuelta)
-        tramo["end_lap"] = max(tramo["end_lap"], vuelta)
-        tramo["laps"] += 1
-
-        # El compuesto se tomaba de la primera vuelta del tramo, y la de salida
-        # de boxes llega a veces sin él: eso etiquetaba UNKNOWN un stint entero
-        # cuyas demás vueltas sí lo traen.
-        if tramo["compound"] == "UNKNOWN" and compuesto != "UNKNOWN":
-            tramo["compound"] = compuesto
+    # Pocos valores distintos en cada columna de texto: se trabaja con sus
+    # códigos, y el texto se mira una vez por valor, no por vuelta.
+    pilotos, nombres = pd.factorize(utiles["Driver"].astype(str), sort=True)
+    compuestos, etiquetas = pd.factorize(utiles["Compound"])
+    # El compuesto se tomaba de la primera vuelta del tramo, y la de salida de
+    # boxes llega a veces sin él: eso etiquetaba UNKNOWN un stint entero cuyas
+    # demás vueltas sí lo traen. Vale el de la primera vuelta que lo tenga.
+    etiquetas = [str(etiqueta) for etiqueta in etiquetas]
+    validas = np.array([e.strip() != "" and e != "UNKNOWN" for e in etiquetas] + [False])
+    conocido = validas[compuestos]  # el código -1 (sin valor) cae en el False del final
+
+    stints = utiles["Stint"].to_numpy(dtype=float).astype(np.int64)
+    vueltas = utiles["LapNumber"].to_numpy(dtype=float).astype(np.int64)
+
+    # Una clave por (piloto, stint) que ordena como el par; el orden estable
+    # deja las vueltas de cada tramo en el orden en que llegaron.
+    clave = pilotos * (stints.max() - stints.min() + 1) + (stints - stints.min())
+    orden = np.argsort(clave, kind="stable")
+    clave, vueltas = clave[orden], vueltas[orden]
+    inicios = np.flatnonzero(np.r_[True, clave[1:] != clave[:-1]])
+
+    posicion = np.where(conocido[orden], np.arange(len(orden)), len(orden))
+    primera = np.minimum.reduceat(posicion, inicios)
+    fines = np.r_[inicios[1:], len(orden)]
 
-    return sorted(tramos.values(), key=lambda t: (t["driver"], t["stint"]))
+    return [
+        {
+            "driver": nombres[pilotos[orden[inicio]]],
+            "stint": int(stints[orden[inicio]]),
+            "compound": etiquetas[compuestos[orden[conocida]]] if conocida < fin else "UNKNOWN",
+            "start_lap": int(desde),
+            "end_lap": int(hasta),
+            "laps": int(fin - inicio),
+        }
+        for inicio, fin, conocida, desde, hasta in zip(
+            inicios.tolist(),
+            fines.tolist(),
+            primera.tolist(),
+            np.minimum.reduceat(vueltas, inicios).tolist(),
+            np.maximum.reduceat(vueltas, inicios).tolist(),
+        )
+    ]
 
 
 def group_by_driver(stints: Iterable[dict], order: list[str] | None = None) -> list[dict]:
@@ -119,16 +237,10 @@ def group_by_driver(stints: Iterable[dict], order: list[str] | None = None) -> l
         por_piloto.setdefault(tramo["driver"], []).append(tramo)
 
     conocidos = [d for d in (order or []) if d in por_piloto]
-    resto = sorted(d for d in por_piloto if d not in conocidos)
+    vistos = set(conocidos)
+    resto = sorted(d for d in por_piloto if d not in vistos)
 
     return [
         {"driver": piloto, "stints": por_piloto[piloto]}
         for piloto in [*conocidos, *resto]
     ]
-
-
-def _tiene_valor(valor) -> bool:
-    if valor is None:
-        return False
-    # NaN es el único valor que no es igual a sí mismo.
-    return valor == valor and str(valor).strip() != ""
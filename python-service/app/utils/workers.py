@@ -0,0 +1,75 @@
+"""
+The blocking FastF1 work, run off the event loop.
+
+Every route is `async def`, but `session.load()`, `get_telemetry()` and the
+pandas work after them are plain blocking calls. Run on the event loop, one
+cold load freezes the whole worker for as long as it takes: cached responses,
+other sessions and even `/health` wait behind it, and a slow health check is
+what gets a container restarted.
+
+That work goes to a dedicated thread pool instead, with its own size, and each
+request awaits its own job. The pool is bounded twice: by how many jobs run at
+once and by how many may wait for a thread. Past that the service answers 503
+straight away — better a quick "try again" than a request that queues behind
+minutes of loads and times out anyway.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.config import settings
+
+
+class WorkerPool:
+    """Bounded thread pool for blocking session work."""
+
+    def __init__(self, threads: int, queue: int):
+        self.threads = max(1, threads)
+        self.queue = max(0, queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="fastf1")
+        # Jobs in the executor, running or waiting. Released by the job itself
+        # when it ends, from the worker thread, hence the lock.
+        self._admitted = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` in the pool and await its result.
+
+        Exceptions raised by `fn` — the 404 of a session without data among
+        them — reach the caller unchanged.
+
+        A job keeps its place until it ends, not until its caller stops
+        waiting: a client that disconnects cancels a job still waiting for a
+        thread, but one already running goes on, and counts, until it is done.
+        """
+        with self._lock:
+            if self._admitted >= self.threads + self.queue:
+                raise HTTPException(
+                    status_code=503,
+                    detail="El servicio está ocupado cargando sesiones. Vuelve a intentarlo en unos segundos.",
+                    headers={"Retry-After": "5"},
+                )
+            self._admitted += 1
+
+        future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self._lock:
+            self._admitted -= 1
+
+    def stats(self) -> dict:
+        return {
+            "threads": self.threads,
+            "queue": self.queue,
+            "admitted": self._admitted,
+        }
+
+
+# Global worker pool instance
+workers = WorkerPool(settings.WORKER_THREADS, settings.WORKER_QUEUE)
@@ -0,0 +1,89 @@
+"""
+Microbenchmark: lap-time formatting and `records` on a race-sized laps frame.
+
+    python -m benchmarks.lap_times
+
+Builds ~1,200 laps with the nine timedelta columns of `session.laps` (no
+network: the values are drawn at random around real lap and sector times),
+checks that `format_lap_times` gives exactly what `format_lap_time` gives
+cell by cell, and times both — and `records` against the copy-and-map it
+replaced.
+"""
+
+import json
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from app.utils.serialization import encode, format_lap_time, format_lap_times, readable, records
+
+TIMEDELTA_COLUMNS = (
+    "Time", "LapTime", "PitOutTime", "PitInTime", "Sector1Time", "Sector2Time",
+    "Sector3Time", "Sector1SessionTime", "Sector2SessionTime",
+)
+
+
+def race_laps(rows: int = 1_200, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(
+        {
+            "Driver": rng.choice(["VER", "LEC", "NOR", "PIA", "HAM", "RUS"], rows),
+            "LapNumber": np.tile(np.arange(1, 61), rows // 60 + 1)[:rows].astype(float),
+            "Position": rng.integers(1, 21, rows).astype(float),
+        }
+    )
+    for column in TIMEDELTA_COLUMNS:
+        # Whole milliseconds, as FastF1 times are, plus some sub-millisecond
+        # values and gaps so every path is exercised.
+        milliseconds = rng.integers(20_000, 6_000_000, rows)
+        values = pd.to_timedelta(milliseconds, unit="ms") + pd.to_timedelta(rng.integers(0, 3, rows) * 100, unit="us")
+        values = values.where(rng.random(rows) > 0.05)
+        frame[column] = values
+    return frame
+
+
+def _records_by_map(frame: pd.DataFrame) -> list[dict]:
+    # What `records` did before: copy the frame, map the scalar formatter.
+    frame = frame.copy()
+    for column in frame.columns:
+        if pd.api.types.is_timedelta64_dtype(frame[column]):
+            frame[column] = frame[column].map(format_lap_time)
+    return json.loads(frame.to_json(orient="records", date_format="iso"))
+
+
+def _best(statement, number: int) -> float:
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number
+
+
+def main():
+    frame = race_laps()
+    cells = 0
+
+    for column in TIMEDELTA_COLUMNS:
+        expected = frame[column].map(format_lap_time).tolist()
+        assert format_lap_times(frame[column]).tolist() == expected, column
+        cells += len(expected)
+    assert records(frame) == _records_by_map(frame)
+    print(f"identical output on {cells} cells and on records()")
+
+    mapped = _best(lambda: [frame[c].map(format_lap_time) for c in TIMEDELTA_COLUMNS], 10)
+    vectorized = _best(lambda: [format_lap_times(frame[c]) for c in TIMEDELTA_COLUMNS], 10)
+    print(f"format, {len(TIMEDELTA_COLUMNS)} columns: map {mapped * 1e3:.2f} ms, "
+          f"vectorized {vectorized * 1e3:.2f} ms ({mapped / vectorized:.1f}x)")
+
+    before = _best(lambda: _records_by_map(frame), 10)
+    after = _best(lambda: records(frame), 10)
+    print(f"records(): copy+map {before * 1e3:.2f} ms, now {after * 1e3:.2f} ms ({before / after:.1f}x)")
+
+    # The response body: through to_json and json.loads first, as records
+    # used to, against the columns handed to orjson directly.
+    twice = _best(
+        lambda: encode(json.loads(readable(frame).to_json(orient="records", date_format="iso"))), 10
+    )
+    once = _best(lambda: encode(records(frame)), 10)
+    print(f"encoded body: via to_json {twice * 1e3:.2f} ms, direct {once * 1e3:.2f} ms ({twice / once:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Microbenchmark: `stints_from_laps` on season-sized laps frames.
+
+    python -m benchmarks.stints
+
+Builds synthetic seasons — 24 races of 20 drivers, ~1,200 laps each — with
+the holes real data has (out-laps without a compound, laps without a stint
+number, drivers who retire), checks that the grouped `stints_from_laps` gives
+exactly what the row-by-row version it replaced gave, and times both on one
+race, one season and three seasons.
+"""
+
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from app.utils.track import stints_from_laps
+
+DRIVERS = (
+    "VER", "PER", "LEC", "SAI", "HAM", "RUS", "NOR", "PIA", "ALO", "STR",
+    "GAS", "OCO", "ALB", "SAR", "TSU", "RIC", "BOT", "ZHO", "HUL", "MAG",
+)
+COMPOUNDS = np.array(["SOFT", "MEDIUM", "HARD", "INTERMEDIATE"], dtype=object)
+
+
+def race_laps(rng: np.random.Generator, event: int, laps: int = 60) -> pd.DataFrame:
+    frames = []
+    for driver in DRIVERS:
+        # A retirement now and then: fewer laps than the winner.
+        last = laps if rng.random() > 0.1 else int(rng.integers(5, laps))
+        lap_numbers = np.arange(1, last + 1, dtype=float)
+        stops = np.sort(rng.choice(np.arange(8, laps - 5), rng.integers(1, 4), replace=False))
+        stint = (np.searchsorted(stops, lap_numbers, side="right") + 1).astype(float)
+        compound = COMPOUNDS[rng.integers(0, 3, len(stops) + 2)][stint.astype(int)]
+        # Out-laps that come without a compound, and laps without a stint.
+        out_laps = np.r_[0, stops]
+        out_laps = out_laps[(out_laps < last) & (rng.random(len(out_laps)) < 0.5)]
+        compound[out_laps] = None
+        stint[rng.random(len(stint)) < 0.01] = np.nan
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Driver": driver,
+                    "LapNumber": lap_numbers,
+                    "Stint": stint,
+                    "Compound": compound,
+                    "Event": event,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def season_laps(seasons: int = 1, races: int = 24, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.concat(
+        [race_laps(rng, event) for event in range(seasons * races)], ignore_index=True
+    )
+    # Each race its own set of drivers, as a season-wide query groups them.
+    frame["Driver"] = frame["Driver"] + "_" + frame["Event"].astype(str)
+    return frame
+
+
+def _stints_by_row(laps) -> list[dict]:
+    # What `stints_from_laps` did before: one dict update per lap.
+    def has_value(value) -> bool:
+        if value is None:
+            return False
+        return value == value and str(value).strip() != ""
+
+    columns = {"Driver", "Stint", "Compound", "LapNumber"}
+    if laps is None or laps.empty or not columns.issubset(laps.columns):
+        return []
+
+    stints: dict[tuple[str, int], dict] = {}
+    for row in laps.dropna(subset=["Driver", "Stint", "LapNumber"]).itertuples():
+        key = (str(row.Driver), int(row.Stint))
+        lap = int(row.LapNumber)
+        compound = str(row.Compound) if has_value(row.Compound) else "UNKNOWN"
+
+        stint = stints.get(key)
+        if stint is None:
+            stints[key] = {
+                "driver": str(row.Driver), "stint": int(row.Stint), "compound": compound,
+                "start_lap": lap, "end_lap": lap, "laps": 1,
+            }
+            continue
+
+        stint["start_lap"] = min(stint["start_lap"], lap)
+        stint["end_lap"] = max(stint["end_lap"], lap)
+        stint["laps"] += 1
+        if stint["compound"] == "UNKNOWN" and compound != "UNKNOWN":
+            stint["compound"] = compound
+
+    return sorted(stints.values(), key=lambda s: (s["driver"], s["stint"]))
+
+
+def _best(statement, number: int) -> float:
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number
+
+
+def main():
+    cases = {
+        "1 race": season_laps(races=1),
+        "1 season": season_laps(),
+        "3 seasons": season_laps(seasons=3, seed=1),
+    }
+
+    for name, frame in cases.items():
+        # In any row order: which lap fills an UNKNOWN stint depends on it.
+        shuffled = frame.sample(frac=1, random_state=0)
+        assert stints_from_laps(frame) == _stints_by_row(frame), name
+        assert stints_from_laps(shuffled) == _stints_by_row(shuffled), name
+
+        number = 20 if len(frame) < 5_000 else 3
+        before = _best(lambda: _stints_by_row(frame), number)
+        after = _best(lambda: stints_from_laps(frame), number)
+        print(f"{name} ({len(frame):,} laps): by row {before * 1e3:.1f} ms, "
+              f"grouped {after * 1e3:.1f} ms ({before / after:.1f}x)")
+
+    print("identical output on every case")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Pruebas de la comparación alineada: dos vueltas en las mismas distancias y el
+delta entre ellas.
+
+Las vueltas son sintéticas y de ritmo conocido: a velocidad constante, el
+delta en cada metro se sabe de antemano.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.alignment import align_laps, delta_seconds
+
+
+def _vuelta(metros_por_segundo: float, muestras: int, desde: float = 0.0) -> pd.DataFrame:
+    distancia = np.linspace(desde, 3000, muestras)
+    return pd.DataFrame(
+        {
+            "Distance": distancia,
+            "Speed": np.full(muestras, metros_por_segundo * 3.6),
+            "nGear": np.full(muestras, 7, dtype="int64"),
+            "Time": pd.to_timedelta(distancia / metros_por_segundo, unit="s"),
+        }
+    )
+
+
+def test_las_dos_vueltas_quedan_en_las_mismas_distancias():
+    rapida, lenta, delta = align_laps(_vuelta(60, 1234), _vuelta(50, 987), points=300)
+
+    assert len(rapida) == len(lenta) == len(delta) == 300
+    assert np.array_equal(rapida["Distance"], lenta["Distance"])
+    assert np.array_equal(rapida["Distance"], delta["Distance"])
+    assert rapida["nGear"].dtype == "int64"
+
+
+def test_el_delta_crece_con_la_distancia():
+    _, _, delta = align_laps(_vuelta(50, 1000), _vuelta(60, 1500), points=100)
+
+    # 1/50 - 1/60 segundos por metro: el primero va perdiendo.
+    esperado = delta["Distance"] * (1 / 50 - 1 / 60)
+    assert np.allclose(delta["Delta"], esperado)
+    assert delta["Delta"].iloc[-1] == pytest.approx(10.0)
+
+
+def test_solo_el_tramo_que_recorren_las_dos():
+    primera, _, delta = align_laps(_vuelta(60, 500, desde=12.5), _vuelta(60, 800), points=50)
+
+    assert delta["Distance"].iloc[0] == 12.5
+    assert delta["Distance"].iloc[-1] == 3000
+    assert primera["Time"].iloc[0] == pd.Timedelta(seconds=12.5 / 60)
+
+
+def test_sin_points_tantas_como_la_vuelta_mas_densa():
+    primera, segunda, _ = align_laps(_vuelta(60, 400), _vuelta(60, 700))
+
+    assert len(primera) == len(segunda) == 700
+
+
+def test_sin_tiempo_no_hay_delta():
+    primera = _vuelta(60, 10).drop(columns="Time")
+
+    assert np.isnan(delta_seconds(primera, _vuelta(60, 10))).all()
+
+
+def test_sin_distancia_no_se_alinea():
+    with pytest.raises(ValueError):
+        align_laps(_vuelta(60, 10).drop(columns="Distance"), _vuelta(60, 10))
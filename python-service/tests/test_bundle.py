@@ -0,0 +1,110 @@
+"""
+Pruebas del lote de una sesión: varias secciones, una sola carga.
+
+Sin red ni FastF1: la carga de la sesión y lo que construye cada sección se
+sustituyen por funciones que anotan la llamada, y la caché es una de prueba
+compartida por todas las rutas.
+"""
+
+import json
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.routes import bundle, laps, sessions, weather
+from app.utils.cache_manager import CacheManager
+from app.utils.loading import LAPS, WEATHER
+
+
+async def _mismo_evento(year, event):
+    return event
+
+
+@pytest.fixture
+def cliente(monkeypatch, tmp_path):
+    llamadas = []
+    cache = CacheManager(directory=str(tmp_path), memory_bytes=1 << 20, background=False)
+
+    def cargar(year, event, session_type, parts):
+        llamadas.append(("load", frozenset(parts)))
+
+    def seccion(nombre, error=None):
+        def construir(year, event, session_type, *args):
+            llamadas.append((nombre, args))
+            if error is not None:
+                raise HTTPException(status_code=error, detail=f"Sin {nombre}")
+            return {"section": nombre, "event": event}
+        return construir
+
+    for modulo in (bundle, laps, sessions, weather):
+        monkeypatch.setattr(modulo, "canonical_event", _mismo_evento)
+        monkeypatch.setattr(modulo, "cache_manager", cache)
+    monkeypatch.setattr(bundle, "load_session", cargar)
+    monkeypatch.setattr(laps, "_session_laps", seccion("laps"))
+    monkeypatch.setattr(laps, "_session_stints", seccion("stints"))
+    monkeypatch.setattr(laps, "_fastest_laps", seccion("fastest"))
+    monkeypatch.setattr(weather, "_session_weather", seccion("weather", error=404))
+    monkeypatch.setattr(sessions, "_session_info", seccion("info"))
+
+    app = FastAPI()
+    app.include_router(laps.router, prefix="/api/laps")
+    app.include_router(bundle.router, prefix="/api/bundle")
+    cliente = TestClient(app)
+    cliente.llamadas = llamadas
+    return cliente
+
+
+def test_una_carga_con_todo_lo_que_hace_falta(cliente):
+    respuesta = cliente.get("/api/bundle/2024/Monaco/r")
+
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert cuerpo["session"] == {"year": 2024, "event": "Monaco", "type": "R"}
+    assert list(cuerpo["sections"]) == ["laps", "stints", "fastest", "weather", "info"]
+    assert cuerpo["sections"]["laps"] == {"section": "laps", "event": "Monaco"}
+    assert cliente.llamadas[0] == ("load", LAPS | WEATHER)
+    assert [nombre for nombre, _ in cliente.llamadas].count("load") == 1
+    # El límite de las vueltas rápidas es el de su ruta.
+    assert ("fastest", (10,)) in cliente.llamadas
+
+
+def test_una_seccion_sin_datos_no_tumba_las_demas(cliente):
+    cuerpo = cliente.get("/api/bundle/2024/Monaco/R", params={"sections": "weather,stints"}).json()
+
+    assert cuerpo["sections"] == {"stints": {"section": "stints", "event": "Monaco"}, "weather": None}
+    assert cuerpo["errors"] == {"weather": {"status": 404, "detail": "Sin weather"}}
+
+
+def test_cada_seccion_queda_en_su_propia_entrada(cliente):
+    cliente.get("/api/bundle/2024/Monaco/R", params={"sections": "laps,fastest"})
+    cliente.llamadas.clear()
+
+    suelta = cliente.get("/api/laps/2024/Monaco/R")
+    otra_vez = cliente.get("/api/bundle/2024/Monaco/R", params={"sections": "fastest,laps"})
+
+    assert json.loads(suelta.content) == {"section": "laps", "event": "Monaco"}
+    assert otra_vez.json()["sections"]["fastest"] == {"section": "fastest", "event": "Monaco"}
+    # Todo sale de la caché: ni carga ni construcción.
+    assert cliente.llamadas == []
+
+
+def test_seccion_desconocida(cliente):
+    respuesta = cliente.get("/api/bundle/2024/Monaco/R", params={"sections": "laps,telemetry"})
+
+    assert respuesta.status_code == 400
+    assert cliente.llamadas == []
+
+
+def test_las_claves_son_las_de_cada_ruta():
+    claves = {nombre: seccion[1](2024, 8, "Q") for nombre, seccion in bundle.SECTIONS.items()}
+
+    # Las mismas que ya hay en disco: cambiarlas es perder la caché.
+    assert claves == {
+        "laps": "laps_2024_8_Q_None",
+        "stints": "stints_2024_8_Q",
+        "fastest": "fastest_laps_2024_8_Q_10",
+        "weather": "weather_2024_8_Q",
+        "info": "session_info_2024_8_Q",
+        "classification": "classification_2024_8_Q",
+    }
@@ -0,0 +1,190 @@
+"""
+Pruebas de cuánto se guarda cada respuesta en la cache.
+
+El calendario no se carga: se sustituye la hora de inicio de la sesión, que es
+lo único que la política mira.
+"""
+
+import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from app.config import settings
+from app.utils import cache_manager as modulo
+from app.utils import finality
+from app.utils.cache_manager import CacheManager, MemoryTier
+
+CARRERA = (2024, 8, "R")
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    # Sin hilo de compresión: las variantes quedan hechas al volver de `set`.
+    manager = CacheManager(directory=str(tmp_path), memory_bytes=1 << 20, background=False)
+    yield manager
+    manager.cache.close()
+
+
+def _empieza(monkeypatch, inicio):
+    monkeypatch.setattr(modulo.event_index, "session_start", lambda *a: inicio)
+
+
+def _caduca(cache, clave):
+    _, expira = cache.cache.get(cache._generate_key(clave), expire_time=True)
+    return expira
+
+
+def test_una_carrera_antigua_no_caduca(cache, monkeypatch):
+    _empieza(monkeypatch, pd.Timestamp("2019-06-09 18:10"))
+
+    cache.set("laps_2019_7_R_None", {"laps": []}, session=(2019, 7, "R"))
+
+    assert _caduca(cache, "laps_2019_7_R_None") is None
+
+
+def test_la_sesion_en_pista_caduca_enseguida(cache, monkeypatch):
+    _empieza(monkeypatch, finality.utc_now() - pd.Timedelta(minutes=30))
+
+    cache.set("laps", {}, session=CARRERA)
+
+    restante = _caduca(cache, "laps") - pd.Timestamp.now().timestamp()
+    assert 0 < restante <= settings.CACHE_TTL_LIVE
+
+
+def test_la_clasificacion_provisional_dura_menos(cache, monkeypatch):
+    _empieza(monkeypatch, finality.utc_now() - pd.Timedelta(hours=6))
+
+    cache.set("stints", {}, session=CARRERA)
+    cache.set("classification", {}, session=CARRERA, provisional=True)
+
+    assert _caduca(cache, "classification") < _caduca(cache, "stints")
+
+
+def test_sin_sesion_sigue_el_ttl_de_siempre(cache):
+    cache.set("schedule_2024", {"events": []})
+
+    restante = _caduca(cache, "schedule_2024") - pd.Timestamp.now().timestamp()
+    assert settings.CACHE_TTL - 5 < restante <= settings.CACHE_TTL
+
+
+def test_al_ser_final_la_entrada_ya_no_caduca(cache, monkeypatch):
+    inicio = finality.utc_now() - pd.Timedelta(hours=6)
+    _empieza(monkeypatch, inicio)
+    cache.set("laps", {"laps": [1]}, session=CARRERA)
+    assert _caduca(cache, "laps") is not None
+
+    # Días después, la misma sesión ya es definitiva.
+    monkeypatch.setattr(
+        finality, "utc_now", lambda: inicio + pd.Timedelta(hours=settings.SESSION_FINAL_HOURS + 5)
+    )
+
+    # Lo que está en memoria caduca con su TTL corto; entonces se lee del
+    # disco y ahí se promueve.
+    cache.memory.clear()
+    assert cache.get("laps") == {"laps": [1]}
+    assert _caduca(cache, "laps") is None
+
+
+def test_el_estado_de_una_sesion():
+    inicio = pd.Timestamp("2024-05-26 13:00")
+    hora = pd.Timedelta(hours=1)
+
+    assert finality.status(inicio, now=inicio - hora) == finality.UPCOMING
+    assert finality.status(inicio, now=inicio + hora) == finality.LIVE
+    assert finality.status(inicio, now=inicio + 6 * hora) == finality.RECENT
+    assert finality.status(inicio, now=inicio + 30 * 24 * hora) == finality.FINAL
+    assert finality.status(None) == finality.UNKNOWN
+
+
+def test_acabada_la_hora_programada_ya_no_esta_en_directo():
+    inicio = pd.Timestamp("2024-05-25 14:00")
+    despues = inicio + pd.Timedelta(minutes=90)
+
+    # Con el tipo se sabe que una clasificación dura una hora, no cuatro.
+    assert finality.status(inicio, now=despues, session_type="Q") == finality.RECENT
+    assert finality.status(inicio, now=despues, session_type="R") == finality.LIVE
+    assert finality.status(inicio, now=despues) == finality.LIVE
+
+
+def test_un_acierto_en_memoria_no_toca_el_disco(cache, monkeypatch):
+    cache.set("stints_2024_8_R", {"drivers": ["LEC"]})
+    monkeypatch.setattr(cache.cache, "get", lambda *a, **k: pytest.fail("leyó del disco"))
+
+    assert cache.get("stints_2024_8_R") == {"drivers": ["LEC"]}
+
+
+def test_lo_leido_del_disco_queda_en_memoria(cache):
+    cache.set("stints", {"drivers": ["LEC"]})
+    cache.memory.clear()
+
+    cache.get("stints")
+
+    assert cache.memory.stats()["entries"] == 1
+
+
+def test_la_memoria_respeta_su_tope():
+    memoria = MemoryTier(max_bytes=100)
+
+    memoria.put("a", "A", 60, None)
+    memoria.put("b", "B", 60, None)
+
+    assert memoria.get("a") is None
+    assert memoria.get("b") == "B"
+    assert memoria.stats()["bytes"] == 60
+
+
+def test_la_memoria_respeta_la_caducidad():
+    memoria = MemoryTier(max_bytes=100)
+
+    memoria.put("viejo", "V", 10, expire_at=0.0)
+
+    assert memoria.get("viejo") is None
+    assert memoria.stats()["bytes"] == 0
+
+
+def test_borrar_borra_tambien_de_memoria(cache):
+    cache.set("laps", {"laps": []})
+
+    cache.delete("laps")
+
+    assert cache.get("laps") is None
+
+
+def test_cada_respuesta_se_guarda_tambien_comprimida(cache):
+    cuerpo = b'{"laps": [' + b'{"Driver": "LEC", "LapTime": "1:12.345"},' * 200 + b'{}]}'
+
+    cache.set("laps", cuerpo)
+
+    comprimido = cache.variant("laps", "gzip")
+    assert gzip.decompress(comprimido) == cuerpo
+    assert len(comprimido) < len(cuerpo) / 10
+
+
+def test_una_respuesta_corta_no_se_comprime(cache):
+    cache.set("stints", b'{"drivers": []}')
+
+    assert cache.variant("stints", "gzip") is None
+
+
+def test_al_reemplazar_una_respuesta_no_queda_la_variante_vieja(cache):
+    cache.set("laps", b"[" + b"1," * 1000 + b"1]")
+    cache._compressor = ThreadPoolExecutor(max_workers=1)
+    cache._compressor.submit(time.sleep, 0.2)  # la nueva variante tardará
+
+    cache.set("laps", b"[" + b"2," * 1000 + b"2]")
+
+    assert cache.variant("laps", "gzip") is None
+    cache._compressor.shutdown(wait=True)
+    assert gzip.decompress(cache.variant("laps", "gzip")).startswith(b"[2,")
+
+
+def test_borrar_borra_tambien_las_variantes(cache):
+    cache.set("laps", b"[" + b"1," * 1000 + b"1]")
+
+    cache.delete("laps")
+
+    assert cache.variant("laps", "gzip") is None
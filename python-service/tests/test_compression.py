@@ -0,0 +1,129 @@
+"""
+Pruebas de las variantes comprimidas: cuál se elige y cuál se envía.
+
+La respuesta se envía a mano, con un `scope` y un `send` que anota los
+mensajes, y la cache es una de prueba sin hilo de compresión.
+"""
+
+import asyncio
+import gzip
+
+import pytest
+
+from app.config import settings
+from app.utils import responses
+from app.utils.cache_manager import CacheManager
+from app.utils.compression import CODECS, choose, compress_variants, compression_stats
+from app.utils.serialization import json_response
+
+CUERPO = b'{"laps": [' + b'{"Driver": "PIA", "Compound": "MEDIUM"},' * 300 + b'{}]}'
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    manager = CacheManager(directory=str(tmp_path), memory_bytes=1 << 20, background=False)
+    monkeypatch.setattr(responses, "cache_manager", manager)
+    yield manager
+    manager.cache.close()
+
+
+def _enviar(respuesta, accept_encoding=None):
+    cabeceras = [] if accept_encoding is None else [(b"accept-encoding", accept_encoding.encode())]
+    mensajes = []
+
+    async def send(mensaje):
+        mensajes.append(mensaje)
+
+    asyncio.run(respuesta({"type": "http", "headers": cabeceras}, None, send))
+    inicio, cuerpo = mensajes
+    return dict((k.decode(), v.decode()) for k, v in inicio["headers"]), cuerpo["body"]
+
+
+def test_se_elige_lo_que_el_cliente_acepta():
+    assert choose("gzip, deflate", CODECS) == "gzip"
+    assert choose("gzip;q=0", CODECS) is None
+    assert choose("identity", CODECS) is None
+    assert choose(None, CODECS) is None
+    assert choose("*", ["gzip"]) == "gzip"
+    assert choose("br, gzip", ["gzip"]) == "gzip"
+
+
+def test_las_variantes_son_mas_pequenas():
+    variantes = compress_variants(CUERPO)
+
+    assert set(variantes) == set(CODECS)
+    assert all(len(comprimido) < len(CUERPO) for comprimido in variantes.values())
+    assert compress_variants(b"{}") == {}
+
+
+def test_un_acierto_sale_comprimido_sin_comprimir(cache, monkeypatch):
+    cache.set("laps_2024_8_R_None", CUERPO)
+    monkeypatch.setattr("app.utils.compression.gzip.compress", lambda *a, **k: pytest.fail("comprimió"))
+
+    cabeceras, cuerpo = _enviar(json_response(CUERPO, "laps_2024_8_R_None"), "gzip, deflate, br")
+
+    codec = cabeceras["content-encoding"]
+    assert codec in CODECS
+    assert int(cabeceras["content-length"]) == len(cuerpo)
+    assert "Accept-Encoding" in cabeceras["vary"]
+    if codec == "gzip":
+        assert gzip.decompress(cuerpo) == CUERPO
+
+
+def test_sin_accept_encoding_sale_tal_cual(cache):
+    cache.set("laps_2024_8_R_None", CUERPO)
+
+    cabeceras, cuerpo = _enviar(json_response(CUERPO, "laps_2024_8_R_None"))
+
+    assert "content-encoding" not in cabeceras
+    assert cuerpo == CUERPO
+
+
+def test_sin_variante_todavia_sale_tal_cual(cache):
+    cabeceras, cuerpo = _enviar(json_response(CUERPO, "sin_cachear"), "gzip")
+
+    assert "content-encoding" not in cabeceras
+    assert cuerpo == CUERPO
+
+
+def test_las_estadisticas_cuentan_lo_que_se_ahorra(cache):
+    antes = compression_stats.stats()["stored"]["gzip"]["entries"]
+
+    cache.set("laps", CUERPO)
+
+    gzip_stats = compression_stats.stats()["stored"]["gzip"]
+    assert gzip_stats["entries"] == antes + 1
+    assert 0 < gzip_stats["ratio"] < 0.2
+
+
+def _al_escribir_variantes(cache, monkeypatch, accion):
+    escribir = cache.cache.set
+
+    def set(key, *args, **kwargs):
+        if key.endswith(tuple(f".{codec}" for codec in CODECS)):
+            accion()
+        return escribir(key, *args, **kwargs)
+
+    monkeypatch.setattr(cache.cache, "set", set)
+
+
+def test_escribir_las_variantes_no_bloquea_a_quien_las_borra(cache, monkeypatch):
+    libre = []
+
+    def probar():
+        libre.append(cache._pending_lock.acquire(blocking=False))
+        if libre[-1]:
+            cache._pending_lock.release()
+
+    _al_escribir_variantes(cache, monkeypatch, probar)
+    cache.set("laps", CUERPO)
+
+    assert libre and all(libre)
+
+
+def test_un_borrado_a_mitad_de_escribir_no_deja_variantes(cache, monkeypatch):
+    _al_escribir_variantes(cache, monkeypatch, lambda: cache.delete("laps"))
+    cache.set("laps", CUERPO)
+
+    assert all(cache.variant("laps", codec) is None for codec in CODECS)
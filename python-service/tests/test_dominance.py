@@ -0,0 +1,140 @@
+"""
+Pruebas del mapa de dominio: quién gana cada minisector y por cuánto.
+
+Vueltas sintéticas en un círculo de 3 km: una más rápida en la primera mitad,
+otra en la segunda, para que el reparto se sepa de antemano. La ruta se monta
+en una aplicación de prueba, sin FastF1.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.routes import telemetry
+from app.utils.cache_manager import CacheManager
+from app.utils.dominance import dominance, point_sectors, sector_times
+
+VUELTA = 3000.0
+
+
+def _vuelta(primera_mitad: float, segunda_mitad: float, muestras: int = 901) -> pd.DataFrame:
+    """Una vuelta a `primera_mitad` m/s hasta los 1.500 m y a `segunda_mitad` después."""
+    distancia = np.linspace(0, VUELTA, muestras)
+    mitad = VUELTA / 2
+    segundos = np.where(
+        distancia <= mitad,
+        distancia / primera_mitad,
+        mitad / primera_mitad + (distancia - mitad) / segunda_mitad,
+    )
+    angulo = distancia / VUELTA * 2 * np.pi
+    return pd.DataFrame(
+        {
+            "Distance": distancia,
+            "Time": pd.to_timedelta(segundos, unit="s"),
+            "Speed": np.where(distancia <= mitad, primera_mitad, segunda_mitad) * 3.6,
+            "X": np.cos(angulo) * 4775,
+            "Y": np.sin(angulo) * 4775,
+        }
+    )
+
+
+def test_el_tiempo_de_cada_minisector():
+    tiempos = sector_times(_vuelta(50, 60), 10)
+
+    assert tiempos[:5] == pytest.approx([300 / 50] * 5)
+    assert tiempos[5:] == pytest.approx([300 / 60] * 5)
+    assert tiempos.sum() == pytest.approx(1500 / 50 + 1500 / 60)
+
+
+def test_sin_tiempo_no_hay_minisectores():
+    assert np.isnan(sector_times(_vuelta(50, 60).drop(columns="Time"), 4)).all()
+
+
+def test_quien_gana_cada_minisector_y_por_cuanto():
+    tiempos = np.array([[6.0, 5.0, np.nan], [5.5, 5.2, np.nan], [7.0, np.nan, np.nan]])
+
+    ganador, mejor, margen = dominance(tiempos)
+
+    assert ganador.tolist() == [1, 0, -1]
+    assert mejor[:2].tolist() == [5.5, 5.0] and np.isnan(mejor[2])
+    assert margen[:2] == pytest.approx([0.5, 0.2]) and np.isnan(margen[2])
+
+
+def test_un_solo_piloto_no_tiene_margen():
+    ganador, _, margen = dominance(np.array([[5.0, 6.0]]))
+
+    assert ganador.tolist() == [0, 0]
+    assert np.isnan(margen).all()
+
+
+def test_cada_punto_en_su_minisector():
+    assert point_sectors([0, 749, 750, 2999, 3000], 4).tolist() == [0, 0, 1, 3, 3]
+
+
+async def _mismo_evento(year, event):
+    return event
+
+
+@pytest.fixture
+def cliente(monkeypatch, tmp_path):
+    vueltas = {"VER": (50, 60), "LEC": (55, 52)}
+    llamadas = []
+
+    def lap_telemetry(year, event, session_type, driver, lap):
+        llamadas.append(driver)
+        if driver == "NOR":
+            # Vueltas, pero sin datos de coche ni de posición.
+            raise KeyError("Position")
+        if driver not in vueltas:
+            raise HTTPException(status_code=404, detail=f"No timed lap found for driver {driver}")
+        tiempo = VUELTA / 2 / vueltas[driver][0] + VUELTA / 2 / vueltas[driver][1]
+        datos = pd.Series({"LapNumber": 12.0, "LapTime": pd.Timedelta(seconds=tiempo)})
+        return datos, _vuelta(*vueltas[driver])
+
+    monkeypatch.setattr(telemetry, "canonical_event", _mismo_evento)
+    monkeypatch.setattr(telemetry, "session_drivers", lambda *args: ["LEC", "NOR", "SAR", "VER"])
+    monkeypatch.setattr(telemetry, "lap_telemetry", lap_telemetry)
+    monkeypatch.setattr(telemetry, "circuit_rotation", lambda *args: 90.0)
+    monkeypatch.setattr(
+        telemetry, "cache_manager",
+        CacheManager(directory=str(tmp_path), memory_bytes=1 << 20, background=False),
+    )
+    app = FastAPI()
+    app.include_router(telemetry.router, prefix="/api/telemetry")
+    cliente = TestClient(app)
+    cliente.llamadas = llamadas
+    return cliente
+
+
+def test_el_mapa_de_dominio_de_una_sesion(cliente):
+    respuesta = cliente.get("/api/telemetry/2024/Monaco/Q/dominance", params={"sectors": 10})
+
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    # SAR no marcó vuelta y NOR no tiene telemetría: no están, y el resto sí.
+    # Por tiempo de vuelta: VER 55 s, LEC 56,1 s.
+    assert [piloto["code"] for piloto in cuerpo["drivers"]] == ["VER", "LEC"]
+    assert cuerpo["reference"] == "VER"
+    assert [m["driver"] for m in cuerpo["mini_sectors"]] == ["LEC"] * 5 + ["VER"] * 5
+    assert cuerpo["mini_sectors"][0]["margin"] == pytest.approx(300 / 50 - 300 / 55, abs=1e-3)
+    assert {piloto["code"]: piloto["sectors_won"] for piloto in cuerpo["drivers"]} == {"LEC": 5, "VER": 5}
+    assert cuerpo["rotation"] == 90.0
+    assert {punto["sector"] for punto in cuerpo["points"]} == set(range(10))
+
+
+def test_el_mapa_se_calcula_una_vez(cliente):
+    params = {"sectors": 8, "drivers": "ver,lec"}
+
+    primera = cliente.get("/api/telemetry/2024/Monaco/Q/dominance", params=params)
+    segunda = cliente.get("/api/telemetry/2024/Monaco/Q/dominance", params=params)
+
+    assert segunda.content == primera.content
+    assert cliente.llamadas == ["LEC", "VER"]
+
+
+def test_sin_vueltas_es_un_404(cliente):
+    respuesta = cliente.get("/api/telemetry/2024/Monaco/Q/dominance", params={"drivers": "SAR"})
+
+    assert respuesta.status_code == 404
@@ -0,0 +1,90 @@
+"""
+Pruebas de la reducción de la telemetría: pocos puntos, sin perder los picos.
+
+La vuelta es sintética: una velocidad suave con una frenada corta en medio,
+que es justo lo que un paso fijo entre muestras se salta.
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.utils.downsampling import downsample_frame, lttb_indices
+from app.utils.projection import project, projection_key
+from app.utils.track import downsample
+
+
+def _vuelta(muestras: int = 5000) -> pd.DataFrame:
+    distancia = np.linspace(0, 5000, muestras)
+    velocidad = 250 + 50 * np.sin(distancia / 300)
+    velocidad[2501:2504] = [120.0, 82.0, 125.0]  # la horquilla
+    freno = np.zeros(muestras, dtype=bool)
+    freno[1233] = True
+    return pd.DataFrame(
+        {
+            "Distance": distancia,
+            "Speed": velocidad,
+            "Brake": freno,
+            "nGear": np.clip(velocidad // 40, 1, 8).astype("int64"),
+            "Time": pd.to_timedelta(distancia / 60, unit="s"),
+            "Source": ["car"] * muestras,
+        }
+    )
+
+
+def test_lttb_conserva_los_picos_que_un_paso_fijo_pierde():
+    vuelta = _vuelta()
+
+    reducida = downsample_frame(vuelta, 300, "lttb")
+    por_paso = downsample(vuelta.to_dict("records"), 300)
+
+    assert len(reducida) == 300
+    assert reducida["Speed"].min() == 82.0
+    assert reducida["Brake"].any()
+    assert min(fila["Speed"] for fila in por_paso) > 82.0
+
+
+def test_lttb_guarda_muestras_reales_con_el_principio_y_el_final():
+    vuelta = _vuelta()
+
+    reducida = downsample_frame(vuelta, 300, "lttb")
+
+    assert reducida["Distance"].iloc[0] == 0.0 and reducida["Distance"].iloc[-1] == 5000.0
+    assert reducida["Distance"].is_monotonic_increasing
+    assert set(reducida["Distance"]).issubset(set(vuelta["Distance"]))
+
+
+def test_lttb_con_una_recta():
+    x = np.arange(100, dtype=float)
+
+    indices = lttb_indices(x, x.copy(), 10)
+
+    assert len(indices) == 10 and indices[0] == 0 and indices[-1] == 99
+
+
+def test_la_rejilla_reparte_la_distancia_por_igual():
+    reducida = downsample_frame(_vuelta(), 101, "grid")
+
+    assert np.allclose(np.diff(reducida["Distance"]), 50.0)
+    # Lo continuo se interpola; la marcha y el texto se toman de la muestra anterior.
+    assert reducida["Speed"].iloc[1] == np.interp(50.0, _vuelta()["Distance"], _vuelta()["Speed"])
+    assert reducida["nGear"].dtype == np.int64 and reducida["Source"].eq("car").all()
+    assert pd.api.types.is_timedelta64_dtype(reducida["Time"])
+
+
+def test_si_ya_hay_pocos_puntos_no_se_toca():
+    vuelta = _vuelta().head(200)
+
+    assert downsample_frame(vuelta, 300, "lttb") is vuelta
+
+
+def test_la_proyeccion_reduce_despues_de_recortar():
+    reducida = project(_vuelta(), ("Speed", "Distance"), precision=0, points=200)
+
+    assert list(reducida.columns) == ["Speed", "Distance"]
+    assert len(reducida) == 200
+    assert reducida["Speed"].min() == 82
+
+
+def test_cada_reduccion_tiene_su_clave():
+    assert projection_key(None, None) == "all_None"
+    assert projection_key(None, None, 300, "grid") != projection_key(None, None, 300, "lttb")
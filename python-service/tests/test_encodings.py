@@ -0,0 +1,114 @@
+"""
+Pruebas de las codificaciones binarias y de cómo se elige una.
+
+Lo que importa: que JSON siga siendo lo de siempre, y que Arrow y MessagePack
+lleven los números como números, con sus tipos.
+"""
+
+import json
+
+import msgpack
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from app.utils.encodings import (
+    ARROW, JSON, MSGPACK, build_encoded, cache_suffix, encoded_response, negotiate,
+)
+from app.utils.serialization import records
+
+
+def _telemetria() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2024-05-26 13:03:00.100", "2024-05-26 13:03:00.350"]),
+            "Time": pd.to_timedelta(["0:00:00.000", "0:00:00.250"]),
+            "Speed": [287.0, float("nan")],
+            "nGear": np.array([7, 8], dtype="int64"),
+            "Brake": [False, True],
+            "Source": ["car", "pos"],
+        }
+    )
+
+
+def _vuelta():
+    return {"driver": "LEC", "lap_time": "1:12.345", "telemetry": _telemetria()}
+
+
+def _comparacion():
+    return {
+        "driver1": {"code": "LEC", "telemetry": _telemetria()},
+        "driver2": {"code": "PIA", "telemetry": _telemetria().head(1)},
+        "delta_time": "0.123",
+    }
+
+
+def test_sin_accept_es_json():
+    assert negotiate(None) == JSON
+    assert negotiate("*/*") == JSON
+    assert negotiate("text/html, application/xhtml+xml, */*;q=0.8") == JSON
+
+
+def test_se_elige_por_preferencia():
+    assert negotiate("application/vnd.apache.arrow.stream") == ARROW
+    assert negotiate("application/x-msgpack") == MSGPACK
+    assert negotiate("application/json;q=0.5, application/msgpack") == MSGPACK
+    assert negotiate("application/msgpack;q=0, application/json") == JSON
+
+
+def test_cada_codificacion_tiene_su_variante_en_cache():
+    assert cache_suffix(JSON) == ""
+    assert len({cache_suffix(JSON), cache_suffix(MSGPACK), cache_suffix(ARROW)}) == 3
+
+
+def test_json_es_el_de_siempre():
+    cuerpo = build_encoded(JSON, "records", _vuelta)
+
+    assert json.loads(cuerpo)["telemetry"] == records(_telemetria())
+
+
+def test_json_columnar():
+    cuerpo = json.loads(build_encoded(JSON, "columnar", _vuelta))
+
+    assert cuerpo["telemetry"]["nGear"] == [7, 8]
+
+
+def test_msgpack_lleva_numeros():
+    cuerpo = msgpack.unpackb(build_encoded(MSGPACK, "records", _vuelta))
+
+    telemetria = cuerpo["telemetry"]
+    assert cuerpo["driver"] == "LEC"
+    assert telemetria["nGear"] == [7, 8]
+    assert telemetria["Time"] == [0.0, 0.25]
+    assert telemetria["Brake"] == [False, True]
+    assert telemetria["Date"][0].startswith("2024-05-26T13:03:00.1")
+
+
+def test_arrow_conserva_los_tipos():
+    lector = pa.ipc.open_stream(build_encoded(ARROW, "records", _vuelta))
+    tabla = lector.read_all()
+
+    assert tabla.schema.field("nGear").type == pa.int64()
+    assert tabla.schema.field("Speed").type == pa.float64()
+    assert pa.types.is_duration(tabla.schema.field("Time").type)
+    assert pa.types.is_timestamp(tabla.schema.field("Date").type)
+    assert tabla.column("Speed").null_count == 1  # NaN llega como null
+
+    resto = json.loads(tabla.schema.metadata[b"apexdata"])
+    assert resto == {"driver": "LEC", "lap_time": "1:12.345", "telemetry": None}
+
+
+def test_arrow_apila_las_dos_vueltas_de_una_comparacion():
+    tabla = pa.ipc.open_stream(build_encoded(ARROW, "records", _comparacion)).read_all()
+
+    assert tabla.num_rows == 3
+    assert tabla.column("part").to_pylist() == [
+        "driver1.telemetry", "driver1.telemetry", "driver2.telemetry"
+    ]
+
+
+def test_la_respuesta_dice_su_tipo():
+    respuesta = encoded_response(b"\x00", ARROW)
+
+    assert respuesta.media_type == "application/vnd.apache.arrow.stream"
+    assert respuesta.headers["vary"] == "Accept"
@@ -0,0 +1,179 @@
+"""
+Pruebas de la identificación del evento: una URL, una ronda.
+
+Sin red: el calendario es un `EventSchedule` de FastF1 construido a mano, con
+las columnas que el índice lee.
+"""
+
+import asyncio
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+from fastf1.events import EventSchedule
+
+from app.utils import events
+from app.utils.events import EventIndex, canonical_event, driver_key, event_key
+
+
+_SESIONES = ("Practice 1", "Practice 2", "Practice 3", "Qualifying", "Race")
+
+
+def _calendario() -> EventSchedule:
+    domingos = pd.to_datetime(["2024-02-25", "2024-05-19", "2024-05-26", "2024-09-01"])
+    # Libres el viernes, clasificación el sábado, carrera el domingo a las 13:00.
+    horas = [-2, -2, -1, -1, 0]
+    sesiones = {}
+    for n, (nombre, dias) in enumerate(zip(_SESIONES, horas), start=1):
+        sesiones[f"Session{n}"] = [nombre] * len(domingos)
+        sesiones[f"Session{n}DateUtc"] = domingos + pd.Timedelta(days=dias, hours=13)
+        sesiones[f"Session{n}Date"] = sesiones[f"Session{n}DateUtc"]
+
+    return EventSchedule(
+        pd.DataFrame(
+            {
+                **sesiones,
+                "RoundNumber": [0, 7, 8, 16],
+                "EventName": [
+                    "Pre-Season Testing", "Emilia Romagna Grand Prix",
+                    "Monaco Grand Prix", "Italian Grand Prix",
+                ],
+                "OfficialEventName": [
+                    "FORMULA 1 ARAMCO PRE-SEASON TESTING 2024",
+                    "FORMULA 1 MSC CRUISES GRAN PREMIO DEL MADE IN ITALY E DELL'EMILIA-ROMAGNA 2024",
+                    "FORMULA 1 GRAND PRIX DE MONACO 2024",
+                    "FORMULA 1 PIRELLI GRAN PREMIO D’ITALIA 2024",
+                ],
+                "Country": ["Bahrain", "Italy", "Monaco", "Italy"],
+                "Location": ["Sakhir", "Imola", "Monaco", "Monza"],
+            }
+        )
+    )
+
+
+@pytest.fixture
+def indice(monkeypatch):
+    pedidos = []
+
+    def get_event_schedule(year):
+        pedidos.append(year)
+        return _calendario()
+
+    monkeypatch.setattr(events.fastf1, "get_event_schedule", get_event_schedule)
+    nuevo = EventIndex()
+    monkeypatch.setattr(events, "event_index", nuevo)
+    nuevo.pedidos = pedidos
+    nuevo.schedule(2024)
+    return nuevo
+
+
+def test_el_nombre_y_la_ronda_son_la_misma_url(indice):
+    assert indice.resolve(2024, "8") == 8
+    assert indice.resolve(2024, "Monaco") == 8
+    assert indice.resolve(2024, " monaco grand prix ") == 8
+    assert indice.resolve(2024, "MONZA") == 16
+
+
+def test_un_pais_con_dos_carreras_no_elige_ninguna_a_ciegas(indice):
+    # "Italy" es Imola y Monza: no sale del índice exacto, sino del parecido
+    # de FastF1, que al menos devuelve una ronda de verdad.
+    assert indice.resolve(2024, "Italy") in (7, 16)
+
+
+def test_el_parecido_se_busca_una_vez(indice, monkeypatch):
+    assert indice.resolve(2024, "emilia") == 7
+
+    calendario = indice.schedule(2024)
+    monkeypatch.setattr(
+        type(calendario), "get_event_by_name",
+        lambda *a, **k: pytest.fail("ya estaba resuelto"),
+    )
+    assert indice.resolve(2024, "Emilia") == 7
+
+
+def test_los_nombres_buscados_por_parecido_tienen_tope(indice, monkeypatch):
+    monkeypatch.setattr(events, "_GUESSES", 3)
+    # El parecido de FastF1 casi siempre encuentra algo, aunque sea inventado.
+    for n in range(10):
+        indice.resolve(2024, f"inventado {n}")
+
+    assert len(indice._guesses) == 3
+    # El índice exacto no crece con lo que escriben los clientes.
+    assert "inventado 0" not in indice._seasons[2024][2]
+
+
+def test_el_calendario_se_pide_una_vez_por_temporada(indice):
+    asyncio.run(canonical_event(2024, "Monaco"))
+    asyncio.run(canonical_event(2024, "Monza"))
+
+    assert indice.pedidos == [2024]
+
+
+def test_resolver_no_carga_el_calendario(monkeypatch):
+    # `resolve` corre en el bucle de eventos: cargar ahí bloquearía todo.
+    monkeypatch.setattr(events.fastf1, "get_event_schedule", lambda year: pytest.fail("cargó"))
+
+    assert EventIndex().resolve(2024, " Monaco ") == "Monaco"
+
+
+def test_sin_pool_libre_se_sigue_sin_calendario(monkeypatch):
+    async def ocupado(*args):
+        raise HTTPException(status_code=503)
+
+    monkeypatch.setattr(events.workers, "run", ocupado)
+    monkeypatch.setattr(events.fastf1, "get_event_schedule", lambda year: pytest.fail("cargó"))
+    monkeypatch.setattr(events, "event_index", EventIndex())
+
+    assert asyncio.run(canonical_event(2024, "Monaco")) == "Monaco"
+
+
+def test_una_temporada_caducada_sigue_resolviendo(indice, monkeypatch):
+    monkeypatch.setattr(indice, "ttl", 0)
+    monkeypatch.setattr(events.fastf1, "get_event_schedule", lambda year: pytest.fail("cargó"))
+
+    assert not indice.ready(2024)
+    assert indice.resolve(2024, "Monaco") == 8
+
+
+def test_sin_calendario_queda_como_antes(monkeypatch):
+    def sin_red(year):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(events.fastf1, "get_event_schedule", sin_red)
+    monkeypatch.setattr(events, "event_index", EventIndex())
+
+    assert asyncio.run(canonical_event(2024, " Monaco ")) == event_key(" Monaco ") == "Monaco"
+
+
+def test_una_ronda_tambien_indexa_la_temporada(indice):
+    assert asyncio.run(canonical_event(2024, "8")) == 8
+    assert asyncio.run(canonical_event(2024, "Monaco")) == 8
+
+    # Una vez, y desde entonces se sabe cuándo empieza cada sesión.
+    assert indice.pedidos == [2024]
+    assert indice.session_start(2024, 8, "Q") == pd.Timestamp("2024-05-25 13:00")
+    assert indice.session_start(2024, "monaco", "r") == pd.Timestamp("2024-05-26 13:00")
+
+
+def test_sin_indexar_no_se_sabe_cuando_empieza():
+    assert EventIndex().session_start(2024, 8, "R") is None
+
+
+def test_sin_red_no_se_reintenta_en_cada_peticion(monkeypatch):
+    intentos = []
+
+    def sin_red(year):
+        intentos.append(year)
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(events.fastf1, "get_event_schedule", sin_red)
+    monkeypatch.setattr(events, "event_index", EventIndex())
+
+    assert asyncio.run(canonical_event(2024, "Monaco")) == "Monaco"
+    assert asyncio.run(canonical_event(2024, "Monza")) == "Monza"
+    assert intentos == [2024]
+
+
+def test_los_pilotos_en_mayusculas():
+    assert driver_key(" ver ") == "VER"
+    assert driver_key(None) is None
@@ -0,0 +1,119 @@
+"""
+Pruebas de la carga de sesiones: qué se pide a FastF1 y cuándo.
+
+Sin red: FastF1 se sustituye por una sesión falsa que anota con qué opciones se
+cargó, que es justo lo que se quiere comprobar.
+"""
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.utils import loading
+from app.utils.loading import LAPS, TELEMETRY, WEATHER, load_session, session_key
+from app.utils.session_pool import SessionPool
+from app.utils.session_store import SessionStore
+
+
+class SesionFalsa:
+    def __init__(self, pilotos=("1", "44")):
+        self.cargas: list[dict] = []
+        self._pilotos = list(pilotos)
+
+    def load(self, **opciones):
+        self.cargas.append(opciones)
+
+    @property
+    def drivers(self):
+        return self._pilotos
+
+    @property
+    def laps(self):
+        return pd.DataFrame({"LapNumber": [1, 2]})
+
+
+@pytest.fixture
+def fastf1_falso(monkeypatch, tmp_path):
+    creadas: list[SesionFalsa] = []
+
+    def get_session(year, event, session_type):
+        sesion = SesionFalsa()
+        creadas.append(sesion)
+        return sesion
+
+    monkeypatch.setattr(loading.fastf1, "get_session", get_session)
+    monkeypatch.setattr(loading, "session_pool", SessionPool(max_bytes=1 << 30))
+    monkeypatch.setattr(loading, "session_store", SessionStore(str(tmp_path), enabled=False))
+    return creadas
+
+
+def test_las_vueltas_no_cargan_telemetria(fastf1_falso):
+    load_session(2024, "6", "R", LAPS)
+
+    # Los mensajes sí: de ellos salen las vueltas borradas por límites de pista.
+    assert fastf1_falso[0].cargas == [
+        {"laps": True, "telemetry": False, "weather": False, "messages": True}
+    ]
+
+
+def test_la_telemetria_trae_las_vueltas_borradas(fastf1_falso):
+    load_session(2024, "6", "R", TELEMETRY)
+
+    assert fastf1_falso[0].cargas[0]["messages"] is True
+
+
+def test_el_tiempo_solo_carga_el_tiempo(fastf1_falso):
+    load_session(2024, "6", "R", WEATHER)
+
+    assert fastf1_falso[0].cargas[0]["weather"] is True
+    assert fastf1_falso[0].cargas[0]["laps"] is False
+
+
+def test_una_sesion_ya_cargada_se_reutiliza(fastf1_falso):
+    primera = load_session(2024, "6", "R", LAPS)
+    segunda = load_session(2024, 6, "r", LAPS)
+
+    assert primera is segunda
+    assert len(fastf1_falso[0].cargas) == 1
+
+
+def test_pedir_menos_de_lo_cargado_no_vuelve_a_cargar(fastf1_falso):
+    load_session(2024, "6", "R", TELEMETRY)
+    load_session(2024, "6", "R", LAPS)
+    load_session(2024, "6", "R", frozenset())
+
+    assert len(fastf1_falso[0].cargas) == 1
+
+
+def test_la_telemetria_se_carga_en_otra_sesion(fastf1_falso):
+    ligera = load_session(2024, "6", "R", LAPS)
+    completa = load_session(2024, "6", "R", TELEMETRY)
+
+    # La de la pool no se recarga encima de quien la esté leyendo.
+    assert completa is not ligera
+    assert ligera.cargas == [{"laps": True, "telemetry": False, "weather": False, "messages": True}]
+    assert completa.cargas == [{"laps": True, "telemetry": True, "weather": False, "messages": True}]
+    assert load_session(2024, "6", "R", LAPS) is completa
+
+
+def test_las_partes_se_acumulan(fastf1_falso):
+    load_session(2024, "6", "Q", LAPS)
+    load_session(2024, "6", "Q", WEATHER)
+    load_session(2024, "6", "Q", LAPS | WEATHER)
+
+    assert len(fastf1_falso) == 2
+    assert fastf1_falso[1].cargas == [{"laps": True, "telemetry": False, "weather": True, "messages": True}]
+
+
+def test_una_sesion_sin_correr_es_un_404(fastf1_falso, monkeypatch):
+    monkeypatch.setattr(loading.fastf1, "get_session", lambda *a: SesionFalsa(pilotos=()))
+
+    with pytest.raises(HTTPException) as error:
+        load_session(2030, "1", "R", LAPS)
+
+    assert error.value.status_code == 404
+
+
+def test_session_key_normaliza_la_forma_de_pedirla():
+    assert session_key(2024, "6", "r") == session_key("2024", 6, "R")
+    assert session_key(2024, "Monaco", "Q") == session_key(2024, " monaco ", "q")
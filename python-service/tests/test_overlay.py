@@ -0,0 +1,122 @@
+"""
+Pruebas de la superposición de vueltas: varias vueltas en las mismas
+distancias, cada una con su delta respecto a la de referencia.
+
+Sin red ni FastF1: la telemetría de cada vuelta se sustituye por vueltas
+sintéticas a velocidad constante, cuyo delta se sabe de antemano.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import telemetry
+from app.utils.cache_manager import CacheManager
+
+# Metros por segundo de cada piloto.
+RITMO = {"VER": 60.0, "LEC": 50.0, "NOR": 40.0}
+
+
+def _vuelta(driver, lap):
+    ritmo = RITMO[driver]
+    distancia = np.linspace(0, 3000, 400 + len(driver) * int(ritmo))
+    vuelta = pd.Series(
+        {
+            "LapNumber": float(lap or 10),
+            "LapTime": pd.Timedelta(seconds=3000 / ritmo),
+            "Compound": "SOFT",
+        }
+    )
+    telemetria = pd.DataFrame(
+        {
+            "Distance": distancia,
+            "Speed": np.full(len(distancia), ritmo * 3.6),
+            "Time": pd.to_timedelta(distancia / ritmo, unit="s"),
+        }
+    )
+    return vuelta, telemetria
+
+
+async def _mismo_evento(year, event):
+    return event
+
+
+@pytest.fixture
+def cliente(monkeypatch, tmp_path):
+    llamadas = []
+
+    def lap_telemetry(year, event, session_type, driver, lap):
+        llamadas.append((driver, lap))
+        return _vuelta(driver, lap)
+
+    monkeypatch.setattr(telemetry, "canonical_event", _mismo_evento)
+    monkeypatch.setattr(telemetry, "lap_telemetry", lap_telemetry)
+    monkeypatch.setattr(
+        telemetry, "cache_manager",
+        CacheManager(directory=str(tmp_path), memory_bytes=1 << 20, background=False),
+    )
+    app = FastAPI()
+    app.include_router(telemetry.router, prefix="/api/telemetry")
+    cliente = TestClient(app)
+    cliente.llamadas = llamadas
+    return cliente
+
+
+def test_cada_vuelta_con_su_delta_a_la_referencia(cliente):
+    respuesta = cliente.get(
+        "/api/telemetry/2024/Monaco/Q/overlay",
+        params={"laps": "VER,LEC,NOR:7", "reference": "LEC", "format": "columnar", "points": 50},
+    )
+
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert cuerpo["reference"] == "LEC_10"
+    assert list(cuerpo["laps"]) == ["VER_10", "LEC_10", "NOR_7"]
+    assert len(cuerpo["distance"]["Distance"]) == 50
+
+    deltas = {etiqueta: vuelta["telemetry"]["Delta"] for etiqueta, vuelta in cuerpo["laps"].items()}
+    assert deltas["LEC_10"] == [0.0] * 50
+    assert deltas["VER_10"][-1] == pytest.approx(3000 / 60 - 3000 / 50)
+    assert deltas["NOR_7"][-1] == pytest.approx(3000 / 40 - 3000 / 50)
+    assert all(len(delta) == 50 for delta in deltas.values())
+
+
+def test_cada_vuelta_se_calcula_una_vez(cliente):
+    params = {"laps": "VER,LEC,LEC", "channels": "Speed"}
+
+    primera = cliente.get("/api/telemetry/2024/Monaco/Q/overlay", params=params)
+    segunda = cliente.get("/api/telemetry/2024/Monaco/Q/overlay", params=params)
+
+    assert primera.status_code == segunda.status_code == 200
+    assert segunda.content == primera.content
+    assert cliente.llamadas == [("VER", None), ("LEC", None)]
+    assert set(primera.json()["laps"]["VER_10"]["telemetry"][0]) == {"Speed", "Delta"}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"laps": "VER:rápida"},
+        {"laps": ","},
+        {"laps": "VER,LEC", "reference": "NOR"},
+        {"laps": ",".join(f"VER:{vuelta}" for vuelta in range(1, 12))},
+    ],
+)
+def test_peticiones_no_validas(cliente, params):
+    respuesta = cliente.get("/api/telemetry/2024/Monaco/Q/overlay", params=params)
+
+    assert respuesta.status_code == 400
+    assert cliente.llamadas == []
+
+
+def test_la_comparacion_alineada_no_depende_del_metodo(cliente):
+    params = {"driver1": "VER", "driver2": "LEC", "align": "true", "points": 50}
+
+    lttb = cliente.get("/api/telemetry/2024/Monaco/Q/compare", params={**params, "method": "lttb"})
+    grid = cliente.get("/api/telemetry/2024/Monaco/Q/compare", params={**params, "method": "grid"})
+
+    # Alineadas se remuestrean por distancia: la misma respuesta, una entrada.
+    assert grid.content == lttb.content
+    assert cliente.llamadas == [("VER", None), ("LEC", None)]
@@ -0,0 +1,68 @@
+"""
+Pruebas de la proyección de la telemetría: qué canales quedan y con qué precisión.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.utils.projection import parse_channels, project, projection_key
+from app.utils.serialization import columns
+
+
+def _telemetria() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2024-05-26 13:03:00.100", "2024-05-26 13:03:00.350"]),
+            "RPM": [11234.0, 11302.0],
+            "Speed": [287.123456, float("nan")],
+            "nGear": np.array([7, 8], dtype="int64"),
+            "Throttle": [99.87654, 100.0],
+            "Source": ["car", "pos"],
+            "Distance": [12.3456789, 30.9876543],
+        }
+    )
+
+
+def test_los_canales_se_escriben_como_en_fastf1():
+    assert parse_channels("speed, THROTTLE") == ("Speed", "Throttle", "Distance")
+
+
+def test_el_orden_no_cambia_la_clave():
+    assert parse_channels("Throttle,Speed") == parse_channels("speed,throttle,distance")
+    assert projection_key(parse_channels("Throttle,Speed"), 1) == "Speed-Throttle-Distance_1"
+    assert projection_key(None, None) == "all_None"
+
+
+def test_sin_canales_van_todos():
+    assert parse_channels(None) is None
+    assert parse_channels(" ") is None
+
+
+def test_un_canal_desconocido_es_un_400():
+    with pytest.raises(HTTPException) as error:
+        parse_channels("Speed,Velocidad")
+
+    assert error.value.status_code == 400
+    assert "velocidad" in error.value.detail
+
+
+def test_se_recorta_antes_de_serializar():
+    proyectada = project(_telemetria(), parse_channels("Speed"))
+
+    assert list(proyectada.columns) == ["Speed", "Distance"]
+
+
+def test_la_precision_redondea_y_compacta():
+    telemetria = _telemetria()
+
+    proyectada = project(telemetria, None, precision=1)
+
+    assert proyectada["Distance"].tolist() == [12.3, 31.0]
+    assert proyectada["RPM"].dtype == np.int16
+    assert proyectada["nGear"].dtype == np.int64  # ya era entero
+    assert proyectada["Speed"].isna().tolist() == [False, True]  # con NaN sigue siendo float
+    assert columns(proyectada)["RPM"] == [11234, 11302]
+    # La original queda como estaba.
+    assert telemetria["Distance"].iloc[0] == 12.3456789
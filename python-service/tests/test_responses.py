@@ -0,0 +1,142 @@
+"""
+Pruebas de las cabeceras de cache de las respuestas: ETag, 304 y Cache-Control.
+
+La respuesta se envía a mano, con un `scope` y un `send` que anota los
+mensajes; el calendario no se carga, se sustituye la hora de inicio.
+"""
+
+import asyncio
+
+import pandas as pd
+import pytest
+
+from app.config import settings
+from app.utils import cache_manager as modulo
+from app.utils import finality, responses
+from app.utils.cache_manager import CacheManager
+from app.utils.encodings import MSGPACK, encoded_response
+from app.utils.responses import cache_control, etag_matches
+from app.utils.serialization import json_response
+
+CUERPO = b'{"laps": [' + b'{"Driver": "NOR", "Compound": "HARD"},' * 300 + b'{}]}'
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    manager = CacheManager(directory=str(tmp_path), memory_bytes=1 << 20, background=False)
+    monkeypatch.setattr(responses, "cache_manager", manager)
+    yield manager
+    manager.cache.close()
+
+
+def _enviar(respuesta, **cabeceras):
+    pedidas = [(nombre.replace("_", "-").encode(), valor.encode()) for nombre, valor in cabeceras.items()]
+    mensajes = []
+
+    async def send(mensaje):
+        mensajes.append(mensaje)
+
+    asyncio.run(respuesta({"type": "http", "headers": pedidas}, None, send))
+    inicio, cuerpo = mensajes
+    return inicio["status"], dict((k.decode(), v.decode()) for k, v in inicio["headers"]), cuerpo["body"]
+
+
+def test_lleva_etag_y_cache_control(cache):
+    cache.set("schedule_2024", CUERPO)
+
+    estado, cabeceras, cuerpo = _enviar(json_response(CUERPO, "schedule_2024"))
+
+    assert estado == 200
+    assert cabeceras["etag"].startswith('W/"')
+    assert 0 < int(cabeceras["cache-control"].split("max-age=")[1]) <= settings.CACHE_TTL
+    assert cuerpo == CUERPO
+
+
+def test_si_no_cambio_responde_304_sin_cuerpo(cache, monkeypatch):
+    cache.set("laps", CUERPO)
+    _, cabeceras, _ = _enviar(json_response(CUERPO, "laps"))
+    monkeypatch.setattr(cache, "variant", lambda *a: pytest.fail("buscó una variante"))
+
+    estado, repetidas, cuerpo = _enviar(
+        json_response(CUERPO, "laps"), if_none_match=cabeceras["etag"], accept_encoding="gzip"
+    )
+
+    assert estado == 304
+    assert cuerpo == b""
+    assert repetidas["etag"] == cabeceras["etag"]
+    assert "content-length" not in repetidas
+
+
+def test_si_cambio_se_envia_entero(cache):
+    cache.set("laps", CUERPO)
+    _, antes, _ = _enviar(json_response(CUERPO, "laps"))
+
+    nuevo = CUERPO.replace(b"NOR", b"PIA")
+    cache.set("laps", nuevo)
+    estado, cabeceras, cuerpo = _enviar(json_response(nuevo, "laps"), if_none_match=antes["etag"])
+
+    assert estado == 200
+    assert cabeceras["etag"] != antes["etag"]
+    assert cuerpo == nuevo
+
+
+def test_cada_codificacion_tiene_su_etag(cache):
+    cache.set("laps", CUERPO)
+    cache.set("laps_msgpack", b"\x81\xa4laps\x90")
+
+    _, json_, _ = _enviar(json_response(CUERPO, "laps"))
+    _, binario, _ = _enviar(encoded_response(b"\x81\xa4laps\x90", MSGPACK, "laps_msgpack"))
+
+    assert json_["etag"] != binario["etag"]
+    assert binario["vary"] == "Accept"
+
+
+def test_una_sesion_final_no_caduca_aguas_abajo(cache, monkeypatch):
+    monkeypatch.setattr(modulo.event_index, "session_start", lambda *a: pd.Timestamp("2019-06-09 18:10"))
+    cache.set("laps_2019_7_R_None", CUERPO, session=(2019, 7, "R"))
+
+    _, cabeceras, _ = _enviar(json_response(CUERPO, "laps_2019_7_R_None"))
+
+    assert "immutable" in cabeceras["cache-control"]
+
+
+def test_una_sesion_en_pista_caduca_en_un_minuto(cache, monkeypatch):
+    monkeypatch.setattr(
+        modulo.event_index, "session_start", lambda *a: finality.utc_now() - pd.Timedelta(minutes=30)
+    )
+    cache.set("laps", CUERPO, session=(2024, 8, "R"))
+
+    _, cabeceras, _ = _enviar(json_response(CUERPO, "laps"))
+
+    assert int(cabeceras["cache-control"].split("max-age=")[1]) <= settings.CACHE_TTL_LIVE
+
+
+def test_sin_cache_no_hay_cabeceras(cache):
+    _, cabeceras, _ = _enviar(json_response(CUERPO, "no_esta"))
+
+    assert "etag" not in cabeceras and "cache-control" not in cabeceras
+
+
+def test_comparacion_de_etags():
+    assert etag_matches('W/"abc"', 'W/"abc"')
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches('"abd"', 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+    assert cache_control(None).endswith("immutable")
+
+
+def test_al_ser_final_el_cache_control_tambien_cambia(cache, monkeypatch):
+    inicio = finality.utc_now() - pd.Timedelta(hours=6)
+    monkeypatch.setattr(modulo.event_index, "session_start", lambda *a: inicio)
+    cache.set("laps", CUERPO, session=(2024, 8, "R"))
+
+    monkeypatch.setattr(
+        finality, "utc_now", lambda: inicio + pd.Timedelta(hours=settings.SESSION_FINAL_HOURS + 5)
+    )
+    cache.memory.clear()
+    cache.get("laps")
+
+    assert cache.meta("laps")[1] is None
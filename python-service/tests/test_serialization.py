@@ -9,10 +9,14 @@ ISO durations.
 import json
 import math
 
+import numpy as np
+
 import pandas as pd
 import pytest
 
-from app.utils.serialization import format_lap_time, records, scalar
+from app.utils.serialization import (
+    columns, encode, format_lap_time, format_lap_times, json_response, records, scalar,
+)
 
 
 class TestFormatLapTime:
@@ -35,6 +39,38 @@ class TestFormatLapTime:
         assert format_lap_time(pd.NaT) is None
 
 
+class TestFormatLapTimes:
+    def test_matches_format_lap_time_cell_for_cell(self):
+        rng = np.random.default_rng(7)
+        nanoseconds = np.concatenate(
+            [
+                rng.integers(-200 * 10**9, 8_000 * 10**9, 20_000),  # any value, negatives too
+                rng.integers(0, 200_000, 2_000) * 500_000,  # half milliseconds: ties
+                np.arange(-3, 4) * 60 * 10**9,  # whole minutes
+                [59_999_600_000, 59_999_499_999, 0],
+            ]
+        )
+        values = pd.Series(pd.to_timedelta(nanoseconds, unit="ns"))
+        values[::50] = pd.NaT
+
+        assert format_lap_times(values).tolist() == values.map(format_lap_time).tolist()
+
+    def test_keeps_the_quirks_of_the_scalar_version(self):
+        values = pd.Series(pd.to_timedelta(["-0:00:00.500", "0:00:59.9996", "0:01:29.165"]))
+
+        assert format_lap_times(values).tolist() == ["-1:59.500", "60.000", "1:29.165"]
+
+    def test_missing_and_empty(self):
+        assert format_lap_times(pd.Series([pd.NaT, pd.NaT])).tolist() == [None, None]
+        assert format_lap_times(pd.Series([], dtype="timedelta64[ns]")).tolist() == []
+
+    def test_records_does_not_touch_the_frame(self):
+        frame = pd.DataFrame({"LapTime": pd.to_timedelta(["0:01:29.165"]), "Speed": [318.0]})
+
+        assert records(frame) == [{"LapTime": "1:29.165", "Speed": 318.0}]
+        assert pd.api.types.is_timedelta64_dtype(frame["LapTime"])
+
+
 class TestRecords:
     def test_converts_rows_to_dicts(self):
         frame = pd.DataFrame({"Driver": ["VER", "LEC"], "Speed": [318, 315]})
@@ -80,6 +116,64 @@ class TestRecords:
         assert records(pd.DataFrame()) == []
         assert records(None) == []
 
+    def test_reads_like_pandas_own_writer(self):
+        # Built from the columns now, not round-tripped through to_json; the
+        # values must be the ones that round trip gave.
+        frame = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(["2024-05-26 13:00:00.123456", None]),
+                "DateUtc": pd.to_datetime(["2024-05-26 13:00", None]).tz_localize("Europe/Monaco"),
+                "Speed": [318.5, np.inf],
+                "Position": pd.array([1, None], dtype="Int64"),
+                "Driver": ["VER", None],
+                "IsPersonalBest": [True, False],
+                "LapNumber": np.array([1, 2], dtype="int64"),
+                "Compound": pd.Categorical(["SOFT", None]),
+            }
+        )
+
+        assert records(frame) == json.loads(frame.to_json(orient="records", date_format="iso"))
+
+    def test_does_not_go_through_to_json(self, monkeypatch):
+        monkeypatch.setattr(pd.DataFrame, "to_json", lambda *a, **k: pytest.fail("to_json"))
+        monkeypatch.setattr(pd.Series, "to_json", lambda *a, **k: pytest.fail("to_json"))
+        frame = pd.DataFrame({"Driver": ["VER"], "Speed": [318.0]})
+
+        assert records(frame) == [{"Driver": "VER", "Speed": 318.0}]
+        assert columns(frame) == {"Driver": ["VER"], "Speed": [318.0]}
+
+
+class TestColumns:
+    def test_one_list_per_column(self):
+        frame = pd.DataFrame({"Speed": [318, 315], "nGear": [8, 7]})
+
+        assert columns(frame) == {"Speed": [318, 315], "nGear": [8, 7]}
+
+    def test_same_values_as_records(self):
+        frame = pd.DataFrame(
+            {
+                "Speed": [318.0, float("nan")],
+                "Brake": [False, True],
+                "Time": pd.to_timedelta(["0:00:00.250", "0:01:29.165"]),
+                "Date": pd.to_datetime(["2024-03-02T15:00:00", "2024-03-02T15:00:01"]),
+            }
+        )
+
+        by_column = columns(frame)
+        by_row = records(frame)
+
+        for column, values in by_column.items():
+            assert values == [row[column] for row in by_row]
+
+    def test_is_smaller_than_records(self):
+        frame = pd.DataFrame({name: range(700) for name in ("Speed", "RPM", "nGear", "Throttle")})
+
+        assert len(encode(columns(frame))) * 2 < len(encode(records(frame)))
+
+    def test_returns_an_empty_dict_for_no_data(self):
+        assert columns(pd.DataFrame()) == {}
+        assert columns(None) == {}
+
 
 class TestScalar:
     def test_unwraps_numpy_values(self):
@@ -106,3 +200,38 @@ class TestCacheGuard:
         payload = {"telemetry": records(frame)}
 
         assert json.dumps(payload, allow_nan=False)
+
+
+class TestEncode:
+    """Responses are encoded once and those bytes are cached and sent as is."""
+
+    def test_round_trips_a_records_payload(self):
+        frame = pd.DataFrame({"Driver": ["VER"], "Speed": [float("nan")]})
+        payload = {"total": 1, "laps": records(frame)}
+
+        assert json.loads(encode(payload)) == {"total": 1, "laps": [{"Driver": "VER", "Speed": None}]}
+
+    def test_encodes_numpy_scalars_and_nan(self):
+        payload = {"max": np.float64(318.5), "laps": np.int64(57), "gap": math.nan}
+
+        assert json.loads(encode(payload)) == {"max": 318.5, "laps": 57, "gap": None}
+
+    def test_reads_timestamps_like_fastapi_did(self):
+        payload = {"date": pd.Timestamp("2024-05-26 13:00"), "missing": pd.NaT}
+
+        assert json.loads(encode(payload)) == {"date": "2024-05-26T13:00:00", "missing": None}
+
+    def test_joins_aggregation_keys(self):
+        # groupby().agg() with several functions gives ("LapNumber", "min")
+        # keys, which neither FastAPI nor JSON can write as they are.
+        payload = {"tyre_stints": {("LapNumber", "min"): {1: 1}}}
+
+        assert json.loads(encode(payload)) == {"tyre_stints": {"LapNumber_min": {"1": 1}}}
+
+    def test_response_sends_the_bytes_untouched(self):
+        body = encode({"a": 1})
+
+        response = json_response(body)
+
+        assert response.body == body
+        assert response.media_type == "application/json"
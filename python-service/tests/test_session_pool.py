@@ -0,0 +1,97 @@
+"""
+Pruebas del pool de sesiones cargadas.
+
+Sin red: una sesión falsa con marcos de tamaño conocido basta para probar lo que
+importa —que el límite es de memoria y no de número, y que sale la menos usada.
+"""
+
+import pandas as pd
+
+from app.utils.session_pool import SessionPool, estimate_bytes
+
+
+class Sesion:
+    """Lo mínimo de una sesión de FastF1: marcos y telemetría por piloto."""
+
+    def __init__(self, filas: int, con_telemetria: bool = False):
+        self.laps = pd.DataFrame({"LapNumber": range(filas)}, dtype="int64")
+        if con_telemetria:
+            self.car_data = {"1": pd.DataFrame({"Speed": [0.0] * filas})}
+
+    @property
+    def weather_data(self):
+        # Lo que hace FastF1 con una parte que no se pidió al cargar.
+        raise RuntimeError("not loaded")
+
+
+def test_estimate_bytes_cuenta_la_telemetria():
+    ligera = estimate_bytes(Sesion(1000))
+    completa = estimate_bytes(Sesion(1000, con_telemetria=True))
+
+    assert ligera >= 8000
+    assert completa >= ligera + 8000
+
+
+def test_estimate_bytes_ignora_lo_que_no_se_cargo():
+    assert estimate_bytes(object()) == 0
+
+
+def test_devuelve_la_misma_sesion():
+    pool = SessionPool(max_bytes=10_000)
+    sesion = Sesion(10)
+
+    pool.put("a", sesion)
+
+    assert pool.get("a") is sesion
+    assert pool.get("b") is None
+
+
+def test_el_limite_es_de_memoria_no_de_numero():
+    pool = SessionPool(max_bytes=1000)
+
+    pool.put("a", object(), size=400)
+    pool.put("b", object(), size=400)
+    pool.put("c", object(), size=400)
+
+    assert pool.get("a") is None
+    assert pool.stats()["bytes"] == 800
+
+
+def test_sale_la_menos_usada():
+    pool = SessionPool(max_bytes=1000)
+    pool.put("a", object(), size=400)
+    pool.put("b", object(), size=400)
+
+    # Pedir "a" la convierte en la más reciente: la que sobra es "b".
+    pool.get("a")
+    pool.put("c", object(), size=400)
+
+    assert pool.get("a") is not None
+    assert pool.get("b") is None
+
+
+def test_una_sesion_que_no_cabe_no_vacia_el_pool():
+    pool = SessionPool(max_bytes=1000)
+    pool.put("a", object(), size=400)
+
+    pool.put("enorme", object(), size=5000)
+
+    assert pool.get("enorme") is None
+    assert pool.get("a") is not None
+
+
+def test_reemplazar_no_cuenta_dos_veces():
+    pool = SessionPool(max_bytes=1000)
+
+    pool.put("a", object(), size=400)
+    pool.put("a", object(), size=300)
+
+    assert pool.stats()["bytes"] == 300
+
+
+def test_con_limite_cero_no_guarda_nada():
+    pool = SessionPool(max_bytes=0)
+
+    pool.put("a", object(), size=1)
+
+    assert pool.get("a") is None
@@ -0,0 +1,139 @@
+"""
+Pruebas del almacén de sesiones terminadas.
+
+Se rellena a mano una `Session` de FastF1 con lo que dejaría `Session.load`, se
+guarda y se restaura en otra vacía: lo que vuelve tiene que ser lo que se fue.
+"""
+
+import pandas as pd
+import pytest
+from fastf1.core import Laps, Session, Telemetry
+
+from app.utils.finality import is_final
+from app.utils.session_store import SessionStore
+
+
+def _sesion(fecha="2024-05-26 13:00") -> Session:
+    sesion = Session.__new__(Session)
+    sesion.event = pd.Series({"RoundNumber": 8})
+    sesion.name = "Race"
+    sesion.date = pd.Timestamp(fecha)
+    return sesion
+
+
+def _cargada() -> Session:
+    sesion = _sesion()
+    sesion._session_info = {"Meeting": {"Name": "Monaco Grand Prix"}}
+    sesion._results = pd.DataFrame(
+        {"Abbreviation": ["LEC", "PIA"], "Position": [1.0, 2.0]}, index=["16", "81"]
+    )
+    sesion._laps = pd.DataFrame(
+        {
+            "Driver": ["LEC", "PIA"],
+            "LapNumber": [1.0, 1.0],
+            "LapTime": pd.to_timedelta(["0:01:20.100", "0:01:20.900"]),
+        }
+    )
+    sesion._session_status = pd.DataFrame({"Status": ["Started"]})
+    sesion._track_status = pd.DataFrame({"Status": ["1"]})
+    sesion._total_laps = 78
+    sesion._session_start_time = pd.Timedelta(minutes=56)
+    sesion._session_split_times = None
+    sesion._weather_data = pd.DataFrame({"AirTemp": [21.4, 21.6]})
+    sesion._t0_date = pd.Timestamp("2024-05-26 12:00")
+    sesion._car_data = {
+        "16": pd.DataFrame({"Speed": [287.0, 290.5], "Time": pd.to_timedelta([0, 250], unit="ms")})
+    }
+    sesion._pos_data = {"16": pd.DataFrame({"X": [1.0, 2.0], "Y": [3.0, 4.0]})}
+    return sesion
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return SessionStore(str(tmp_path))
+
+
+def test_la_sesion_vuelve_igual(almacen):
+    almacen.save(2024, _cargada(), frozenset({"laps", "telemetry", "weather"}))
+
+    restaurada = _sesion()
+    assert almacen.restore(2024, restaurada, frozenset({"laps", "telemetry", "weather"}))
+
+    original = _cargada()
+    assert isinstance(restaurada._laps, Laps)
+    assert isinstance(restaurada._car_data["16"], Telemetry)
+    pd.testing.assert_frame_equal(pd.DataFrame(restaurada._laps), original._laps)
+    pd.testing.assert_frame_equal(pd.DataFrame(restaurada._results), original._results)
+    pd.testing.assert_frame_equal(restaurada._weather_data, original._weather_data)
+    pd.testing.assert_frame_equal(pd.DataFrame(restaurada._car_data["16"]), original._car_data["16"])
+    assert restaurada._total_laps == 78
+    assert restaurada._session_info == original._session_info
+
+
+def test_solo_restaura_lo_que_se_guardo(almacen):
+    almacen.save(2024, _cargada(), frozenset({"laps"}))
+
+    restaurada = _sesion()
+    assert not almacen.restore(2024, restaurada, frozenset({"laps", "telemetry"}))
+    # Sin tocarla: la carga por FastF1 empieza de una sesión limpia.
+    assert not hasattr(restaurada, "_laps")
+
+
+def test_una_sesion_reciente_no_se_guarda(almacen, tmp_path):
+    reciente = _cargada()
+    reciente.date = pd.Timestamp.now(tz="UTC").tz_localize(None)
+
+    almacen.save(2024, reciente, frozenset({"laps"}))
+
+    assert not list(tmp_path.rglob("manifest.pickle"))
+
+
+def test_guardar_otra_vez_anade_a_la_anterior(almacen):
+    almacen.save(2024, _cargada(), frozenset({"laps"}))
+    almacen.save(2024, _cargada(), frozenset({"laps", "weather"}))
+
+    assert almacen.restore(2024, _sesion(), frozenset({"laps", "weather"}))
+    assert len(list(almacen.root.rglob("manifest.pickle"))) == 1
+
+
+def test_partes_sueltas_no_borran_lo_guardado(almacen):
+    # Carrera guardada con telemetría, sacada del pool, y luego una petición
+    # del tiempo que solo carga el tiempo.
+    almacen.save(2024, _cargada(), frozenset({"laps", "telemetry"}))
+    solo_tiempo = _sesion()
+    solo_tiempo._results = _cargada()._results
+    solo_tiempo._weather_data = _cargada()._weather_data
+    almacen.save(2024, solo_tiempo, frozenset({"weather"}))
+
+    restaurada = _sesion()
+    assert almacen.restore(2024, restaurada, frozenset({"laps", "telemetry"}))
+    assert "16" in restaurada._car_data
+    assert almacen.restore(2024, _sesion(), frozenset({"laps", "telemetry", "weather"}))
+
+
+def test_lo_ya_guardado_no_se_vuelve_a_escribir(almacen):
+    almacen.save(2024, _cargada(), frozenset({"laps", "telemetry"}))
+    telemetria = next(almacen.root.rglob("car_data/16.feather"))
+    antes = telemetria.stat().st_mtime_ns
+
+    almacen.save(2024, _cargada(), frozenset({"laps", "telemetry", "weather"}))
+
+    assert telemetria.stat().st_mtime_ns == antes
+    assert almacen.restore(2024, _sesion(), frozenset({"weather"}))
+
+
+def test_un_almacen_apagado_no_hace_nada(tmp_path):
+    apagado = SessionStore(str(tmp_path), enabled=False)
+
+    apagado.save(2024, _cargada(), frozenset({"laps"}))
+
+    assert not apagado.restore(2024, _sesion(), frozenset({"laps"}))
+    assert not list(tmp_path.iterdir())
+
+
+def test_final_cuenta_desde_el_final_de_la_sesion():
+    inicio = pd.Timestamp("2024-05-26 13:00")
+
+    assert not is_final(inicio, now=inicio + pd.Timedelta(hours=6))
+    assert is_final(inicio, now=inicio + pd.Timedelta(days=5))
+    assert not is_final(None)
@@ -0,0 +1,118 @@
+"""
+Pruebas del viaje de la telemetría entre procesos.
+
+Lo que cruza la tubería son buffers de columnas, no un DataFrame: aquí se
+comprueba que el marco llega igual que salió, con sus tipos.
+"""
+
+import os
+import pickle
+import signal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils import session_workers
+from app.utils.loading import LAPS
+from app.utils.session_workers import SessionProcesses, pack_frame, session_drivers, unpack_frame
+
+
+def _telemetria() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2024-05-26 13:03:00.100", "2024-05-26 13:03:00.350"]),
+            "Time": pd.to_timedelta(["0:00:00.000", "0:00:00.250"]),
+            "Speed": [287.0, float("nan")],
+            "nGear": np.array([7, 8], dtype="int64"),
+            "Brake": [False, True],
+            "Source": ["car", "pos"],
+        },
+        index=[40, 41],
+    )
+
+
+def test_el_marco_llega_igual():
+    original = _telemetria()
+
+    llegado = unpack_frame(pickle.loads(pickle.dumps(pack_frame(original))))
+
+    pd.testing.assert_frame_equal(llegado, original.reset_index(drop=True))
+
+
+def test_las_columnas_numericas_viajan_como_bytes():
+    columnas = {nombre: valores for nombre, _, valores in pack_frame(_telemetria())["columns"]}
+
+    assert isinstance(columnas["Speed"], bytes)
+    assert isinstance(columnas["Date"], bytes)
+    # Los textos no tienen representación binaria que valga la pena.
+    assert columnas["Source"] == ["car", "pos"]
+
+
+def test_un_marco_vacio_tambien_viaja():
+    vacio = pd.DataFrame({"Speed": pd.Series([], dtype="float64")})
+
+    assert unpack_frame(pack_frame(vacio)).empty
+
+
+def test_la_misma_sesion_va_siempre_al_mismo_proceso():
+    procesos = SessionProcesses(processes=4)
+
+    elegido = procesos._executor_for(("telemetry", 2024, "Monaco", "R", "VER", None))
+    otra_vez = procesos._executor_for(("telemetry", 2024, "monaco", "r", "LEC", 12))
+
+    assert elegido is otra_vez
+    procesos.shutdown()
+
+
+def test_a_cero_procesos_esta_apagado():
+    assert not SessionProcesses(processes=0).enabled
+
+
+def test_los_pilotos_sin_procesos_solo_cargan_las_vueltas(monkeypatch):
+    class Sesion:
+        laps = pd.DataFrame({"Driver": ["VER", "LEC", None, "VER"]})
+
+    partes = []
+
+    def load_session(year, event, session_type, parts):
+        partes.append(parts)
+        return Sesion()
+
+    monkeypatch.setattr(session_workers, "load_session", load_session)
+    monkeypatch.setattr(session_workers, "session_processes", SessionProcesses(processes=0))
+
+    assert session_drivers(2024, 8, "Q") == ["LEC", "VER"]
+    assert partes == [LAPS]
+
+
+# Un cálculo que no existe: el proceso responde sin cargar ninguna sesión.
+_SIN_RED = ("nada", 2024, "Monaco", "R", None, None)
+
+
+@pytest.fixture
+def procesos():
+    procesos = SessionProcesses(processes=1)
+    yield procesos
+    procesos.shutdown()
+
+
+def test_el_trabajo_corre_en_un_proceso_de_verdad(procesos):
+    with pytest.raises(ValueError, match="nada"):
+        procesos.submit(_SIN_RED)
+
+    assert procesos.stats()["started"] == 1
+
+
+def test_un_proceso_muerto_se_sustituye(procesos):
+    with pytest.raises(ValueError):
+        procesos.submit(_SIN_RED)
+    muerto = procesos._executor_for(_SIN_RED)
+    for pid in list(muerto._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    # Sin el relevo, cada trabajo de esta sesión sería un 500 hasta reiniciar.
+    with pytest.raises(ValueError):
+        procesos.submit(_SIN_RED)
+
+    assert procesos._executor_for(_SIN_RED) is not muerto
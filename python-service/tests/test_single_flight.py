@@ -0,0 +1,84 @@
+"""
+Pruebas de la carga compartida entre peticiones simultáneas.
+
+Con hilos de verdad: lo que se prueba es precisamente qué pasa cuando varios
+piden lo mismo a la vez.
+"""
+
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.single_flight import SingleFlight
+
+
+def _a_la_vez(n: int, funcion):
+    """Lanza `funcion` en `n` hilos que arrancan juntos; devuelve lo que dio cada uno."""
+    salida = threading.Barrier(n)
+    resultados: list = [None] * n
+
+    def correr(indice):
+        salida.wait()
+        try:
+            resultados[indice] = funcion()
+        except Exception as error:
+            resultados[indice] = error
+
+    hilos = [threading.Thread(target=correr, args=(i,)) for i in range(n)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    return resultados
+
+
+def test_una_sola_carga_para_todos():
+    vuelo = SingleFlight()
+    llamadas = []
+
+    def cargar():
+        llamadas.append(1)
+        time.sleep(0.2)
+        return object()
+
+    resultados = _a_la_vez(8, lambda: vuelo.do("2024-6-R", cargar))
+
+    assert len(llamadas) == 1
+    # No una copia: la misma sesión para todos.
+    assert all(r is resultados[0] for r in resultados)
+
+
+def test_el_error_tambien_se_comparte():
+    # Una sesión sin correr es un 404 para todos, no un intento por visitante.
+    vuelo = SingleFlight()
+    llamadas = []
+
+    def cargar():
+        llamadas.append(1)
+        time.sleep(0.2)
+        raise HTTPException(status_code=404, detail="sin datos")
+
+    resultados = _a_la_vez(5, lambda: vuelo.do("2030-1-R", cargar))
+
+    assert len(llamadas) == 1
+    assert all(isinstance(r, HTTPException) and r.status_code == 404 for r in resultados)
+
+
+def test_claves_distintas_no_se_esperan():
+    vuelo = SingleFlight()
+
+    assert vuelo.do("a", lambda: 1) == 1
+    assert vuelo.do("b", lambda: 2) == 2
+
+
+def test_tras_un_fallo_se_vuelve_a_intentar():
+    vuelo = SingleFlight()
+
+    with pytest.raises(ValueError):
+        vuelo.do("a", lambda: (_ for _ in ()).throw(ValueError("caído")))
+
+    assert vuelo.do("a", lambda: "ya hay datos") == "ya hay datos"
+    assert vuelo.in_flight() == 0
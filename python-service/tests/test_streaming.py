@@ -0,0 +1,147 @@
+"""
+Pruebas de las exportaciones en NDJSON: una línea por vuelta, enviadas según salen.
+
+Sin red ni FastF1: las rutas se montan en una aplicación de prueba y lo que
+cargaría la sesión se sustituye por tablas hechas a mano.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.routes import laps, telemetry
+from app.utils.loading import LAPS
+from app.utils.serialization import encode, records
+from app.utils.streaming import frame_lines
+
+
+def _vueltas(n: int = 5) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Driver": ["LEC", "PIA"] * (n // 2) + ["LEC"] * (n % 2),
+            "LapNumber": [float(i + 1) for i in range(n)],
+            "LapTime": pd.to_timedelta([f"0:01:1{i % 10}.345" for i in range(n)]),
+            "Compound": ["MEDIUM"] * n,
+        }
+    )
+
+
+async def _mismo_evento(year, event):
+    return int(event) if str(event).isdigit() else event
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    monkeypatch.setattr(laps, "canonical_event", _mismo_evento)
+    monkeypatch.setattr(telemetry, "canonical_event", _mismo_evento)
+    app = FastAPI()
+    app.include_router(laps.router, prefix="/api/laps")
+    app.include_router(telemetry.router, prefix="/api/telemetry")
+    return TestClient(app)
+
+
+def _lineas(respuesta):
+    return [json.loads(linea) for linea in respuesta.text.splitlines()]
+
+
+def test_las_filas_salen_por_trozos():
+    trozos = list(frame_lines(_vueltas(5), chunk_rows=2))
+
+    assert len(trozos) == 3
+    filas = [json.loads(linea) for trozo in trozos for linea in trozo.decode().splitlines()]
+    assert [fila["LapTime"] for fila in filas][:2] == ["1:10.345", "1:11.345"]
+    assert all(trozo.endswith(b"\n") for trozo in trozos)
+
+
+def test_las_lineas_son_las_filas_de_records():
+    vueltas = _vueltas(3)
+    vueltas["Speed"] = [318.123456789012, float("nan"), 290.5]
+
+    filas = [json.loads(linea) for trozo in frame_lines(vueltas) for linea in trozo.decode().splitlines()]
+
+    assert filas == json.loads(encode(records(vueltas)))
+
+
+def test_las_vueltas_en_ndjson(cliente, monkeypatch):
+    def sesion(year, event, session_type, driver):
+        return {"session": {"year": year, "event": event}, "total_laps": 5, "laps": _vueltas(5)}
+
+    monkeypatch.setattr(laps, "_session_laps", sesion)
+
+    respuesta = cliente.get("/api/laps/2024/8/R", params={"format": "ndjson"})
+
+    assert respuesta.headers["content-type"] == "application/x-ndjson"
+    cabecera, *filas = _lineas(respuesta)
+    assert cabecera == {"session": {"year": 2024, "event": 8}, "total_laps": 5}
+    assert len(filas) == 5
+    assert filas[0]["Driver"] == "LEC"
+
+
+def test_un_404_llega_antes_de_empezar(cliente, monkeypatch):
+    def sin_vueltas(*args):
+        raise HTTPException(status_code=404, detail="No laps found")
+
+    monkeypatch.setattr(laps, "_session_laps", sin_vueltas)
+
+    assert cliente.get("/api/laps/2024/8/R", params={"format": "ndjson"}).status_code == 404
+
+
+def test_la_exportacion_va_vuelta_a_vuelta(cliente, monkeypatch):
+    pedidas = []
+
+    def vuelta(year, event, session_type, driver, lap):
+        pedidas.append((driver, lap))
+        if lap == 3:
+            raise ValueError("sin datos de coche")
+        telemetria = pd.DataFrame({"Distance": [0.0, 10.5], "Speed": [280.25, 281.75], "RPM": [11000.0, 11100.0]})
+        return pd.Series({"LapTime": pd.Timedelta("0:01:12.345")}), telemetria
+
+    monkeypatch.setattr(
+        telemetry, "_export_laps", lambda *a: [("LEC", 1), ("PIA", 2), ("LEC", 3)]
+    )
+    monkeypatch.setattr(telemetry, "lap_telemetry", vuelta)
+
+    respuesta = cliente.get(
+        "/api/telemetry/2024/8/R/export", params={"channels": "speed", "precision": "0"}
+    )
+
+    cabecera, *lineas = _lineas(respuesta)
+    assert cabecera["laps"] == 3 and cabecera["drivers"] == ["LEC", "PIA"]
+    assert cabecera["channels"] == ["Speed", "Distance"]
+    assert lineas[0] == {
+        "driver": "LEC", "lap_number": 1, "lap_time": "1:12.345",
+        "telemetry": {"Speed": [280, 282], "Distance": [0, 10]},
+    }
+    # Una vuelta sin telemetría no corta la exportación.
+    assert lineas[2]["telemetry"] is None
+    assert pedidas == [("LEC", 1), ("PIA", 2), ("LEC", 3)]
+
+
+def test_export_no_es_un_piloto(cliente, monkeypatch):
+    # La ruta de /{driver} la tomaría por el piloto "EXPORT".
+    monkeypatch.setattr(telemetry, "_export_laps", lambda *a: [("LEC", 1)])
+    monkeypatch.setattr(
+        telemetry, "lap_telemetry",
+        lambda *a: (pd.Series({"LapTime": pd.NaT}), pd.DataFrame({"Distance": [0.0]})),
+    )
+
+    respuesta = cliente.get("/api/telemetry/2024/8/R/export")
+
+    assert respuesta.headers["content-type"] == "application/x-ndjson"
+
+
+def test_la_lista_de_vueltas_no_carga_la_telemetria(cliente, monkeypatch):
+    partes = []
+
+    def sin_sesion(year, event, session_type, parts):
+        partes.append(parts)
+        raise HTTPException(status_code=404, detail="No laps found")
+
+    monkeypatch.setattr(telemetry, "load_session", sin_sesion)
+
+    assert cliente.get("/api/telemetry/2024/8/R/export").status_code == 404
+    # La telemetría la carga cada vuelta, no la lista.
+    assert partes == [LAPS]
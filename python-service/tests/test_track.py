@@ -5,11 +5,13 @@ Sin red: se arman DataFrames a mano, que es justo lo que permite separar esta
 lógica de las rutas.
 """
 
+import numpy as np
 import pandas as pd
 
 from app.utils.track import (
     downsample,
     group_by_driver,
+    simplify,
     stints_from_laps,
     track_points,
 )
@@ -85,6 +87,59 @@ def test_track_points_con_telemetria_sin_posicion():
     assert track_points(pd.DataFrame({"Speed": [100.0]})) == []
 
 
+def _circuito() -> pd.DataFrame:
+    # Una recta de 1 km (en décimas de metro) y una horquilla de radio 15 m
+    # para volver: lo que un paso fijo dibuja mal.
+    recta = np.linspace(0, 10_000, 800)
+    angulo = np.linspace(-np.pi / 2, np.pi / 2, 200)
+    x = np.concatenate([recta, 10_000 + 150 * np.cos(angulo), recta[::-1]])
+    y = np.concatenate([np.zeros(800), 150 + 150 * np.sin(angulo), np.full(800, 300.0)])
+    velocidad = np.concatenate([np.full(800, 300.0), 80 + 20 * np.abs(angulo), np.full(800, 300.0)])
+    return pd.DataFrame(
+        {"X": x, "Y": y, "Speed": velocidad, "Distance": np.arange(len(x)) * 1.5}
+    )
+
+
+def test_la_simplificacion_pone_los_puntos_en_las_curvas():
+    circuito = _circuito()
+
+    puntos = track_points(circuito, tolerance=0.5)
+
+    en_la_horquilla = [p for p in puntos if p["x"] > 10_000]
+    assert len(puntos) < 100
+    assert len(en_la_horquilla) > len(puntos) / 2
+    assert (puntos[0]["x"], puntos[-1]["x"]) == (0.0, 0.0)
+
+
+def test_cada_vertice_conserva_su_velocidad_y_su_distancia():
+    circuito = _circuito()
+    por_distancia = circuito.set_index("Distance")
+
+    for punto in track_points(circuito, tolerance=0.5):
+        fila = por_distancia.loc[punto["distance"]]
+        assert (punto["x"], punto["y"]) == (fila.X, fila.Y)
+        assert punto["speed"] == round(fila.Speed, 1)
+
+
+def test_la_simplificacion_respeta_el_limite():
+    circuito = _circuito()
+
+    puntos = track_points(circuito, limit=20, tolerance=0.01)
+
+    assert len(puntos) == 20
+    assert puntos[0]["distance"] == 0.0 and puntos[-1]["distance"] == circuito["Distance"].iloc[-1]
+
+
+def test_rdp_en_una_vuelta_cerrada():
+    angulo = np.linspace(0, 2 * np.pi, 500)
+
+    indices = simplify(np.cos(angulo) * 1000, np.sin(angulo) * 1000, tolerance=5)
+
+    # Empieza y acaba en el mismo punto: sin cuerda, y aun así sale un círculo.
+    assert indices[0] == 0 and indices[-1] == 499
+    assert 10 < len(indices) < 100
+
+
 def _laps(filas):
     return pd.DataFrame(filas, columns=["Driver", "Stint", "Compound", "LapNumber"])
 
@@ -123,6 +178,35 @@ def test_stints_descarta_vueltas_sin_tramo():
     assert tramos[0]["start_lap"] == 2
 
 
+def test_stints_la_primera_vuelta_con_compuesto_da_el_del_tramo():
+    # La salida de boxes llega sin compuesto; las vueltas, desordenadas.
+    laps = _laps(
+        [
+            ["NOR", 2, None, 20],
+            ["NOR", 1, "MEDIUM", 2],
+            ["NOR", 2, "UNKNOWN", 22],
+            ["NOR", 2, "HARD", 21],
+            ["NOR", 1, "MEDIUM", 1],
+            ["NOR", 2, "SOFT", 23],
+        ]
+    )
+
+    assert stints_from_laps(laps) == [
+        {"driver": "NOR", "stint": 1, "compound": "MEDIUM", "start_lap": 1, "end_lap": 2, "laps": 2},
+        {"driver": "NOR", "stint": 2, "compound": "HARD", "start_lap": 20, "end_lap": 23, "laps": 4},
+    ]
+
+
+def test_stints_ordena_por_piloto_y_tramo():
+    laps = _laps(
+        [["VER", 10.0, "HARD", 50], ["ALO", 2.0, "SOFT", 9], ["VER", 2.0, "SOFT", 12], ["ALO", 1.0, "SOFT", 1]]
+    )
+
+    assert [(t["driver"], t["stint"]) for t in stints_from_laps(laps)] == [
+        ("ALO", 1), ("ALO", 2), ("VER", 2), ("VER", 10)
+    ]
+
+
 def test_group_by_driver_respeta_el_orden_de_llegada():
     tramos = stints_from_laps(
         _laps(
@@ -0,0 +1,148 @@
+"""
+Pruebas del precalentado: qué sesiones se eligen y qué se pide de cada una.
+
+Sin red: el calendario se construye a mano con las columnas de
+`get_event_schedule`, y las rutas se sustituyen por funciones que anotan la
+llamada.
+"""
+
+import asyncio
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.services import warmer
+from app.utils.serialization import encode, json_response
+
+
+def _calendario() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "RoundNumber": [0, 8],
+            "Session1": ["Day 1", "Practice 1"],
+            "Session1DateUtc": pd.to_datetime(["2024-02-21 07:00", "2024-05-24 11:30"]),
+            "Session2": ["Day 2", "Practice 2"],
+            "Session2DateUtc": pd.to_datetime(["2024-02-22 07:00", "2024-05-24 15:00"]),
+            "Session3": ["Day 3", "Practice 3"],
+            "Session3DateUtc": pd.to_datetime(["2024-02-23 07:00", "2024-05-25 10:30"]),
+            "Session4": [None, "Qualifying"],
+            "Session4DateUtc": pd.to_datetime([None, "2024-05-25 14:00"]),
+            "Session5": [None, "Race"],
+            "Session5DateUtc": pd.to_datetime([None, "2024-05-26 13:00"]),
+        }
+    )
+
+
+def test_el_calendario_da_las_sesiones_con_su_tipo():
+    sesiones = warmer.schedule_sessions(_calendario())
+
+    # Los test de pretemporada no tienen páginas.
+    assert [(ronda, tipo) for ronda, tipo, _ in sesiones] == [
+        (8, "FP1"), (8, "FP2"), (8, "FP3"), (8, "Q"), (8, "R")
+    ]
+
+
+def test_solo_las_que_acaban_de_terminar():
+    sesiones = warmer.schedule_sessions(_calendario())
+    # El domingo por la noche: la carrera terminó, la clasificación hace un día.
+    ahora = pd.Timestamp("2024-05-26 19:00")
+
+    recientes = warmer.ended(sesiones, ahora, within=pd.Timedelta(hours=12))
+
+    assert [tipo for _, tipo, _ in recientes] == ["R"]
+
+
+def test_la_que_sigue_en_pista_no_se_calienta():
+    sesiones = warmer.schedule_sessions(_calendario())
+
+    assert warmer.ended(sesiones, pd.Timestamp("2024-05-26 14:30")) == [
+        sesion for sesion in sesiones if sesion[1] != "R"
+    ]
+
+
+def test_se_empieza_a_pedir_al_acabar_lo_programado():
+    sesiones = warmer.schedule_sessions(_calendario())
+
+    # Diez minutos después de la bandera a cuadros, no horas.
+    recientes = warmer.ended(sesiones, pd.Timestamp("2024-05-26 15:10"), within=pd.Timedelta(hours=1))
+
+    assert [tipo for _, tipo, _ in recientes] == ["R"]
+
+
+def _pasadas(monkeypatch, ahora):
+    calentadas = []
+
+    class Indice:
+        def schedule(self, year):
+            return _calendario()
+
+    async def calentar(year, round_number, session_type):
+        calentadas.append(session_type)
+        return {"warmed": 1, "missing": 0}
+
+    monkeypatch.setattr(warmer, "event_index", Indice())
+    monkeypatch.setattr(warmer, "warm_session", calentar)
+    for _ in range(2):
+        asyncio.run(warmer.warm_season(2024, now=pd.Timestamp(ahora), within=pd.Timedelta(hours=3)))
+    return calentadas
+
+
+def test_mientras_no_es_final_se_calienta_en_cada_pasada(monkeypatch):
+    assert _pasadas(monkeypatch, "2024-05-26 15:30") == ["R", "R"]
+
+
+@pytest.fixture
+def rutas_falsas(monkeypatch):
+    llamadas = []
+
+    def ruta(nombre, resultado=None, error=None):
+        async def falsa(*args):
+            llamadas.append((nombre, args[3:]))
+            if error is not None:
+                raise HTTPException(status_code=error)
+            return json_response(encode(resultado or {}))
+        return falsa
+
+    vueltas = {"laps": [{"Driver": "LEC"}, {"Driver": "PIA"}, {"Driver": "LEC"}]}
+    monkeypatch.setattr(warmer.laps, "get_session_laps", ruta("laps", vueltas))
+    monkeypatch.setattr(warmer.laps, "get_session_stints", ruta("stints"))
+    monkeypatch.setattr(warmer.laps, "get_fastest_laps", ruta("fastest"))
+    monkeypatch.setattr(warmer.sessions, "get_session_info", ruta("info"))
+    monkeypatch.setattr(warmer.sessions, "get_qualifying_classification", ruta("classification"))
+    monkeypatch.setattr(warmer.weather, "get_session_weather", ruta("weather", error=404))
+    monkeypatch.setattr(warmer.telemetry, "get_driver_telemetry", ruta("telemetry"))
+    monkeypatch.setattr(warmer.telemetry, "get_driver_track", ruta("track"))
+    return llamadas
+
+
+def test_una_sesion_se_calienta_entera(rutas_falsas):
+    cuenta = asyncio.run(warmer.warm_session(2024, 8, "R"))
+
+    nombres = [nombre for nombre, _ in rutas_falsas]
+    assert nombres[0] == "laps"
+    assert "classification" not in nombres
+    # Una vez por piloto, no por vuelta.
+    assert [args for nombre, args in rutas_falsas if nombre == "telemetry"] == [
+        ("LEC", None, "records", None, None, None, "lttb", None),
+        ("PIA", None, "records", None, None, None, "lttb", None),
+    ]
+    assert cuenta["missing"] == 1
+
+
+def test_la_clasificacion_solo_en_una_qualy(rutas_falsas):
+    asyncio.run(warmer.warm_session(2024, 8, "Q"))
+
+    assert "classification" in [nombre for nombre, _ in rutas_falsas]
+
+
+def test_una_sesion_sin_vueltas_no_pide_nada_mas(rutas_falsas, monkeypatch):
+    async def sin_datos(*args):
+        raise HTTPException(status_code=404)
+
+    monkeypatch.setattr(warmer.laps, "get_session_laps", sin_datos)
+
+    cuenta = asyncio.run(warmer.warm_session(2024, 8, "R"))
+
+    assert cuenta == {"warmed": 0, "missing": 1}
+    assert rutas_falsas == []
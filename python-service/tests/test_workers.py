@@ -0,0 +1,102 @@
+"""
+Pruebas del pool de trabajo fuera del bucle de eventos.
+
+Lo que importa es que una carga lenta no congele lo demás y que, lleno el pool,
+la respuesta sea un 503 inmediato y no una cola sin fin.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.workers import WorkerPool
+
+
+def test_el_bucle_sigue_respondiendo_durante_una_carga():
+    pool = WorkerPool(threads=1, queue=0)
+
+    async def escenario():
+        carga = asyncio.create_task(pool.run(time.sleep, 0.3))
+        await asyncio.sleep(0)
+
+        inicio = time.perf_counter()
+        await asyncio.sleep(0.01)  # lo que sería un /health
+        respuesta = time.perf_counter() - inicio
+
+        await carga
+        return respuesta
+
+    assert asyncio.run(escenario()) < 0.1
+
+
+def test_corre_en_otro_hilo_y_devuelve_el_resultado():
+    pool = WorkerPool(threads=2, queue=0)
+
+    hilo = asyncio.run(pool.run(lambda: threading.current_thread().name))
+
+    assert hilo.startswith("fastf1")
+
+
+def test_las_excepciones_llegan_tal_cual():
+    pool = WorkerPool(threads=1, queue=0)
+
+    def sin_datos():
+        raise HTTPException(status_code=404, detail="sin datos")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(pool.run(sin_datos))
+
+    assert error.value.status_code == 404
+
+
+def test_lleno_responde_503_sin_esperar():
+    pool = WorkerPool(threads=1, queue=1)
+
+    async def escenario():
+        ocupadas = [asyncio.create_task(pool.run(time.sleep, 0.3)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as error:
+            await pool.run(time.sleep, 0)
+
+        await asyncio.gather(*ocupadas)
+        return error.value
+
+    error = asyncio.run(escenario())
+
+    assert error.status_code == 503
+    assert error.headers["Retry-After"]
+    assert pool.stats()["admitted"] == 0
+
+
+def test_un_cliente_que_se_va_no_libera_un_trabajo_que_sigue_en_marcha():
+    pool = WorkerPool(threads=1, queue=1)
+    suelta = threading.Event()
+
+    async def escenario():
+        abandonadas = [asyncio.create_task(pool.run(suelta.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        for tarea in abandonadas:
+            tarea.cancel()
+        await asyncio.gather(*abandonadas, return_exceptions=True)
+
+        # El que esperaba se cancela; el que corre sigue ocupando su hilo.
+        assert pool.stats()["admitted"] == 1
+
+        siguiente = asyncio.create_task(pool.run(suelta.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(HTTPException) as error:
+            await pool.run(suelta.wait)
+
+        suelta.set()
+        await siguiente
+        return error.value
+
+    try:
+        assert asyncio.run(escenario()).status_code == 503
+    finally:
+        suelta.set()
+    assert pool.stats()["admitted"] == 0
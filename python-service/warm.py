@@ -0,0 +1,28 @@
+"""
+Warm the cache for a whole season, offline.
+
+    python warm.py 2024
+    python warm.py 2024 --round 6 --session R
+"""
+import argparse
+import asyncio
+import logging
+
+import fastf1
+from app.config import settings
+from app.services import warmer
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm the cache for the finished sessions of a season")
+    parser.add_argument("year", type=int)
+    parser.add_argument("--round", type=int, help="Only this round")
+    parser.add_argument("--session", help="Only this session type, e.g. R or Q")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    fastf1.Cache.enable_cache(settings.FASTF1_CACHE_DIR)
+
+    warmed = asyncio.run(
+        warmer.warm_season(args.year, only_round=args.round, only_session=args.session)
+    )
+    logging.info("%s sessions warmed", len(warmed))